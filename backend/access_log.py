@@ -0,0 +1,337 @@
+"""
+access_log.py - API Access Log Analyzer
+Streams logs/api.log and its rotated backups (text or JSON lines, optionally
+gzipped) and reports per-endpoint request rates, latency percentiles, error
+ratios and top users, overall and per time window.
+
+Lines are read one at a time and folded into fixed-size aggregates, so memory
+depends on the number of endpoints, windows and users, not on the size of
+the logs. Latency percentiles come from log-scale histograms (about 2%
+relative error). Records kept by sampling (API_LOG_SAMPLE_RATE) count as
+1 / sample_rate requests.
+
+Usage:
+    python access_log.py report [--window 1h] [--top 5] [--since 2025-11-17]
+                                [--until "2025-11-18 12:00"] [--json] [files ...]
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import math
+import re
+from collections import Counter, namedtuple
+from datetime import datetime
+
+from logger import API_LOG
+
+AccessEntry = namedtuple('AccessEntry', 'timestamp method path route user_id status duration_ms weight query body',
+                         defaults=(None, None))
+
+_TEXT_LINE = re.compile(
+    r'^(?P<timestamp>\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d)\S* - (?P<method>[A-Z]+) (?P<path>[^?]+?)'
+    r'(?:\?(?P<query>\S*))?(?: \| Route: (?P<route>\S+))?(?: \| User: (?P<user>\S+))?'
+    r'(?: \| Status: (?P<status>\d+))?(?: \| Duration: (?P<duration>[\d.]+)ms)?'
+    r'(?: \| Body: (?P<body>.*?))?(?: \| Sample: (?P<sample>[\d.e-]+))?$'
+)
+_NUMERIC_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+WINDOW_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+PERCENTILES = (50, 95, 99)
+
+def parse_window(text):
+    """Seconds in a window spec like '30s', '15m', '1h' or '1d'."""
+    match = re.fullmatch(r'(\d+)([smhd])', text.strip())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid window '{text}' (use e.g. 30s, 15m, 1h, 1d)")
+    return int(match.group(1)) * WINDOW_UNITS[match.group(2)]
+
+def endpoint_key(entry):
+    """'METHOD route'; old lines without a route get numeric ids folded to <id>."""
+    return f"{entry.method} {entry.route or _NUMERIC_SEGMENT.sub('/<id>', entry.path)}"
+
+def parse_line(line):
+    """An AccessEntry from one text or JSON log line, or None if it is not a request."""
+    if line.startswith('{'):
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if record.get('status') is None or 'method' not in record:
+            return None
+        return AccessEntry(
+            record['timestamp'][:19].replace('T', ' '), record['method'], record.get('endpoint', ''),
+            record.get('route'), record.get('user_id'), int(record['status']), record.get('duration_ms'),
+            1 / record.get('sample_rate', 1.0), record.get('query'), record.get('body')
+        )
+    match = _TEXT_LINE.match(line.rstrip('\n'))
+    if match is None or match.group('status') is None:
+        # log_api_error lines and foreign text
+        return None
+    duration, sample, body = match.group('duration'), match.group('sample'), match.group('body')
+    if body is not None:
+        try:
+            body = json.loads(body)
+        except json.JSONDecodeError:
+            body = None
+    return AccessEntry(
+        match.group('timestamp').replace('T', ' '), match.group('method'), match.group('path'),
+        match.group('route'), match.group('user'), int(match.group('status')),
+        float(duration) if duration else None, 1 / float(sample) if sample else 1.0,
+        match.group('query') or None, body
+    )
+
+def log_files(path=API_LOG):
+    """The log and its rotated backups (.1, .2, ... and .gz), oldest first."""
+    backups = []
+    for backup in glob.glob(f"{path}.*"):
+        suffix = backup[len(path) + 1:].removesuffix('.gz')
+        if suffix.isdigit():
+            backups.append((int(suffix), backup))
+    return [backup for _, backup in sorted(backups, reverse=True)] + [path]
+
+def _open(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, encoding='utf-8', errors='replace', buffering=1 << 20)
+
+def iter_entries(paths, since=None, until=None):
+    """
+    Yield AccessEntry objects from the files in order, one line at a time.
+    since / until are 'YYYY-MM-DD[ HH:MM:SS]' strings compared as text, so
+    skipped lines are never fully parsed.
+    """
+    for path in paths:
+        try:
+            handle = _open(path)
+        except FileNotFoundError:
+            continue
+        with handle:
+            for line in handle:
+                if since or until:
+                    # Both formats put the timestamp first (JSON after '{"timestamp": "')
+                    stamp = (line[15:34] if line.startswith('{') else line[:19]).replace('T', ' ')
+                    if (since and stamp < since) or (until and stamp >= until):
+                        continue
+                entry = parse_line(line)
+                if entry is not None:
+                    yield entry
+
+class LatencyHistogram:
+    """Weighted log-scale histogram of durations in milliseconds."""
+    __slots__ = ('buckets', 'total', 'max')
+
+    GROWTH = 1.04
+    _SCALE = 1 / math.log(GROWTH)
+
+    def __init__(self):
+        self.buckets = {}
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms, weight=1.0):
+        index = int(math.log(ms) * self._SCALE) if ms > 0.01 else -118
+        self.buckets[index] = self.buckets.get(index, 0.0) + weight
+        self.total += weight
+        if ms > self.max:
+            self.max = ms
+
+    def merge(self, other):
+        for index, weight in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0.0) + weight
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent):
+        """Approximate value below which percent of the weight falls."""
+        if not self.total:
+            return None
+        target = self.total * percent / 100
+        seen = 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                return min(self.GROWTH ** (index + 0.5), self.max)
+        return self.max
+
+class EndpointStats:
+    """Weighted request, error and latency totals of one endpoint."""
+    __slots__ = ('requests', 'client_errors', 'server_errors', 'latency')
+
+    def __init__(self):
+        self.requests = 0.0
+        self.client_errors = 0.0
+        self.server_errors = 0.0
+        self.latency = LatencyHistogram()
+
+    def add(self, entry):
+        self.requests += entry.weight
+        if entry.status >= 500:
+            self.server_errors += entry.weight
+        elif entry.status >= 400:
+            self.client_errors += entry.weight
+        if entry.duration_ms is not None:
+            self.latency.add(entry.duration_ms, entry.weight)
+
+    def merge(self, other):
+        self.requests += other.requests
+        self.client_errors += other.client_errors
+        self.server_errors += other.server_errors
+        self.latency.merge(other.latency)
+
+    def to_dict(self, seconds):
+        row = {
+            'requests': round(self.requests),
+            'rate_per_sec': round(self.requests / seconds, 3) if seconds else None,
+            'client_error_ratio': round(self.client_errors / self.requests, 4),
+            'server_error_ratio': round(self.server_errors / self.requests, 4)
+        }
+        for percent in PERCENTILES:
+            value = self.latency.percentile(percent)
+            row[f"p{percent}_ms"] = round(value, 2) if value is not None else None
+        row['max_ms'] = round(self.latency.max, 2) if self.latency.total else None
+        return row
+
+class AccessReport:
+    """Folds access entries into overall and per-window aggregates."""
+
+    def __init__(self, window_seconds=3600, top_users=5):
+        self.window_seconds = window_seconds
+        self.top_users = top_users
+        self.endpoints = {}
+        self.users = Counter()
+        self.windows = {}   # window start (epoch seconds) -> {'endpoints', 'users'}
+        self.first = None
+        self.last = None
+        self.lines = 0
+        self._epochs = {}   # timestamp text -> epoch seconds; many lines share a second
+
+    def _epoch(self, timestamp):
+        epoch = self._epochs.get(timestamp)
+        if epoch is None:
+            if len(self._epochs) > 100000:
+                self._epochs.clear()
+            epoch = self._epochs[timestamp] = datetime.fromisoformat(timestamp).timestamp()
+        return epoch
+
+    def add(self, entry):
+        epoch = self._epoch(entry.timestamp)
+        if self.first is None or epoch < self.first:
+            self.first = epoch
+        if self.last is None or epoch > self.last:
+            self.last = epoch
+        self.lines += 1
+
+        key = endpoint_key(entry)
+        start = epoch - epoch % self.window_seconds
+        window = self.windows.get(start)
+        if window is None:
+            window = self.windows[start] = {'endpoints': {}, 'users': Counter()}
+        for endpoints in (self.endpoints, window['endpoints']):
+            stats = endpoints.get(key)
+            if stats is None:
+                stats = endpoints[key] = EndpointStats()
+            stats.add(entry)
+        if entry.user_id is not None:
+            user = str(entry.user_id)
+            self.users[user] += entry.weight
+            window['users'][user] += entry.weight
+
+    def consume(self, entries):
+        for entry in entries:
+            self.add(entry)
+        return self
+
+    def _top_users(self, users):
+        return [{'user_id': user, 'requests': round(count)} for user, count in users.most_common(self.top_users)]
+
+    @staticmethod
+    def _endpoint_rows(endpoints, seconds):
+        rows = []
+        for key, stats in sorted(endpoints.items(), key=lambda item: -item[1].requests):
+            rows.append(dict(endpoint=key, **stats.to_dict(seconds)))
+        return rows
+
+    def to_dict(self, top_endpoints=None):
+        """The report as plain data; top_endpoints limits endpoints per window."""
+        span = (self.last - self.first) if self.first is not None else 0
+        windows = []
+        for start in sorted(self.windows):
+            window = self.windows[start]
+            total = EndpointStats()
+            for stats in window['endpoints'].values():
+                total.merge(stats)
+            windows.append({
+                'start': datetime.fromtimestamp(start).isoformat(sep=' '),
+                **total.to_dict(self.window_seconds),
+                'top_users': self._top_users(window['users']),
+                'endpoints': self._endpoint_rows(window['endpoints'], self.window_seconds)[:top_endpoints]
+            })
+        return {
+            'lines': self.lines,
+            'from': datetime.fromtimestamp(self.first).isoformat(sep=' ') if self.first is not None else None,
+            'to': datetime.fromtimestamp(self.last).isoformat(sep=' ') if self.last is not None else None,
+            'window_seconds': self.window_seconds,
+            'endpoints': self._endpoint_rows(self.endpoints, max(span, 1)),
+            'top_users': self._top_users(self.users),
+            'windows': windows
+        }
+
+def format_ms(value):
+    return f"{value:.1f}" if value is not None else '-'
+
+def print_endpoints(rows, indent=''):
+    """Endpoint rows from EndpointStats.to_dict() as a table."""
+    print(f"{indent}{'endpoint':<48} {'requests':>9} {'req/s':>8} {'p50':>8} {'p95':>8} "
+          f"{'p99':>8} {'4xx':>6} {'5xx':>6}")
+    for row in rows:
+        print(f"{indent}{row['endpoint'][:48]:<48} {row['requests']:>9} {row['rate_per_sec']:>8.2f} "
+              f"{format_ms(row['p50_ms']):>8} {format_ms(row['p95_ms']):>8} {format_ms(row['p99_ms']):>8} "
+              f"{row['client_error_ratio']:>6.1%} {row['server_error_ratio']:>6.1%}")
+
+def _print_report(report):
+    print(f"✓ {report['lines']} requests from {report['from']} to {report['to']}\n")
+    print("Endpoints (latency in ms)")
+    print_endpoints(report['endpoints'])
+    users = ', '.join(f"{u['user_id']} ({u['requests']})" for u in report['top_users'])
+    print(f"\nTop users: {users or '-'}\n")
+    for window in report['windows']:
+        users = ', '.join(f"{u['user_id']} ({u['requests']})" for u in window['top_users'])
+        print(f"[{window['start']}] {window['requests']} requests, {window['rate_per_sec']:.2f} req/s, "
+              f"p95 {format_ms(window['p95_ms'])} ms, 5xx {window['server_error_ratio']:.1%}, "
+              f"top users: {users or '-'}")
+        print_endpoints(window['endpoints'], indent='    ')
+        print()
+
+def _bound(text):
+    """Normalize a --since/--until value to the log's timestamp text."""
+    return datetime.fromisoformat(text).isoformat(sep=' ') if text else None
+
+def main():
+    parser = argparse.ArgumentParser(description="API access log analyzer")
+    parser.add_argument('command', choices=['report'])
+    parser.add_argument('files', nargs='*', help="Log files (default: logs/api.log and its backups)")
+    parser.add_argument('--window', default='1h', help="Window size: 30s, 15m, 1h, 1d")
+    parser.add_argument('--top', type=int, default=5, help="Top users, and endpoints per window")
+    parser.add_argument('--since', help="Only requests at or after this time (YYYY-MM-DD[ HH:MM[:SS]])")
+    parser.add_argument('--until', help="Only requests before this time")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+
+    try:
+        window_seconds = parse_window(args.window)
+        since, until = _bound(args.since), _bound(args.until)
+    except ValueError as e:
+        parser.error(str(e))
+    report = AccessReport(window_seconds, args.top).consume(
+        iter_entries(args.files or log_files(), since, until)
+    ).to_dict(top_endpoints=args.top)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+if __name__ == '__main__':
+    main()
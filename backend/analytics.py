@@ -0,0 +1,241 @@
+"""
+analytics.py - Time-Bucketed Meeting Analytics
+Aggregates per-meeting rows into day/week/month buckets for charting and
+builds the room utilization report.
+
+Database.get_meeting_timeseries_rows() fetches one compact row per meeting
+for the whole range in a single query; the bucketing happens here. NumPy is
+used when installed and a pure-Python loop otherwise; both produce identical
+output.
+"""
+
+from datetime import timedelta
+
+from recurrence import WEEKDAYS
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+BUCKETS = ('day', 'week', 'month')
+
+# Per-meeting columns summed into each bucket (meetings itself is a row count)
+SUMMED_COLUMNS = ('cancelled', 'invited', 'accepted', 'room_minutes')
+
+def bucket_start(value, bucket):
+    """First date of the bucket that contains value (weeks start on Monday)."""
+    if bucket == 'day':
+        return value
+    if bucket == 'week':
+        return value - timedelta(days=value.weekday())
+    if bucket == 'month':
+        return value.replace(day=1)
+    raise ValueError(f"bucket must be one of: {', '.join(BUCKETS)}")
+
+def bucket_starts(start_date, end_date, bucket):
+    """Every bucket start between start_date and end_date, including empty ones."""
+    current = bucket_start(start_date, bucket)
+    starts = []
+    while current <= end_date:
+        starts.append(current)
+        if bucket == 'day':
+            current += timedelta(days=1)
+        elif bucket == 'week':
+            current += timedelta(days=7)
+        else:
+            current = (current + timedelta(days=32)).replace(day=1)
+    return starts
+
+def _empty_totals(size):
+    return {name: [0] * size for name in ('meetings',) + SUMMED_COLUMNS}
+
+def _aggregate_numpy(rows, starts):
+    """Sum the row columns per bucket with searchsorted + bincount."""
+    ordinals = np.fromiter((row['meeting_date'].toordinal() for row in rows), dtype=np.int64, count=len(rows))
+    edges = np.array([start.toordinal() for start in starts], dtype=np.int64)
+    index = np.searchsorted(edges, ordinals, side='right') - 1
+    size = len(starts)
+
+    totals = {'meetings': np.bincount(index, minlength=size).tolist()}
+    for name in SUMMED_COLUMNS:
+        values = np.fromiter((row[name] or 0 for row in rows), dtype=np.float64, count=len(rows))
+        totals[name] = np.bincount(index, weights=values, minlength=size).astype(np.int64).tolist()
+    return totals
+
+def _aggregate_python(rows, starts, bucket):
+    """Same sums as _aggregate_numpy with a dictionary lookup per row."""
+    position = {start: i for i, start in enumerate(starts)}
+    totals = _empty_totals(len(starts))
+    for row in rows:
+        i = position[bucket_start(row['meeting_date'], bucket)]
+        totals['meetings'][i] += 1
+        for name in SUMMED_COLUMNS:
+            totals[name][i] += int(row[name] or 0)
+    return totals
+
+def aggregate_timeseries(rows, start_date, end_date, bucket='day', use_numpy=None):
+    """
+    Bucket per-meeting rows into a time series.
+
+    Args:
+        rows: Dicts with meeting_date, cancelled, invited, accepted, room_minutes
+            (see Database.get_meeting_timeseries_rows)
+        start_date: First date of the range
+        end_date: Last date of the range
+        bucket: 'day', 'week' or 'month'
+        use_numpy: Force (True) or skip (False) NumPy; default uses it when installed
+
+    Returns:
+        One dict per bucket, oldest first, including buckets with no meetings
+    """
+    starts = bucket_starts(start_date, end_date, bucket)
+    if use_numpy is None:
+        use_numpy = np is not None
+
+    if not rows:
+        totals = _empty_totals(len(starts))
+    elif use_numpy:
+        totals = _aggregate_numpy(rows, starts)
+    else:
+        totals = _aggregate_python(rows, starts, bucket)
+
+    series = []
+    for i, start in enumerate(starts):
+        invited = totals['invited'][i]
+        series.append({
+            'bucket_start': start,
+            'meetings': totals['meetings'][i],
+            'cancelled': totals['cancelled'][i],
+            'invited': invited,
+            'accepted': totals['accepted'][i],
+            'accepted_rate': round(totals['accepted'][i] / invited, 4) if invited else None,
+            'room_hours': round(totals['room_minutes'][i] / 60, 2)
+        })
+    return series
+
+def _weekday_counts(start_date, end_date):
+    """How many times each weekday (Monday = 0) occurs in the range."""
+    days = (end_date - start_date).days + 1
+    full_weeks, remainder = divmod(days, 7)
+    counts = [full_weeks] * 7
+    for offset in range(remainder):
+        counts[(start_date.weekday() + offset) % 7] += 1
+    return counts
+
+def room_utilization(rows, rooms, slots, start_date, end_date, use_numpy=None, peak_count=5):
+    """
+    Build the room utilization report from one pass over booked meetings.
+
+    Bookings are counted into a dense room x weekday x period matrix, where a
+    period is a distinct (start_time, end_time) pair from time_slots. Every
+    other figure is derived from that matrix and a per-room attendance sum.
+
+    Args:
+        rows: Dicts with room_id, meeting_date, start_time, end_time,
+            duration_minutes, attendees (see Database.get_room_utilization_rows)
+        rooms: Active rooms with room_id, name, capacity
+        slots: Time slots with start_time, end_time, day_of_week
+        start_date: First date of the range
+        end_date: Last date of the range
+        use_numpy: Force (True) or skip (False) NumPy; default uses it when installed
+        peak_count: How many of the busiest weekday/period cells to return
+
+    Returns:
+        Dict with periods, heatmap, peak_hours, rooms and idle_rooms
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+
+    periods = sorted({(slot['start_time'], slot['end_time']) for slot in slots})
+    period_index = {period: i for i, period in enumerate(periods)}
+    room_index = {room['room_id']: i for i, room in enumerate(rooms)}
+    weekday_counts = _weekday_counts(start_date, end_date)
+
+    # Slot occurrences a room could have been booked for in the range
+    offered = [[0] * len(periods) for _ in WEEKDAYS]
+    for slot in slots:
+        day = WEEKDAYS.index(slot['day_of_week'])
+        offered[day][period_index[(slot['start_time'], slot['end_time'])]] = weekday_counts[day]
+
+    # Only bookings of active rooms on known periods are counted
+    cells = [
+        (room_index[row['room_id']], row['meeting_date'].weekday(),
+         period_index[(row['start_time'], row['end_time'])], row)
+        for row in rows
+        if row['room_id'] in room_index and (row['start_time'], row['end_time']) in period_index
+    ]
+    shape = (len(rooms), 7, len(periods))
+
+    if use_numpy:
+        bookings = np.zeros(shape, dtype=np.int64)
+        if cells:
+            r, d, p = (np.fromiter((cell[i] for cell in cells), dtype=np.int64, count=len(cells)) for i in range(3))
+            np.add.at(bookings, (r, d, p), 1)
+        offered_array = np.array(offered, dtype=np.int64).reshape(7, len(periods))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            occupancy = np.where(offered_array > 0, bookings / np.maximum(offered_array, 1), 0.0)
+        occupancy = np.round(occupancy, 4).tolist()
+        load = bookings.sum(axis=0).tolist()
+        room_bookings = bookings.sum(axis=(1, 2)).tolist()
+    else:
+        bookings = [[[0] * shape[2] for _ in range(7)] for _ in range(shape[0])]
+        for r, d, p, _ in cells:
+            bookings[r][d][p] += 1
+        occupancy = [
+            [[round(bookings[r][d][p] / offered[d][p], 4) if offered[d][p] else 0.0
+              for p in range(shape[2])] for d in range(7)]
+            for r in range(shape[0])
+        ]
+        load = [[sum(bookings[r][d][p] for r in range(shape[0])) for p in range(shape[2])] for d in range(7)]
+        room_bookings = [sum(sum(day) for day in bookings[r]) for r in range(shape[0])]
+
+    minutes = [0] * len(rooms)
+    attendees = [0] * len(rooms)
+    for r, _, _, row in cells:
+        minutes[r] += int(row['duration_minutes'] or 0)
+        attendees[r] += int(row['attendees'] or 0)
+
+    offered_total = sum(sum(day) for day in offered)
+    room_report = []
+    for i, room in enumerate(rooms):
+        booked = room_bookings[i]
+        avg_attendance = attendees[i] / booked if booked else None
+        room_report.append({
+            'room_id': room['room_id'],
+            'name': room['name'],
+            'capacity': room['capacity'],
+            'meetings': booked,
+            'booked_hours': round(minutes[i] / 60, 2),
+            'utilization': round(booked / offered_total, 4) if offered_total else 0.0,
+            'avg_attendance': round(avg_attendance, 2) if avg_attendance is not None else None,
+            'capacity_ratio': round(avg_attendance / room['capacity'], 4)
+                if avg_attendance is not None and room['capacity'] else None
+        })
+
+    peaks = sorted(
+        ((load[d][p], d, p) for d in range(7) for p in range(len(periods)) if load[d][p]),
+        key=lambda cell: (-cell[0], cell[1], cell[2])
+    )[:peak_count]
+
+    return {
+        'periods': [{'start_time': start, 'end_time': end} for start, end in periods],
+        'heatmap': {
+            'weekdays': list(WEEKDAYS),
+            'room_ids': [room['room_id'] for room in rooms],
+            'occupancy': occupancy
+        },
+        'peak_hours': [
+            {
+                'day_of_week': WEEKDAYS[d],
+                'start_time': periods[p][0],
+                'end_time': periods[p][1],
+                'bookings': count,
+                'rooms_in_use': round(count / (offered[d][p] * len(rooms)), 4)
+                    if offered[d][p] and rooms else 0.0
+            }
+            for count, d, p in peaks
+        ],
+        'rooms': room_report,
+        'idle_rooms': [room['room_id'] for room, report in zip(rooms, room_report) if not report['meetings']]
+    }
@@ -0,0 +1,65 @@
+"""
+analytics_rollups.py - Analytics Rollup Maintenance
+Recomputes meeting_daily_rollup and organizer_daily_rollup from meetings,
+the participant HyperLogLog sketches from meeting_participants, and the
+grade summaries from student_grades.
+
+Database keeps the rollups current on create/cancel; run compaction nightly
+to pick up anything that changed meetings directly (e.g. marking past
+meetings completed) and to drop days that no longer have meetings.
+
+Usage:
+    python analytics_rollups.py compact [--days 30]
+    python analytics_rollups.py rebuild
+    python analytics_rollups.py sketches
+    python analytics_rollups.py grades
+"""
+
+import argparse
+from datetime import date, timedelta
+
+from database import db
+
+def compact(days=30):
+    """Recompute the last and next `days` days."""
+    today = date.today()
+    result = db.compact_rollups(today - timedelta(days=days), today + timedelta(days=days))
+    print(f"✓ Compacted rollups for ±{days} days: "
+          f"{result['days']} day rows, {result['organizer_days']} organizer rows")
+    return result
+
+def rebuild():
+    """Recompute the rollups for every date."""
+    result = db.compact_rollups()
+    print(f"✓ Rebuilt rollups: {result['days']} day rows, {result['organizer_days']} organizer rows")
+    return result
+
+def sketches():
+    """Recompute the participant sketches for every date."""
+    rows = db.rebuild_participant_sketches()
+    print(f"✓ Rebuilt participant sketches from {rows} participant rows")
+    return rows
+
+def grades():
+    """Recompute the student and FAM grade summaries."""
+    rows = db.rebuild_grade_summaries()
+    print(f"✓ Rebuilt grade summaries from {rows} grade rows")
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytics rollup maintenance")
+    parser.add_argument('command', choices=['compact', 'rebuild', 'sketches', 'grades'])
+    parser.add_argument('--days', type=int, default=30, help="Window around today to compact")
+    args = parser.parse_args()
+    
+    if args.command == 'compact':
+        compact(args.days)
+    elif args.command == 'sketches':
+        sketches()
+    elif args.command == 'grades':
+        grades()
+    else:
+        rebuild()
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,21 @@
-from flask import Flask, request, jsonify
-from datetime import datetime, date
-from database import db
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+from datetime import datetime, date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from time import perf_counter
+from database import db, Database
 from auth import generate_token, verify_token, token_required, role_required, AuthError
+from analytics import BUCKETS
+import metrics
+from slow_queries import SlowQueryLog
+from profiling import RequestProfiler
+import tracing
+from logger import log_api_request
+from validators import (
+    Validator, ValidationError, validate_grade_entry, validate_meeting_creation,
+    validate_participant_response, validate_schedule_request, validate_series_creation
+)
 import os
 from dotenv import load_dotenv
 from flask_cors import CORS
@@ -9,9 +23,83 @@ from flask_cors import CORS
 # Load environment variables
 load_dotenv()
 
+class ApiJSONProvider(DefaultJSONProvider):
+    """JSON provider that also understands MySQL TIME columns."""
+    
+    @staticmethod
+    def default(o):
+        # mysql-connector returns TIME values as timedelta
+        if isinstance(o, timedelta):
+            seconds = int(o.total_seconds())
+            return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+        return DefaultJSONProvider.default(o)
+    
+    def response(self, *args, **kwargs):
+        with tracing.span('response.serialize'):
+            return super().response(*args, **kwargs)
+
 app = Flask(__name__)
+app.json = ApiJSONProvider(app)
 CORS(app)  # Enable CORS for all routes
 
+# Batch endpoint limits. Keep workers below the DB pool size (5) so a batch
+# never holds every connection.
+BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 20))
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 4))
+BATCH_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+
+# Bulk meeting creation limits
+BULK_MAX_MEETINGS = int(os.getenv('BULK_MAX_MEETINGS', 1000))
+BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', 100))
+BULK_MAX_RESPONSES = int(os.getenv('BULK_MAX_RESPONSES', 500))
+
+# Batch scheduler limits
+SCHEDULE_MAX_REQUESTS = int(os.getenv('SCHEDULE_MAX_REQUESTS', 500))
+SCHEDULE_MAX_WINDOW_DAYS = int(os.getenv('SCHEDULE_MAX_WINDOW_DAYS', 31))
+
+# Students one mentor matching request may name explicitly
+MATCH_MAX_STUDENTS = int(os.getenv('MATCH_MAX_STUDENTS', 5000))
+
+# Grade entries one import request may carry
+GRADES_MAX_IMPORT = int(os.getenv('GRADES_MAX_IMPORT', 5000))
+
+# Longest range the time-series and room utilization endpoints accept
+ANALYTICS_MAX_DAYS = int(os.getenv('ANALYTICS_MAX_DAYS', 1096))
+
+# Per-route latency and DB time at GET /metrics; when off nothing is measured
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+# Queries at least this slow (ms) go to logs/slow_queries.log; 0 turns it off.
+# A sample of them is EXPLAINed on a separate connection.
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv('SLOW_QUERY_EXPLAIN_SAMPLE', 0.1))
+SLOW_QUERY_EXPLAIN_INTERVAL = int(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', 300))
+
+# Request profiling; off unless PROFILING_ENABLED. Requests sending
+# X-Profile-Token: <PROFILING_TOKEN> are profiled individually, and
+# PROFILE_SAMPLE_PERCENT of all requests feed a flame graph file.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')
+PROFILE_SAMPLE_PERCENT = float(os.getenv('PROFILE_SAMPLE_PERCENT', 0))
+
+# One line per request in logs/api.log; API_LOG_SAMPLE_RATE (read by
+# logger.py) thins it out at high traffic
+ACCESS_LOG_ENABLED = os.getenv('ACCESS_LOG_ENABLED', 'true').lower() == 'true'
+# Also record JSON request bodies up to ACCESS_LOG_BODY_MAX bytes, so
+# replay.py can resend them; secrets in REDACTED_BODY_FIELDS are masked
+ACCESS_LOG_BODIES = os.getenv('ACCESS_LOG_BODIES', 'false').lower() == 'true'
+ACCESS_LOG_BODY_MAX = int(os.getenv('ACCESS_LOG_BODY_MAX', 8192))
+REDACTED_BODY_FIELDS = {'token', 'password'}
+
+# Request tracing to logs/traces.jsonl (OTLP/JSON); TRACING_SAMPLE_RATE of
+# new traces are kept, requests with a traceparent header follow its flag
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'false').lower() == 'true'
+TRACING_SAMPLE_RATE = float(os.getenv('TRACING_SAMPLE_RATE', 1.0))
+
+# approx: merged HyperLogLog sketches; exact: COUNT(DISTINCT); both: validation
+DISTINCT_MODES = ('approx', 'exact', 'both')
+_batch_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix='batch')
+
 # ============================================
 # Authentication Endpoints
 # ============================================
@@ -181,6 +269,22 @@ def create_meeting():
     """Create a new meeting."""
     data = request.get_json()
     try:
+        if data.get('auto_assign_room') and not data.get('room_id'):
+            created = db.create_meeting_with_room(
+                title=data['title'],
+                description=data.get('description', ''),
+                slot_id=data['slot_id'],
+                meeting_date=datetime.strptime(data['meeting_date'], '%Y-%m-%d').date(),
+                created_by=data['created_by'],
+                participants=data.get('participants', [])
+            )
+            return jsonify({
+                'status': 'success',
+                'message': 'Meeting created successfully',
+                'meeting_id': created['meeting_id'],
+                'room_id': created['room_id']
+            }), 201
+        
         meeting_id = db.create_meeting(
             title=data['title'],
             description=data.get('description', ''),
@@ -201,6 +305,132 @@ def create_meeting():
             'message': str(e)
         }), 400
 
+@app.route('/api/meetings/bulk', methods=['POST'])
+def create_meetings_bulk():
+    """Create many meetings in one call, reporting the outcome per item."""
+    data = request.get_json(silent=True) or {}
+    items = data.get('meetings')
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({
+            'status': 'error',
+            'message': 'meetings must be a non-empty list'
+        }), 400
+    if len(items) > BULK_MAX_MEETINGS:
+        return jsonify({
+            'status': 'error',
+            'message': f'At most {BULK_MAX_MEETINGS} meetings per request'
+        }), 400
+    
+    try:
+        # Validate everything before touching the database
+        results = [None] * len(items)
+        valid_indexes = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = {'index': index, 'status': 'invalid', 'meeting_id': None,
+                                  'errors': [{'field': None, 'message': 'Item must be an object'}]}
+                continue
+            errors = validate_meeting_creation(item)
+            if errors:
+                results[index] = {'index': index, 'status': 'invalid', 'meeting_id': None, 'errors': errors}
+            else:
+                valid_indexes.append(index)
+        
+        created = db.create_meetings_bulk(
+            [items[i] for i in valid_indexes],
+            chunk_size=max(1, int(data.get('chunk_size', BULK_CHUNK_SIZE)))
+        )
+        for index, result in zip(valid_indexes, created):
+            result['index'] = index
+            results[index] = result
+        
+        summary = {}
+        for result in results:
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+        
+        if summary.get('created') == len(items):
+            status_code = 201
+        elif summary.get('created'):
+            status_code = 207
+        else:
+            status_code = 400
+        return jsonify({
+            'status': 'success' if status_code == 201 else ('partial' if status_code == 207 else 'error'),
+            'summary': summary,
+            'data': results
+        }), status_code
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/api/meetings/schedule', methods=['POST'])
+def schedule_meetings():
+    """Find slots and rooms for many meeting requests and book them together."""
+    data = request.get_json(silent=True) or {}
+    items = data.get('requests')
+    dry_run = bool(data.get('dry_run', False))
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({
+            'status': 'error',
+            'message': 'requests must be a non-empty list'
+        }), 400
+    if len(items) > SCHEDULE_MAX_REQUESTS:
+        return jsonify({
+            'status': 'error',
+            'message': f'At most {SCHEDULE_MAX_REQUESTS} requests per call'
+        }), 400
+    
+    try:
+        results = [None] * len(items)
+        valid_indexes = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = {'index': index, 'status': 'invalid',
+                                  'errors': [{'field': None, 'message': 'Item must be an object'}]}
+                continue
+            errors = validate_schedule_request(item, SCHEDULE_MAX_WINDOW_DAYS)
+            if errors:
+                results[index] = {'index': index, 'status': 'invalid', 'errors': errors}
+            else:
+                valid_indexes.append(index)
+        
+        planned = db.schedule_meetings(
+            [items[i] for i in valid_indexes],
+            dry_run=dry_run,
+            chunk_size=BULK_CHUNK_SIZE
+        )
+        for index, result in zip(valid_indexes, planned):
+            result['index'] = index
+            results[index] = result
+        
+        summary = {}
+        for result in results:
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+        
+        if dry_run:
+            status_code = 200
+        elif summary.get('scheduled') == len(items):
+            status_code = 201
+        elif summary.get('scheduled'):
+            status_code = 207
+        else:
+            status_code = 400
+        return jsonify({
+            'status': 'success' if status_code in (200, 201) else ('partial' if status_code == 207 else 'error'),
+            'dry_run': dry_run,
+            'summary': summary,
+            'data': results
+        }), status_code
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
 @app.route('/api/meetings/<int:meeting_id>', methods=['GET'])
 def get_meeting(meeting_id):
     """Get meeting details with participants."""
@@ -226,8 +456,7 @@ def get_meeting(meeting_id):
 def delete_meeting(meeting_id):
     """Delete/Cancel a meeting."""
     try:
-        query = "UPDATE meetings SET status = 'cancelled' WHERE meeting_id = %s"
-        db.execute_query(query, (meeting_id,), fetch=False)
+        db.cancel_meeting(meeting_id)
         return jsonify({
             'status': 'success',
             'message': 'Meeting cancelled successfully'
@@ -238,6 +467,41 @@ def delete_meeting(meeting_id):
             'message': str(e)
         }), 400
 
+@app.route('/api/meetings/<int:meeting_id>', methods=['PUT'])
+def update_meeting(meeting_id):
+    """Update a meeting's title, description or room."""
+    data = request.get_json(silent=True) or {}
+    try:
+        fields = {}
+        if 'title' in data:
+            fields['title'] = Validator.validate_title(data['title'])
+        if 'description' in data:
+            fields['description'] = Validator.validate_description(data['description'])
+        if 'room_id' in data:
+            fields['room_id'] = Validator.validate_positive_integer(data['room_id'], 'room_id') if data['room_id'] else None
+        if not fields:
+            return jsonify({
+                'status': 'error',
+                'message': 'Nothing to update (title, description, room_id)'
+            }), 400
+        
+        db.update_meeting(meeting_id, fields)
+        return jsonify({
+            'status': 'success',
+            'message': 'Meeting updated successfully'
+        })
+    except ValidationError as e:
+        return jsonify({
+            'status': 'error',
+            'message': e.message,
+            'errors': [e.to_dict()]
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
 @app.route('/api/meetings/upcoming', methods=['GET'])
 def get_upcoming_meetings():
     """Get upcoming meetings for a user."""
@@ -305,6 +569,139 @@ def get_user_schedule(user_id):
             'message': str(e)
         }), 400
 
+@app.route('/api/schedule/daily', methods=['GET'])
+def get_daily_schedule():
+    """Get all scheduled meetings for a day (front-desk display)."""
+    date_str = request.args.get('date')
+    try:
+        target_date = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else date.today()
+        schedule = db.get_daily_schedule(target_date)
+        return jsonify({
+            'status': 'success',
+            'data': schedule
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+# ============================================
+# Meeting Series Endpoints
+# ============================================
+
+@app.route('/api/series', methods=['POST'])
+def create_meeting_series():
+    """Create a weekly recurring meeting series."""
+    data = request.get_json(silent=True) or {}
+    errors = validate_series_creation(data)
+    if errors:
+        return jsonify({
+            'status': 'error',
+            'message': 'Validation failed',
+            'errors': errors
+        }), 400
+    
+    try:
+        result = db.create_meeting_series(
+            title=data['title'],
+            description=data.get('description', ''),
+            room_id=data.get('room_id'),
+            slot_id=data['slot_id'],
+            start_date=data['start_date'],
+            until_date=data['until_date'],
+            created_by=data['created_by'],
+            participants=data.get('participants', []),
+            interval_weeks=data['interval_weeks']
+        )
+        return jsonify({
+            'status': 'success',
+            'message': 'Meeting series created successfully',
+            'series_id': result['series_id'],
+            'materialized': result['materialized']
+        }), 201
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/api/series/<int:series_id>/occurrences', methods=['GET'])
+def get_series_occurrences(series_id):
+    """List occurrences of a series in a date window."""
+    start_date_str = request.args.get('start_date')
+    end_date_str = request.args.get('end_date')
+    
+    try:
+        start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else date.today()
+        end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else start_date + timedelta(days=90)
+        
+        occurrences = db.get_series_occurrences(series_id, start_date, end_date)
+        return jsonify({
+            'status': 'success',
+            'data': occurrences
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/api/series/<int:series_id>/skip', methods=['POST'])
+def skip_series_occurrence(series_id):
+    """Skip a single occurrence of a series."""
+    data = request.get_json(silent=True) or {}
+    try:
+        db.skip_series_occurrence(
+            series_id=series_id,
+            occurrence_date=datetime.strptime(data['date'], '%Y-%m-%d').date()
+        )
+        return jsonify({
+            'status': 'success',
+            'message': 'Occurrence skipped successfully'
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/api/series/<int:series_id>', methods=['DELETE'])
+def cancel_meeting_series(series_id):
+    """Cancel a series and its upcoming occurrences."""
+    try:
+        if not db.cancel_series(series_id):
+            return jsonify({
+                'status': 'error',
+                'message': 'Active series not found'
+            }), 404
+        return jsonify({
+            'status': 'success',
+            'message': 'Meeting series cancelled successfully'
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/api/series/materialize', methods=['POST'])
+def materialize_series():
+    """Roll the materialized horizon of all series forward."""
+    data = request.get_json(silent=True) or {}
+    try:
+        horizon_days = data.get('horizon_days')
+        result = db.materialize_series(horizon_days=int(horizon_days) if horizon_days is not None else None)
+        return jsonify({
+            'status': 'success',
+            'data': result
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
 # ============================================
 # Room Endpoints
 # ============================================
@@ -419,6 +816,217 @@ def respond_to_meeting(meeting_id):
             'message': str(e)
         }), 400
 
+@app.route('/api/meetings/<int:meeting_id>/respond/bulk', methods=['POST'])
+def respond_to_meeting_bulk(meeting_id):
+    """Record responses for many participants of a meeting at once."""
+    data = request.get_json(silent=True) or {}
+    responses = data.get('responses')
+    
+    if not isinstance(responses, list) or not responses:
+        return jsonify({
+            'status': 'error',
+            'message': 'responses must be a non-empty list'
+        }), 400
+    if len(responses) > BULK_MAX_RESPONSES:
+        return jsonify({
+            'status': 'error',
+            'message': f'At most {BULK_MAX_RESPONSES} responses per request'
+        }), 400
+    
+    # The whole batch is one statement, so reject it if any entry is invalid
+    errors = []
+    for index, item in enumerate(responses):
+        if not isinstance(item, dict):
+            errors.append({'index': index, 'errors': [{'field': None, 'message': 'Item must be an object'}]})
+            continue
+        item_errors = validate_participant_response(item)
+        if item_errors:
+            errors.append({'index': index, 'errors': item_errors})
+    if errors:
+        return jsonify({
+            'status': 'error',
+            'message': 'Validation failed',
+            'errors': errors
+        }), 400
+    
+    try:
+        changed = db.update_participant_responses_bulk(meeting_id, responses)
+        if changed is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Meeting not found'
+            }), 404
+        return jsonify({
+            'status': 'success',
+            'message': f'{len(changed)} response(s) changed',
+            'data': changed
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+# ============================================
+# FAM Mentoring Endpoints
+# ============================================
+
+@app.route('/api/fams/match', methods=['POST'])
+def match_mentees():
+    """Assign unmatched students to FAMs in one batch."""
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        student_ids = Validator.validate_list_of_integers(data.get('student_ids', []), 'student_ids')
+        if len(student_ids) > MATCH_MAX_STUDENTS:
+            raise ValidationError('student_ids', f'At most {MATCH_MAX_STUDENTS} students per request')
+        interests = data.get('interests') or {}
+        if not isinstance(interests, dict) or not all(isinstance(v, list) for v in interests.values()):
+            raise ValidationError('interests', 'interests must map student ids to lists of keywords')
+        
+        results = db.match_mentees(
+            student_ids=student_ids or None,
+            interests={int(student_id): keywords for student_id, keywords in interests.items()},
+            use_availability=bool(data.get('use_availability', False)),
+            year=int(data.get('year', 1)),
+            dry_run=bool(data.get('dry_run', False))
+        )
+        summary = {}
+        for result in results:
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+        return jsonify({
+            'status': 'success',
+            'dry_run': bool(data.get('dry_run', False)),
+            'summary': summary,
+            'data': results
+        })
+    except ValidationError as e:
+        return jsonify({
+            'status': 'error',
+            'message': e.message,
+            'errors': [e.to_dict()]
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/api/students/<int:student_id>/mentor-slots', methods=['GET'])
+def find_mentor_slots(student_id):
+    """Find ranked times a student can meet their FAM or another FAM of the department."""
+    start_date = request.args.get('start_date', str(date.today()))
+    end_date = request.args.get('end_date')
+    
+    try:
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else start + timedelta(days=13)
+        if end < start:
+            raise ValidationError('end_date', "end_date must not be before start_date")
+        if (end - start).days >= SCHEDULE_MAX_WINDOW_DAYS:
+            raise ValidationError('end_date', f"A window may span at most {SCHEDULE_MAX_WINDOW_DAYS} days")
+        
+        options = db.find_mentor_slots(
+            student_id,
+            start,
+            end,
+            department=request.args.get('department'),
+            room_required=request.args.get('room_required', 'true').lower() != 'false',
+            limit=min(request.args.get('limit', 20, type=int), 100)
+        )
+        return jsonify({
+            'status': 'success',
+            'data': options
+        })
+    except ValidationError as e:
+        return jsonify({
+            'status': 'error',
+            'message': e.message,
+            'errors': [e.to_dict()]
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/api/grades/import', methods=['POST'])
+def import_grades():
+    """Insert or update many grades; the whole import is rejected if any entry is invalid."""
+    data = request.get_json(silent=True) or {}
+    entries = data.get('grades')
+    
+    if not isinstance(entries, list) or not entries:
+        return jsonify({
+            'status': 'error',
+            'message': 'grades must be a non-empty list'
+        }), 400
+    if len(entries) > GRADES_MAX_IMPORT:
+        return jsonify({
+            'status': 'error',
+            'message': f'At most {GRADES_MAX_IMPORT} grades per import'
+        }), 400
+    
+    invalid = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            invalid.append({'index': index, 'errors': [{'field': None, 'message': 'Item must be an object'}]})
+            continue
+        errors = validate_grade_entry(entry)
+        if errors:
+            invalid.append({'index': index, 'errors': errors})
+    if invalid:
+        return jsonify({
+            'status': 'error',
+            'message': f'{len(invalid)} invalid grade entries',
+            'data': invalid
+        }), 400
+    
+    try:
+        counts = db.save_grades(entries)
+        return jsonify({
+            'status': 'success',
+            'message': 'Grades imported successfully',
+            'data': counts
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/api/students/<int:student_id>/grades', methods=['GET'])
+def get_student_grades(student_id):
+    """Get a student's grades with per-semester and cumulative GPA."""
+    try:
+        return jsonify({
+            'status': 'success',
+            'data': db.get_student_grades(student_id)
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/api/fams/<int:fam_id>/mentee-grades', methods=['GET'])
+def get_fam_mentee_grades(fam_id):
+    """Get grade summaries of a FAM's mentees and the FAM's grade distribution."""
+    try:
+        return jsonify({
+            'status': 'success',
+            'data': db.get_fam_mentee_grades(
+                fam_id,
+                academic_year=request.args.get('academic_year'),
+                semester=request.args.get('semester')
+            )
+        })
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
 # ============================================
 # Analytics Endpoints
 # ============================================
@@ -444,6 +1052,389 @@ def get_meeting_analytics():
             'message': str(e)
         }), 400
 
+@app.route('/api/analytics/meetings/timeseries', methods=['GET'])
+def get_meeting_timeseries():
+    """Get per-day/week/month meeting analytics for a date range."""
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date', str(date.today()))
+    bucket = request.args.get('bucket', 'day')
+    
+    try:
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        if bucket not in BUCKETS:
+            raise ValidationError('bucket', f"bucket must be one of: {', '.join(BUCKETS)}")
+        if end < start:
+            raise ValidationError('end_date', "end_date must not be before start_date")
+        if (end - start).days >= ANALYTICS_MAX_DAYS:
+            raise ValidationError('end_date', f"Date range cannot exceed {ANALYTICS_MAX_DAYS} days")
+        
+        return jsonify({
+            'status': 'success',
+            'data': db.get_meeting_timeseries(start, end, bucket)
+        })
+    except ValidationError as e:
+        return jsonify({
+            'status': 'error',
+            'message': e.message,
+            'errors': [e.to_dict()]
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/api/analytics/rooms/utilization', methods=['GET'])
+def get_room_utilization():
+    """Get the room utilization report for a date range."""
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date', str(date.today()))
+    
+    try:
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        if end < start:
+            raise ValidationError('end_date', "end_date must not be before start_date")
+        if (end - start).days >= ANALYTICS_MAX_DAYS:
+            raise ValidationError('end_date', f"Date range cannot exceed {ANALYTICS_MAX_DAYS} days")
+        
+        return jsonify({
+            'status': 'success',
+            'data': db.get_room_utilization(start, end)
+        })
+    except ValidationError as e:
+        return jsonify({
+            'status': 'error',
+            'message': e.message,
+            'errors': [e.to_dict()]
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+@app.route('/api/analytics/participants/distinct', methods=['GET'])
+def get_distinct_participants():
+    """Count distinct meeting participants in a date range, optionally per organizer."""
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date', str(date.today()))
+    organizer_id = request.args.get('organizer_id', type=int)
+    mode = request.args.get('mode', 'approx')
+    
+    try:
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        if mode not in DISTINCT_MODES:
+            raise ValidationError('mode', f"mode must be one of: {', '.join(DISTINCT_MODES)}")
+        if end < start:
+            raise ValidationError('end_date', "end_date must not be before start_date")
+        
+        return jsonify({
+            'status': 'success',
+            'data': db.get_distinct_participants(start, end, organizer_id, mode)
+        })
+    except ValidationError as e:
+        return jsonify({
+            'status': 'error',
+            'message': e.message,
+            'errors': [e.to_dict()]
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+# ============================================
+# Batch Endpoint
+# ============================================
+
+def _run_sub_request(sub_request, headers):
+    """Dispatch one batch entry through the normal Flask routing."""
+    try:
+        with app.test_request_context(
+            sub_request['path'],
+            method=sub_request['method'],
+            query_string=sub_request.get('params'),
+            json=sub_request.get('body'),
+            headers=headers,
+            # The batch request's own access log line covers its sub-requests
+            environ_overrides={'batch.sub_request': True}
+        ):
+            response = app.full_dispatch_request()
+        body = response.get_json(silent=True)
+        if body is None:
+            body = response.get_data(as_text=True)
+        return {'id': sub_request['id'], 'status_code': response.status_code, 'body': body}
+    except Exception as e:
+        return {
+            'id': sub_request['id'],
+            'status_code': 500,
+            'body': {'status': 'error', 'message': str(e)}
+        }
+
+def _batch_groups(sub_requests):
+    """
+    Split sub-requests into groups that can run together.
+    
+    Consecutive GETs form one concurrent group; every other method runs on
+    its own so writes keep their position relative to the reads around them.
+    """
+    group = []
+    for sub_request in sub_requests:
+        if sub_request['method'] == 'GET':
+            group.append(sub_request)
+            continue
+        if group:
+            yield group
+            group = []
+        yield [sub_request]
+    if group:
+        yield group
+
+@app.route('/api/batch', methods=['POST'])
+def batch():
+    """Execute several API calls in one round trip."""
+    data = request.get_json(silent=True) or {}
+    sub_requests = data.get('requests')
+    
+    if not isinstance(sub_requests, list) or not sub_requests:
+        return jsonify({
+            'status': 'error',
+            'message': 'requests must be a non-empty list'
+        }), 400
+    if len(sub_requests) > BATCH_MAX_REQUESTS:
+        return jsonify({
+            'status': 'error',
+            'message': f'A batch may contain at most {BATCH_MAX_REQUESTS} requests'
+        }), 400
+    
+    normalized = []
+    for index, sub_request in enumerate(sub_requests):
+        if not isinstance(sub_request, dict):
+            return jsonify({
+                'status': 'error',
+                'message': f'requests[{index}] must be an object'
+            }), 400
+        method = str(sub_request.get('method', 'GET')).upper()
+        path = sub_request.get('path', '')
+        if method not in BATCH_METHODS:
+            return jsonify({
+                'status': 'error',
+                'message': f'requests[{index}]: unsupported method {method}'
+            }), 400
+        if not isinstance(path, str) or not path.startswith('/api/') or path.startswith('/api/batch'):
+            return jsonify({
+                'status': 'error',
+                'message': f'requests[{index}]: path must be an /api/ route other than /api/batch'
+            }), 400
+        normalized.append({
+            'id': sub_request.get('id', index),
+            'method': method,
+            'path': path,
+            'params': sub_request.get('params'),
+            'body': sub_request.get('body')
+        })
+    
+    headers = {}
+    if request.headers.get('Authorization'):
+        headers['Authorization'] = request.headers['Authorization']
+    
+    results = []
+    with db.request_scope():
+        for group in _batch_groups(normalized):
+            if len(group) == 1:
+                results.append(_run_sub_request(group[0], headers))
+                continue
+            # Each worker gets its own copy of the context; the copies all
+            # point at the same request scope, so repeated reads are shared.
+            futures = [
+                _batch_executor.submit(contextvars.copy_context().run, _run_sub_request, sub_request, headers)
+                for sub_request in group
+            ]
+            results.extend(future.result() for future in futures)
+    
+    return jsonify({
+        'status': 'success',
+        'data': results
+    }), 200
+
+# ============================================
+# Metrics
+# ============================================
+
+def _route_label():
+    """The matched URL rule, so /api/users/1 and /api/users/2 share a series."""
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+if METRICS_ENABLED:
+    db.add_listener(metrics.on_database_event)
+    
+    # Kept in the WSGI environ, not g: batch sub-requests share the app context
+    @app.before_request
+    def start_request_metrics():
+        request.environ['metrics.stats'] = metrics.start_request()
+    
+    @app.after_request
+    def record_request_metrics(response):
+        stats = request.environ.pop('metrics.stats', None)
+        if stats is not None:
+            metrics.finish_request(stats, request.method, _route_label(), response.status_code)
+        return response
+    
+    @app.teardown_request
+    def record_failed_request_metrics(exc):
+        # after_request has already recorded the 500 unless the exception
+        # propagated (PROPAGATE_EXCEPTIONS: debug and testing)
+        stats = request.environ.pop('metrics.stats', None)
+        if stats is not None:
+            metrics.finish_request(stats, request.method, _route_label(), 500)
+
+slow_query_log = None
+if SLOW_QUERY_MS > 0:
+    slow_query_log = SlowQueryLog(
+        threshold_ms=SLOW_QUERY_MS,
+        explain_sample=SLOW_QUERY_EXPLAIN_SAMPLE,
+        explain_interval=SLOW_QUERY_EXPLAIN_INTERVAL,
+        connect=db.open_dedicated_connection
+    )
+    db.add_listener(slow_query_log.on_database_event)
+
+# ============================================
+# Profiling
+# ============================================
+
+if PROFILING_ENABLED and (PROFILING_TOKEN or PROFILE_SAMPLE_PERCENT):
+    profiler = RequestProfiler(token=PROFILING_TOKEN, sample_percent=PROFILE_SAMPLE_PERCENT)
+    
+    @app.before_request
+    def start_request_profile():
+        state = profiler.start(request.headers, f"{request.method} {_route_label()}")
+        if state is not None:
+            request.environ['profiling.state'] = state
+    
+    @app.after_request
+    def finish_request_profile(response):
+        state = request.environ.pop('profiling.state', None)
+        if state is not None:
+            response = profiler.finish(state, response)
+        return response
+    
+    @app.teardown_request
+    def abandon_request_profile(exc):
+        # after_request has already finished the profile unless the exception
+        # propagated (PROPAGATE_EXCEPTIONS: debug and testing); keep what ran
+        state = request.environ.pop('profiling.state', None)
+        if state is not None:
+            profiler.finish(state)
+
+# ============================================
+# Tracing
+# ============================================
+
+if TRACING_ENABLED:
+    tracer = tracing.Tracer(sample_rate=TRACING_SAMPLE_RATE)
+    tracer.instrument(Database)
+    db.add_listener(tracer.on_database_event)
+    
+    @app.before_request
+    def start_request_span():
+        request_span = tracer.start_request(
+            request.headers,
+            f"{request.method} {_route_label()}",
+            {'http.method': request.method, 'http.route': _route_label(), 'http.target': request.full_path}
+        )
+        if request_span is not None:
+            request.environ['tracing.span'] = request_span
+    
+    @app.after_request
+    def finish_request_span(response):
+        request_span = request.environ.pop('tracing.span', None)
+        if request_span is not None:
+            tracer.finish_request(request_span, response.status_code, response)
+        return response
+    
+    @app.teardown_request
+    def abandon_request_span(exc):
+        # after_request has already closed the span unless the exception
+        # propagated (PROPAGATE_EXCEPTIONS: debug and testing)
+        request_span = request.environ.pop('tracing.span', None)
+        if request_span is not None:
+            tracer.finish_request(request_span, 500)
+
+# ============================================
+# Access Log
+# ============================================
+
+def _log_access(status):
+    started = request.environ.pop('access_log.started', None)
+    if started is None:
+        return
+    user = getattr(request, 'current_user', None) or {}
+    log_api_request(request.method, request.path, user.get('user_id'), status,
+                    duration_ms=(perf_counter() - started) * 1000, route=_route_label(),
+                    query=request.query_string.decode('latin-1'), body=_loggable_body())
+
+def _loggable_body():
+    """The JSON body for replay, if ACCESS_LOG_BODIES is on and it is small enough."""
+    if not ACCESS_LOG_BODIES or not request.is_json or (request.content_length or 0) > ACCESS_LOG_BODY_MAX:
+        return None
+    return _redact(request.get_json(silent=True))
+
+def _redact(value):
+    """Copy of a JSON value with REDACTED_BODY_FIELDS masked at any depth."""
+    if isinstance(value, dict):
+        return {key: '[redacted]' if key in REDACTED_BODY_FIELDS else _redact(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+if ACCESS_LOG_ENABLED:
+    
+    @app.before_request
+    def start_access_log():
+        if not request.environ.get('batch.sub_request'):
+            request.environ['access_log.started'] = perf_counter()
+    
+    @app.after_request
+    def write_access_log(response):
+        _log_access(response.status_code)
+        return response
+    
+    @app.teardown_request
+    def write_failed_access_log(exc):
+        # after_request has already logged the 500 unless the exception
+        # propagated (PROPAGATE_EXCEPTIONS: debug and testing)
+        _log_access(500)
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Expose request and database metrics in the Prometheus text format."""
+    if not METRICS_ENABLED:
+        return jsonify({
+            'status': 'error',
+            'message': 'Metrics are disabled'
+        }), 404
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/admin/slow-queries', methods=['GET'])
+@token_required
+@role_required('admin')
+def get_slow_queries():
+    """Summarize this process's slow queries by fingerprint."""
+    if slow_query_log is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Slow query log is disabled'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'threshold_ms': SLOW_QUERY_MS,
+        'data': slow_query_log.summary(top=min(request.args.get('top', 20, type=int), 100))
+    }), 200
+
 # ============================================
 # Health Check
 # ============================================
@@ -0,0 +1,528 @@
+"""
+benchmarks.py - Performance Benchmarks
+Measures write paths of the Database layer against a live database.
+All rows created here are tagged with BENCH_TAG and removed afterwards.
+
+The suite command seeds a dataset at a named scale (SCALES), then measures
+the read paths: each Database method directly and each GET endpoint through
+the Flask test client. For every case it records the latency distribution,
+throughput and queries per call. Results are written as JSON and can be
+compared with an earlier run, failing on regressions:
+
+    python benchmarks.py suite --scale medium --output before.json
+    python benchmarks.py suite --scale medium --baseline before.json --threshold 0.2
+    python benchmarks.py compare before.json after.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import database
+import synthetic_data
+from database import db, Database
+
+BENCH_TAG = '[bench]'
+BENCH_EMAIL_DOMAIN = 'bench.invalid'
+BENCH_SRN_PREFIX = 'BENCH-'
+
+def _bench_users(count=6):
+    """Return (organizer, participants), creating tagged users if needed."""
+    users = db.execute_query(
+        "SELECT user_id FROM users WHERE email LIKE %s ORDER BY user_id LIMIT %s",
+        ('%@' + BENCH_EMAIL_DOMAIN, count)
+    )
+    user_ids = [u['user_id'] for u in users]
+    for i in range(len(user_ids), count):
+        user_ids.append(db.create_user(f"Bench User {i}", f"user{i}@{BENCH_EMAIL_DOMAIN}", 'student'))
+    return user_ids[0], user_ids[1:]
+
+def _bench_meetings(count, label, days_ahead, participants_per_meeting=2):
+    """Build `count` room-less meetings spread over future dates and slots."""
+    organizer, others = _bench_users(participants_per_meeting + 1)
+    slots = [s['slot_id'] for s in db.execute_query("SELECT slot_id FROM time_slots ORDER BY slot_id")]
+    base_date = date.today() + timedelta(days=days_ahead)
+    meetings = []
+    for i in range(count):
+        # One participant set per (slot, date) so the double-booking
+        # trigger never fires and both paths do the same work.
+        slot_id = slots[i % len(slots)]
+        meeting_date = base_date + timedelta(days=i // len(slots))
+        meetings.append({
+            'title': f"{BENCH_TAG} {label} #{i}",
+            'description': 'benchmark',
+            'room_id': None,
+            'slot_id': slot_id,
+            'meeting_date': meeting_date,
+            'created_by': organizer,
+            'participants': others[:participants_per_meeting]
+        })
+    return meetings
+
+def cleanup(users=False):
+    """Delete every benchmark meeting (participants cascade), optionally the users too."""
+    removed = db.execute_query(
+        "DELETE FROM meetings WHERE title LIKE %s", (BENCH_TAG + '%',), fetch=False
+    )
+    if users:
+        for table in ('students', 'fams'):
+            db.execute_query(
+                f"DELETE FROM {table} WHERE srn LIKE %s", (BENCH_SRN_PREFIX + '%',), fetch=False
+            )
+        db.execute_query(
+            "DELETE FROM users WHERE email LIKE %s", ('%@' + BENCH_EMAIL_DOMAIN,), fetch=False
+        )
+        db.execute_query(
+            "DELETE FROM meeting_rooms WHERE name LIKE %s", (BENCH_TAG + ' Room%',), fetch=False
+        )
+    if removed:
+        db.compact_rollups()
+        db.rebuild_participant_sketches()
+    return removed
+
+def benchmark_bulk_meetings(count=500, chunk_size=100):
+    """Compare create_meeting in a loop with create_meetings_bulk."""
+    results = {}
+    
+    one_by_one = _bench_meetings(count, 'single', days_ahead=400)
+    start = time.perf_counter()
+    for meeting in one_by_one:
+        db.create_meeting(**meeting)
+    elapsed = time.perf_counter() - start
+    results['one_by_one'] = {'seconds': elapsed, 'meetings_per_sec': count / elapsed}
+    cleanup()
+    
+    bulk = _bench_meetings(count, 'bulk', days_ahead=400)
+    start = time.perf_counter()
+    outcome = db.create_meetings_bulk(bulk, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - start
+    created = sum(1 for r in outcome if r['status'] == 'created')
+    results['bulk'] = {'seconds': elapsed, 'meetings_per_sec': count / elapsed, 'created': created}
+    cleanup()
+    
+    results['speedup'] = results['one_by_one']['seconds'] / results['bulk']['seconds']
+    return results
+
+def benchmark_booking_paths(count=100, participants_per_meeting=50):
+    """
+    Compare trigger-based and set-based double-booking checks in create_meeting.
+    
+    With the trigger path every participant row runs a three-table lookup
+    and an availability upsert; the set-based path does both for the whole
+    participant set in two statements.
+    """
+    db.rebuild_busy_slots()
+    results = {}
+    for mode in ('trigger', 'set'):
+        meetings = _bench_meetings(count, mode, days_ahead=500, participants_per_meeting=participants_per_meeting)
+        start = time.perf_counter()
+        for meeting in meetings:
+            db.create_meeting(booking_mode=mode, **meeting)
+        elapsed = time.perf_counter() - start
+        results[mode] = {
+            'seconds': elapsed,
+            'meetings_per_sec': count / elapsed,
+            'participant_rows_per_sec': count * participants_per_meeting / elapsed
+        }
+        cleanup()
+    results['speedup'] = results['trigger']['seconds'] / results['set']['seconds']
+    return results
+
+# Dataset sizes for the suite, generated by synthetic_data.SyntheticDataset:
+# skewed participants, hot rooms, and meetings within days_span days after
+# today. participants is the mean per meeting. Time slots come from the
+# seeded base data (seed_data.py).
+SCALES = {
+    'small': {'users': 50, 'meetings': 500, 'rooms': 5, 'participants': 3, 'days_span': 60},
+    'medium': {'users': 500, 'meetings': 5000, 'rooms': 20, 'participants': 4, 'days_span': 180},
+    'large': {'users': 2000, 'meetings': 50000, 'rooms': 40, 'participants': 5, 'days_span': 365}
+}
+
+def _seed_mentorship(user_ids):
+    """Make the first two users a FAM and their mentee, for the student routes; returns the student id."""
+    existing = db.execute_query("SELECT id FROM students WHERE srn = %s", (BENCH_SRN_PREFIX + 'S1',))
+    if existing:
+        return existing[0]['id']
+    fam_id = db.execute_query(
+        "INSERT INTO fams (user_id, name, srn, department, year) VALUES (%s, %s, %s, %s, %s)",
+        (user_ids[0], f"{BENCH_TAG} FAM", BENCH_SRN_PREFIX + 'F1', 'Computer Science', 3), fetch=False
+    )
+    student_id = db.execute_query(
+        "INSERT INTO students (user_id, name, srn, department, year) VALUES (%s, %s, %s, %s, %s)",
+        (user_ids[1], f"{BENCH_TAG} Student", BENCH_SRN_PREFIX + 'S1', 'Computer Science', 1), fetch=False
+    )
+    db.execute_query(
+        "INSERT INTO fam_mentees (fam_id, student_id) VALUES (%s, %s)", (fam_id, student_id), fetch=False
+    )
+    return student_id
+
+def _seed_series(user_ids):
+    """A weekly series over the next quarter, mostly beyond the horizon; returns its id."""
+    today = date.today()
+    return db.create_meeting_series(
+        title=f"{BENCH_TAG} suite series", description='benchmark', room_id=None, slot_id=1,
+        start_date=today, until_date=today + timedelta(days=90), created_by=user_ids[0],
+        participants=user_ids[1:4]
+    )['series_id']
+
+def seed_scale(scale, seed=42, chunk_size=5000):
+    """
+    Generate and bulk-load the tagged users, rooms and meetings of a scale,
+    reproducibly for a seed.
+    
+    Returns:
+        {'users': [user_id, ...], 'student': student_id, 'series': series_id,
+         'meetings': created, 'conflicts': skipped}
+    """
+    size = SCALES[scale]
+    dataset = synthetic_data.SyntheticDataset(
+        users=size['users'], meetings=size['meetings'], rooms=size['rooms'], seed=seed,
+        days_back=0, days_ahead=size['days_span'], mean_participants=size['participants'],
+        email_domain=BENCH_EMAIL_DOMAIN, title_prefix=BENCH_TAG + ' suite', room_prefix=BENCH_TAG + ' Room'
+    )
+    result = synthetic_data.load(dataset, 'insert', chunk_size, progress=lambda message: None)
+    first_user = result['first_ids']['users']
+    user_ids = list(range(first_user, first_user + result['rows']['users']))
+    created = result['rows']['meetings']
+    return {
+        'users': user_ids,
+        'student': _seed_mentorship(user_ids),
+        'series': _seed_series(user_ids),
+        'meetings': created,
+        'conflicts': size['meetings'] - created
+    }
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+class QueryCounter:
+    """Database listener counting executed queries."""
+    
+    def __init__(self):
+        self.queries = 0
+    
+    def on_database_event(self, event, info):
+        if event == 'query':
+            self.queries += 1
+
+def measure(call, iterations=50, warmup=5, counter=None):
+    """Run call warmup + iterations times; latency distribution, throughput and queries per call."""
+    for _ in range(warmup):
+        call()
+    before = counter.queries if counter else 0
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+    samples.sort()
+    return {
+        'iterations': iterations,
+        'mean_ms': round(sum(samples) / len(samples), 3),
+        'min_ms': round(samples[0], 3),
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'max_ms': round(samples[-1], 3),
+        'ops_per_sec': round(iterations / elapsed, 2),
+        'queries_per_call': round((counter.queries - before) / iterations, 2) if counter else None
+    }
+
+def _uncached(call):
+    """Clear ReportCache before every call, so cached reports are measured cold."""
+    def run():
+        database._report_cache.invalidate()
+        return call()
+    return run
+
+def database_cases(user_id, meeting_id):
+    """Read paths of the Database layer, as name -> zero-argument call."""
+    today = date.today()
+    month_ahead = today + timedelta(days=30)
+    return {
+        'get_user': lambda: db.get_user(user_id=user_id),
+        'get_upcoming_meetings': lambda: db.get_upcoming_meetings(user_id, 10),
+        'get_meeting_details_with_participants': lambda: db.get_meeting_details_with_participants(meeting_id),
+        'search_meetings': lambda: db.search_meetings({'title_keyword': 'suite', 'status': 'scheduled'}),
+        'search_meetings_by_participant': lambda: db.search_meetings({
+            'participant_id': user_id, 'date_range': (today, month_ahead)
+        }),
+        'get_user_schedule': lambda: db.get_user_schedule(user_id, today, month_ahead),
+        'get_user_schedule_with_conflicts': lambda: db.get_user_schedule_with_conflicts(user_id, today, month_ahead),
+        'get_available_rooms': lambda: db.get_available_rooms(today + timedelta(days=1), '10:00', '11:00'),
+        'get_available_time_slots': lambda: db.get_available_time_slots(user_id, today + timedelta(days=1)),
+        'get_daily_schedule': lambda: db.get_daily_schedule(today + timedelta(days=1)),
+        'get_meeting_analytics': lambda: db.get_meeting_analytics(today, month_ahead),
+        'get_meeting_timeseries': lambda: db.get_meeting_timeseries(today, today + timedelta(days=365), 'week'),
+        'get_room_utilization': _uncached(lambda: db.get_room_utilization(today, month_ahead)),
+        'get_distinct_participants_approx': lambda: db.get_distinct_participants(today, month_ahead, mode='approx'),
+        'get_distinct_participants_exact': lambda: db.get_distinct_participants(today, month_ahead, mode='exact')
+    }
+
+# GET routes the suite does not measure, with the reason
+UNMEASURED_ROUTES = {
+    '/static/<path:filename>': 'serves files, not data',
+    '/metrics': 'operational, 404 unless METRICS_ENABLED',
+    '/api/admin/slow-queries': 'operational, needs an admin token'
+}
+
+def _extra_get_requests(series_id):
+    """Requests for the GET routes replay has no template for: {'GET route': (path, params)}."""
+    today = date.today()
+    return {
+        'GET /': ('/', None),
+        'GET /api/schedule/daily': ('/api/schedule/daily', {'date': (today + timedelta(days=1)).isoformat()}),
+        'GET /api/analytics/meetings/timeseries': ('/api/analytics/meetings/timeseries', {'bucket': 'week'}),
+        'GET /api/analytics/participants/distinct': ('/api/analytics/participants/distinct', None),
+        'GET /api/series/<int:series_id>/occurrences': (
+            f"/api/series/{series_id}/occurrences",
+            {'start_date': today.isoformat(), 'end_date': (today + timedelta(days=90)).isoformat()}
+        )
+    }
+
+def http_cases(client, user_id, meeting_id, student_id, series_id):
+    """
+    Every GET route of the app through the Flask test client.
+    
+    Parameters come from the replay templates, or _extra_get_requests for
+    routes without one. A GET route with neither that is not in
+    UNMEASURED_ROUTES raises, so a new endpoint cannot drop out of the suite.
+    """
+    from replay import request_templates
+    
+    today = date.today()
+    seeded_range = {'start_date': today.isoformat(), 'end_date': (today + timedelta(days=30)).isoformat()}
+    requests = {key: (path, params) for key, (path, params, _) in request_templates().items()}
+    for key, request in _extra_get_requests(series_id).items():
+        requests.setdefault(key, request)
+    
+    routes = sorted(rule.rule for rule in client.application.url_map.iter_rules()
+                    if 'GET' in rule.methods and rule.rule not in UNMEASURED_ROUTES)
+    missing = [route for route in routes if f"GET {route}" not in requests]
+    if missing:
+        raise RuntimeError(f"No benchmark case for GET {', '.join(missing)}")
+    
+    cases = {}
+    for route in routes:
+        key = f"GET {route}"
+        path, params = requests[key]
+        # Point id routes at the seeded rows
+        path = path.replace('/users/1', f"/users/{user_id}").replace('/user/1/', f"/user/{user_id}/") \
+                   .replace('/meetings/1', f"/meetings/{meeting_id}") \
+                   .replace('/students/1/', f"/students/{student_id}/")
+        if params and params.get('user_id') == 1:
+            params = dict(params, user_id=user_id)
+        # Analytics over the seeded meetings, which all lie ahead of today
+        if route.startswith('/api/analytics/'):
+            params = dict(params or {}, **seeded_range)
+        
+        def call(path=path, params=params):
+            response = client.get(path, query_string=params)
+            if not 200 <= response.status_code < 300:
+                raise RuntimeError(f"{path} returned {response.status_code}")
+        cases[key] = _uncached(call) if route == '/api/analytics/rooms/utilization' else call
+    return cases
+
+def _environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'commit': commit or None}
+
+def run_suite(scale='small', iterations=50, warmup=5, seed=42, only=None):
+    """
+    Seed a scale, measure every case and return the results document.
+    
+    Args:
+        only: Substring filter on case names
+    """
+    started = datetime.now()
+    dataset = seed_scale(scale, seed)
+    rng = random.Random(seed)
+    user_id = rng.choice(dataset['users'])
+    meeting_id = db.execute_query(
+        "SELECT MIN(meeting_id) AS id FROM meetings WHERE title LIKE %s", (BENCH_TAG + ' suite%',)
+    )[0]['id']
+    
+    from app import app
+    counter = QueryCounter()
+    Database.add_listener(counter.on_database_event)
+    cases = {}
+    try:
+        groups = {
+            'database': database_cases(user_id, meeting_id),
+            'http': http_cases(app.test_client(), user_id, meeting_id, dataset['student'], dataset['series'])
+        }
+        for group, group_cases in groups.items():
+            for name, call in group_cases.items():
+                case = f"{group}:{name}"
+                if only and only not in case:
+                    continue
+                cases[case] = measure(call, iterations, warmup, counter)
+                print(f"  {case:<64} p50 {cases[case]['p50_ms']:>9.3f} ms  "
+                      f"p95 {cases[case]['p95_ms']:>9.3f} ms  {cases[case]['queries_per_call']:>6} q/call")
+    finally:
+        Database.remove_listener(counter.on_database_event)
+    
+    return {
+        'suite': 'read-paths',
+        'scale': scale,
+        'size': SCALES[scale],
+        'seed': seed,
+        'iterations': iterations,
+        'warmup': warmup,
+        'started': started.isoformat(timespec='seconds'),
+        'dataset': {'users': len(dataset['users']), 'meetings': dataset['meetings'],
+                    'conflicts': dataset['conflicts']},
+        'environment': _environment(),
+        'cases': cases
+    }
+
+def compare_results(baseline, current, threshold=0.2, metric='p95_ms'):
+    """
+    Compare two suite documents case by case.
+    
+    A case regresses when metric grows by more than threshold (a fraction)
+    or it runs more queries per call than before.
+    
+    Returns:
+        (rows, regressions): one row per common case, and the regressed ones
+    """
+    rows, regressions = [], []
+    for case, now in current['cases'].items():
+        before = baseline['cases'].get(case)
+        if before is None:
+            continue
+        change = (now[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+        row = {
+            'case': case, 'before': before[metric], 'after': now[metric], 'change': round(change, 4),
+            'queries_before': before['queries_per_call'], 'queries_after': now['queries_per_call']
+        }
+        row['regressed'] = change > threshold or (
+            now['queries_per_call'] is not None and before['queries_per_call'] is not None
+            and now['queries_per_call'] > before['queries_per_call']
+        )
+        rows.append(row)
+        if row['regressed']:
+            regressions.append(row)
+    return rows, regressions
+
+def _print_comparison(rows, regressions, metric, threshold):
+    print("\n" + "="*60)
+    print(f"Comparison on {metric} (threshold {threshold:.0%})")
+    print("="*60)
+    for row in rows:
+        marker = '  <- regression' if row['regressed'] else ''
+        queries = '' if row['queries_before'] == row['queries_after'] else \
+            f"  queries {row['queries_before']} -> {row['queries_after']}"
+        print(f"  {row['case']:<64} {row['before']:>9.3f} -> {row['after']:>9.3f} ms "
+              f"({row['change']:+.1%}){queries}{marker}")
+    print("="*60)
+    print(f"{len(regressions)} regression(s) in {len(rows)} cases\n")
+
+def _default_output(scale):
+    return os.path.join('logs', 'benchmarks', f"{scale}-{datetime.now():%Y%m%d-%H%M%S}.json")
+
+def _print_results(title, results):
+    print("\n" + "="*60)
+    print(title)
+    print("="*60)
+    for name, value in results.items():
+        if isinstance(value, dict):
+            details = ", ".join(
+                f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in value.items()
+            )
+            print(f"  {name:<12} {details}")
+        else:
+            print(f"  {name:<12} {value:.2f}x")
+    print("="*60 + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Database write-path benchmarks")
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    bulk = sub.add_parser('bulk-meetings', help="create_meeting loop vs create_meetings_bulk")
+    bulk.add_argument('--count', type=int, default=500)
+    bulk.add_argument('--chunk-size', type=int, default=100)
+    
+    booking = sub.add_parser('booking', help="trigger vs set-based double-booking checks")
+    booking.add_argument('--count', type=int, default=100)
+    booking.add_argument('--participants', type=int, default=50)
+    
+    suite = sub.add_parser('suite', help="seed a scale and measure read paths and endpoints")
+    suite.add_argument('--scale', choices=SCALES, default='small')
+    suite.add_argument('--iterations', type=int, default=50)
+    suite.add_argument('--warmup', type=int, default=5)
+    suite.add_argument('--seed', type=int, default=42)
+    suite.add_argument('--only', help="Only cases whose name contains this")
+    suite.add_argument('--output', help="Results file (default: logs/benchmarks/<scale>-<time>.json)")
+    suite.add_argument('--baseline', help="Earlier results file to compare against")
+    suite.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown, e.g. 0.2 = 20%%")
+    suite.add_argument('--metric', default='p95_ms', help="Metric compared against the baseline")
+    
+    compare = sub.add_parser('compare', help="compare two suite results files")
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown, e.g. 0.2 = 20%%")
+    compare.add_argument('--metric', default='p95_ms', help="Metric to compare")
+    
+    sub.add_parser('cleanup', help="remove leftover benchmark rows")
+    
+    args = parser.parse_args()
+    if args.command == 'compare':
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        with open(args.current) as handle:
+            current = json.load(handle)
+        rows, regressions = compare_results(baseline, current, args.threshold, args.metric)
+        _print_comparison(rows, regressions, args.metric, args.threshold)
+        sys.exit(1 if regressions else 0)
+    
+    regressions = []
+    try:
+        if args.command == 'bulk-meetings':
+            _print_results(
+                f"Bulk meeting creation ({args.count} meetings)",
+                benchmark_bulk_meetings(args.count, args.chunk_size)
+            )
+        elif args.command == 'booking':
+            _print_results(
+                f"Booking paths ({args.count} meetings x {args.participants} participants)",
+                benchmark_booking_paths(args.count, args.participants)
+            )
+        elif args.command == 'suite':
+            print(f"\nRead-path suite ({args.scale}, {args.iterations} iterations)")
+            results = run_suite(args.scale, args.iterations, args.warmup, args.seed, args.only)
+            output = args.output or _default_output(args.scale)
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+            with open(output, 'w') as handle:
+                json.dump(results, handle, indent=2)
+            print(f"✓ Results written to {output}")
+            if args.baseline:
+                with open(args.baseline) as handle:
+                    baseline = json.load(handle)
+                rows, regressions = compare_results(baseline, results, args.threshold, args.metric)
+                _print_comparison(rows, regressions, args.metric, args.threshold)
+        elif args.command == 'cleanup':
+            print(f"Removed {cleanup(users=True)} benchmark meetings")
+    finally:
+        cleanup(users=args.command == 'suite')
+    if regressions:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+daily_schedule.py - Materialized Daily Schedule Maintenance
+Rebuilds and verifies materialized_daily_schedule against the daily_schedule view.
+
+Usage:
+    python daily_schedule.py rebuild [--start YYYY-MM-DD --end YYYY-MM-DD]
+    python daily_schedule.py check [--start ... --end ...] [--repair]
+"""
+
+import argparse
+import sys
+from datetime import datetime
+
+from database import db
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def rebuild(start_date=None, end_date=None):
+    """Backfill the materialized table from the base tables."""
+    rows = db.rebuild_daily_schedule(start_date, end_date)
+    scope = f"{start_date} to {end_date}" if start_date else "all dates"
+    print(f"✓ Rebuilt materialized daily schedule ({scope}): {rows} rows")
+    return rows
+
+def check(start_date=None, end_date=None, repair=False):
+    """Report (and optionally fix) rows that drifted from the view."""
+    report = db.check_daily_schedule(start_date, end_date)
+    drift = sum(len(ids) for ids in report.values())
+    
+    if not drift:
+        print("✓ Materialized daily schedule is consistent")
+        return True
+    
+    for kind, meeting_ids in report.items():
+        if meeting_ids:
+            preview = ', '.join(str(i) for i in meeting_ids[:20])
+            more = f" (+{len(meeting_ids) - 20} more)" if len(meeting_ids) > 20 else ""
+            print(f"✗ {kind}: {len(meeting_ids)} meeting(s): {preview}{more}")
+    
+    if repair:
+        print(f"✓ Repaired {db.repair_daily_schedule(report)} meeting(s)")
+        return True
+    return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialized daily schedule maintenance")
+    parser.add_argument('command', choices=['rebuild', 'check'])
+    parser.add_argument('--start', type=_parse_date, help="First date (YYYY-MM-DD)")
+    parser.add_argument('--end', type=_parse_date, help="Last date (YYYY-MM-DD)")
+    parser.add_argument('--repair', action='store_true', help="Refresh drifted rows (check only)")
+    args = parser.parse_args()
+    
+    if bool(args.start) != bool(args.end):
+        parser.error("--start and --end must be given together")
+    
+    if args.command == 'rebuild':
+        rebuild(args.start, args.end)
+    elif not check(args.start, args.end, args.repair):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,177 @@
 import os
 import mysql.connector
-from mysql.connector import Error, pooling
+from mysql.connector import Error, errorcode, pooling
 from dotenv import load_dotenv
 from typing import List, Dict, Any, Optional, Union, Tuple
-from datetime import date, datetime
+from datetime import date, datetime, time, timedelta
+from contextlib import contextmanager
+import contextvars
+import threading
 import json
+from bisect import bisect_left
+from time import monotonic as _monotonic, perf_counter as _perf_counter, time as _time
+import sqlite_backend
+from analytics import aggregate_timeseries, room_utilization
+from scheduler import BatchScheduler
+from sketches import HLL_STANDARD_ERROR, HyperLogLog, register_for
+from grades import gpa, summary_deltas
+from matching import availability_mask, match_students
+from recurrence import (
+    SERIES_HORIZON_DAYS, iter_occurrence_dates, iter_virtual_occurrences, materialization_window
+)
 
 # Load environment variables
 load_dotenv()
 
+# 'mysql': the server in the MYSQL_* settings (default)
+# 'sqlite': embedded database for offline tests and benchmarks, see
+# sqlite_backend.py; SQLITE_PATH, or a throwaway file per process if unset
+DB_BACKEND = os.getenv('DB_BACKEND', 'mysql')
+SQLITE_PATH = os.getenv('SQLITE_PATH') or None
+
+# 'trigger': per-row participant triggers check double-booking (default)
+# 'set': one set-based statement per meeting against user_busy_slots
+BOOKING_MODE = os.getenv('BOOKING_MODE', 'trigger')
+
+MEETING_STATUSES = ('scheduled', 'completed', 'cancelled')
+
+# Request-scoped read cache, see Database.request_scope()
+_request_scope = contextvars.ContextVar('db_request_scope', default=None)
+
+def _as_timedelta(value) -> timedelta:
+    """Normalize a TIME value (timedelta, time or 'HH:MM[:SS[.ffffff]]') to a timedelta."""
+    if isinstance(value, timedelta):
+        return value
+    if isinstance(value, time):
+        return timedelta(hours=value.hour, minutes=value.minute, seconds=value.second)
+    parts = [int(float(p)) for p in str(value).split(':')]
+    parts += [0] * (3 - len(parts))
+    return timedelta(hours=parts[0], minutes=parts[1], seconds=parts[2])
+
+def _times_overlap(start_a, end_a, start_b, end_b) -> bool:
+    """True when two time ranges on the same day overlap."""
+    return _as_timedelta(start_a) < _as_timedelta(end_b) and _as_timedelta(end_a) > _as_timedelta(start_b)
+
+def _json_time(value) -> str:
+    """Format a TIME value the way the backend renders it inside JSON_OBJECT."""
+    seconds = int(_as_timedelta(value).total_seconds())
+    text = f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    # MySQL adds microseconds; SQLite keeps the stored text
+    return text if DB_BACKEND == 'sqlite' else text + '.000000'
+
+def _best_fit_rooms(rooms: List[Dict[str, Any]], seats: int) -> List[Dict[str, Any]]:
+    """Rooms with capacity >= seats, smallest first (bisect over sorted capacities)."""
+    rooms = sorted(rooms, key=lambda room: (room['capacity'], room['room_id']))
+    capacities = [room['capacity'] for room in rooms]
+    return rooms[bisect_left(capacities, seats):]
+
+def _double_booking_error() -> Error:
+    """The participant trigger's error, raised when a busy-slot insert hits the key."""
+    return Error(
+        msg='User is already in another meeting at this time',
+        errno=errorcode.ER_SIGNAL_EXCEPTION,
+        sqlstate='45000'
+    )
+
+def _conflict_side(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """One side of a conflict, shaped like the SQL conflict_details objects."""
+    return {
+        'id': entry.get('meeting_id'),
+        'series_id': entry.get('series_id'),
+        'title': entry.get('title'),
+        'start_time': entry.get('start_time'),
+        'end_time': entry.get('end_time'),
+        'room': entry.get('room')
+    }
+
+def _merge_virtual_schedule(result: Dict[str, Any], virtual: List[Dict]) -> Dict[str, Any]:
+    """Add unmaterialized series occurrences to a schedule-with-conflicts result."""
+    schedule = list(result.get('schedule') or [])
+    conflicts = list(result.get('conflicts') or [])
+    existing = list(schedule)
+    
+    for occurrence in virtual:
+        entry = {
+            'meeting_id': None,
+            'series_id': occurrence['series_id'],
+            'title': occurrence['title'],
+            'date': occurrence['meeting_date'].isoformat(),
+            'start_time': _json_time(occurrence['start_time']),
+            'end_time': _json_time(occurrence['end_time']),
+            'room': occurrence['room_name'],
+            'participants': occurrence['participant_count']
+        }
+        for other in existing:
+            if other['date'] == entry['date'] and _times_overlap(
+                    other['start_time'], other['end_time'], entry['start_time'], entry['end_time']):
+                conflicts.append({'meeting1': _conflict_side(other), 'meeting2': _conflict_side(entry)})
+        existing.append(entry)
+        schedule.append(entry)
+    
+    schedule.sort(key=lambda e: (e['date'], e['start_time']))
+    return {'schedule': schedule, 'conflicts': conflicts}
+
+class RequestScope:
+    """Read cache shared by every thread serving one (batch) request."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = {}
+    
+    def get(self, key):
+        with self._lock:
+            rows = self._results.get(key)
+        return [dict(row) for row in rows] if rows is not None else None
+    
+    def put(self, key, rows):
+        with self._lock:
+            self._results[key] = [dict(row) for row in rows]
+    
+    def invalidate(self):
+        with self._lock:
+            self._results.clear()
+
+class ReportCache:
+    """
+    Small TTL cache for expensive reports, keyed by report name and arguments.
+    
+    Any write made through Database clears it; the TTL bounds staleness from
+    writes made by other processes.
+    """
+    
+    def __init__(self, ttl_seconds, max_entries=32):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if _monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            return entry[1]
+    
+    def put(self, key, value):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
+            self._entries[key] = (_monotonic(), value)
+    
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+_report_cache = ReportCache(int(os.getenv('REPORT_CACHE_SECONDS', 300)))
+
 class Database:
     _instance = None
     _connection_pool = None
+    # Callables told about timed database work, see add_listener()
+    _listeners = []
     
     def __new__(cls):
         if cls._instance is None:
@@ -22,47 +182,154 @@ class Database:
     @classmethod
     def _initialize_pool(cls):
         """Initialize the connection pool."""
+        if DB_BACKEND == 'sqlite':
+            cls._connection_pool = sqlite_backend.SQLiteConnectionPool(SQLITE_PATH, pool_size=5)
+            return
         try:
             cls._connection_pool = pooling.MySQLConnectionPool(
                 pool_name="meeting_pool",
                 pool_size=5,
                 pool_reset_session=True,
-                host=os.getenv('MYSQL_HOST', 'localhost'),
-                database=os.getenv('MYSQL_DATABASE', 'academic_meetings'),
-                user=os.getenv('MYSQL_USER', 'root'),
-                password=os.getenv('MYSQL_PASSWORD', ''),
-                port=int(os.getenv('MYSQL_PORT', 3306))
+                **cls._connection_settings()
             )
         except Error as e:
             print(f"Error creating connection pool: {e}")
             raise
     
+    @staticmethod
+    def _connection_settings() -> Dict[str, Any]:
+        return {
+            'host': os.getenv('MYSQL_HOST', 'localhost'),
+            'database': os.getenv('MYSQL_DATABASE', 'academic_meetings'),
+            'user': os.getenv('MYSQL_USER', 'root'),
+            'password': os.getenv('MYSQL_PASSWORD', ''),
+            'port': int(os.getenv('MYSQL_PORT', 3306))
+        }
+    
+    def open_dedicated_connection(self, **options):
+        """
+        Open a connection outside the pool for background work (e.g. EXPLAIN
+        capture, bulk loads), so it never takes a connection away from
+        requests. options go to mysql.connector.connect. The caller closes it.
+        """
+        if DB_BACKEND == 'sqlite':
+            return self._connection_pool.connect()
+        return mysql.connector.connect(**self._connection_settings(), **options)
+    
     def get_connection(self):
         """Get a connection from the pool."""
+        started, clock = _time(), _perf_counter()
         try:
             return self._connection_pool.get_connection()
         except Error as e:
             print(f"Error getting connection from pool: {e}")
             raise
+        finally:
+            if self._listeners:
+                self._notify('pool_wait', started=started, seconds=_perf_counter() - clock)
+    
+    @classmethod
+    def add_listener(cls, listener):
+        """
+        Call listener(event, info) after timed database work.
+        
+        Events:
+            'pool_wait': started, seconds
+            'json_parse': started, seconds, rows (nested results of
+                execute_complex_query, reported before their 'query')
+            'query': kind ('query' or 'complex'), query, params, started,
+                seconds, rows, error (None on success); timed from the
+                statement's execute, so pool wait is not included
+        
+        started is a Unix timestamp and seconds a duration. With no
+        listeners the timings are not even taken.
+        """
+        if listener not in cls._listeners:
+            cls._listeners.append(listener)
+    
+    @classmethod
+    def remove_listener(cls, listener):
+        if listener in cls._listeners:
+            cls._listeners.remove(listener)
+    
+    @classmethod
+    def _notify(cls, event, **info):
+        for listener in list(cls._listeners):
+            try:
+                listener(event, info)
+            except Exception as e:
+                print(f"Error in database listener: {e}")
+    
+    @contextmanager
+    def request_scope(self):
+        """
+        Share identical read queries across everything run inside the block.
+        
+        Worker threads join the scope by running in a copy of the caller's
+        context (contextvars.copy_context()). Any write issued through this
+        class clears the cache so later reads see their own changes.
+        """
+        scope = RequestScope()
+        token = _request_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            _request_scope.reset(token)
+    
+    @staticmethod
+    def _scope_key(kind: str, query: str, params) -> Optional[Tuple]:
+        """Cache key for a read in the active request scope, if any."""
+        if _request_scope.get() is None:
+            return None
+        try:
+            params = tuple(params or ())
+            hash(params)
+        except TypeError:
+            return None
+        return (kind, query, params)
+    
+    @staticmethod
+    def _invalidate_request_scope():
+        _report_cache.invalidate()
+        scope = _request_scope.get()
+        if scope is not None:
+            scope.invalidate()
     
     def execute_query(self, query: str, params: tuple = None, fetch: bool = True):
         """Execute a query and return the results."""
+        scope_key = self._scope_key('query', query, params) if fetch else None
+        if scope_key:
+            cached = _request_scope.get().get(scope_key)
+            if cached is not None:
+                return cached
+        if not fetch:
+            self._invalidate_request_scope()
+        
+        # Timed from the statement itself: pool wait is its own event and the
+        # session settings are not part of the query
+        started = clock = rows = error = None
         connection = self.get_connection()
         cursor = None
         try:
             cursor = connection.cursor(dictionary=True)
             # Enable query optimization hints
             cursor.execute("SET SESSION optimizer_switch='derived_merge=on,subquery_materialization_cost_based=on'")
+            started, clock = _time(), _perf_counter()
             cursor.execute(query, params or ())
             
             if fetch:
                 result = cursor.fetchall()
+                rows = len(result)
+                if scope_key:
+                    _request_scope.get().put(scope_key, result)
                 return result if result else []
             else:
                 connection.commit()
+                rows = cursor.rowcount
                 return cursor.lastrowid or cursor.rowcount
                 
         except Error as e:
+            error = e
             print(f"Error executing query: {e}")
             connection.rollback()
             raise
@@ -71,9 +338,19 @@ class Database:
                 cursor.close()
             if connection:
                 connection.close()
+            if self._listeners and clock is not None:
+                self._notify('query', kind='query', query=query, params=params, started=started,
+                             seconds=_perf_counter() - clock, rows=rows, error=error)
 
     def execute_complex_query(self, query: str, params: tuple = None, nested_results: bool = False):
         """Execute a complex query with support for nested results."""
+        scope_key = self._scope_key('complex:%s' % nested_results, query, params)
+        if scope_key:
+            cached = _request_scope.get().get(scope_key)
+            if cached is not None:
+                return cached
+        
+        started = clock = rows = error = None
         connection = self.get_connection()
         cursor = None
         try:
@@ -82,13 +359,18 @@ class Database:
             cursor.execute("SET SESSION optimizer_switch='derived_merge=on,subquery_materialization_cost_based=on'")
             cursor.execute("SET SESSION join_buffer_size=262144")  # Optimize for complex joins
             
+            started, clock = _time(), _perf_counter()
             cursor.execute(query, params or ())
             results = cursor.fetchall()
+            rows = len(results)
             
             if not nested_results:
+                if scope_key:
+                    _request_scope.get().put(scope_key, results)
                 return results if results else []
                 
             # Process nested results if required
+            parse_started, parse_clock = _time(), _perf_counter()
             processed_results = []
             for row in results:
                 processed_row = {}
@@ -101,10 +383,15 @@ class Database:
                     else:
                         processed_row[key] = value
                 processed_results.append(processed_row)
+            if self._listeners:
+                self._notify('json_parse', started=parse_started, seconds=_perf_counter() - parse_clock, rows=rows)
             
+            if scope_key:
+                _request_scope.get().put(scope_key, processed_results)
             return processed_results
                 
         except Error as e:
+            error = e
             print(f"Error executing complex query: {e}")
             connection.rollback()
             raise
@@ -113,6 +400,9 @@ class Database:
                 cursor.close()
             if connection:
                 connection.close()
+            if self._listeners and clock is not None:
+                self._notify('query', kind='complex', query=query, params=params, started=started,
+                             seconds=_perf_counter() - clock, rows=rows, error=error)
     
     # User Management
     def get_user(self, user_id: int = None, email: str = None) -> Optional[Dict]:
@@ -138,13 +428,28 @@ class Database:
     # Meeting Management
     def create_meeting(self, title: str, description: str, room_id: int, 
                       slot_id: int, meeting_date: date, created_by: int, 
-                      participants: List[int] = None) -> int:
-        """Create a new meeting and add participants."""
+                      participants: List[int] = None, booking_mode: str = None) -> int:
+        """
+        Create a new meeting and add participants.
+        
+        booking_mode overrides BOOKING_MODE: 'trigger' lets the per-row
+        participant triggers check double-booking, 'set' checks and records
+        the whole participant set with one statement (see _book_set_based).
+        """
+        set_based = (booking_mode or BOOKING_MODE) == 'set'
+        self._invalidate_request_scope()
+        clash = self._series_clashes([{
+            'room_id': room_id, 'slot_id': slot_id, 'meeting_date': meeting_date, 'participants': participants
+        }])
+        if clash:
+            raise Error(msg=clash[0], errno=errorcode.ER_SIGNAL_EXCEPTION, sqlstate='45000')
         # Start transaction
         connection = self.get_connection()
         cursor = None
         try:
             cursor = connection.cursor(dictionary=True)
+            if set_based:
+                cursor.execute("SET @set_based_booking = 1")
             
             # Create meeting
             query = """
@@ -164,7 +469,12 @@ class Database:
                     """,
                     participant_values
                 )
+                if set_based:
+                    self._book_set_based(cursor, [meeting_id])
             
+            self._refresh_daily_schedule([meeting_id], cursor)
+            self._rollup_created(cursor, [meeting_id])
+            self._sketch_participants([meeting_id], cursor=cursor)
             connection.commit()
             return meeting_id
             
@@ -174,10 +484,360 @@ class Database:
             raise
         finally:
             if cursor:
+                if set_based:
+                    self._clear_set_based_booking(cursor)
+                cursor.close()
+            if connection:
+                connection.close()
+    
+    def create_meeting_with_room(self, title: str, description: str, slot_id: int,
+                                 meeting_date: date, created_by: int,
+                                 participants: List[int] = None, booking_mode: str = None) -> Dict[str, int]:
+        """
+        Create a meeting in the smallest free active room that seats everyone.
+        
+        Candidates are the rooms free at the slot's time, best fit first. The
+        unique_room_slot key makes each attempt an atomic reservation: if a
+        concurrent booking takes the room first, the next candidate is tried.
+        
+        Returns:
+            {'meeting_id': int, 'room_id': int}
+        """
+        seats = len(set(participants or []) | {created_by})
+        slot = self.execute_query(
+            "SELECT start_time, end_time FROM time_slots WHERE slot_id = %s", (slot_id,)
+        )
+        if not slot:
+            raise ValueError(f"Time slot {slot_id} does not exist")
+        
+        free_rooms = self.get_available_rooms(meeting_date, slot[0]['start_time'], slot[0]['end_time'])
+        for room in _best_fit_rooms(free_rooms, seats):
+            try:
+                meeting_id = self.create_meeting(
+                    title, description, room['room_id'], slot_id, meeting_date, created_by,
+                    participants, booking_mode
+                )
+                return {'meeting_id': meeting_id, 'room_id': room['room_id']}
+            except Error as e:
+                if e.errno != errorcode.ER_DUP_ENTRY or 'unique_room_slot' not in (e.msg or ''):
+                    raise
+        raise Error(
+            msg=f'No free room seats {seats} people at this time',
+            errno=errorcode.ER_SIGNAL_EXCEPTION,
+            sqlstate='45000'
+        )
+    
+    @staticmethod
+    def _clear_set_based_booking(cursor):
+        """
+        Unset @set_based_booking without masking the error being handled.
+        
+        A failure is only logged: the pool resets the session before the
+        connection is handed out again.
+        """
+        try:
+            cursor.execute("SET @set_based_booking = NULL")
+        except Error as e:
+            print(f"Error clearing @set_based_booking: {e}")
+    
+    def _book_set_based(self, cursor, meeting_ids: List[int]):
+        """
+        Double-booking check and availability update for whole participant sets.
+        
+        Replaces the per-row participant triggers: the busy-slot insert covers
+        every participant of the given meetings in one statement and fails on
+        the (user_id, slot_id, meeting_date) key if anyone is already booked.
+        Must run inside the caller's transaction with @set_based_booking = 1.
+        """
+        placeholders = ', '.join(['%s'] * len(meeting_ids))
+        try:
+            cursor.execute(
+                f"""
+                INSERT INTO user_busy_slots (user_id, slot_id, meeting_date, meeting_id)
+                SELECT mp.user_id, m.slot_id, m.meeting_date, m.meeting_id
+                FROM meeting_participants mp
+                JOIN meetings m ON mp.meeting_id = m.meeting_id
+                WHERE mp.meeting_id IN ({placeholders})
+                AND mp.response != 'declined'
+                """,
+                tuple(meeting_ids)
+            )
+        except Error as e:
+            if e.errno != errorcode.ER_DUP_ENTRY:
+                raise
+            raise _double_booking_error()
+        cursor.execute(
+            f"""
+            INSERT INTO user_availability (user_id, slot_id, is_available, created_at)
+            SELECT mp.user_id, m.slot_id, FALSE, NOW()
+            FROM meeting_participants mp
+            JOIN meetings m ON mp.meeting_id = m.meeting_id
+            WHERE mp.meeting_id IN ({placeholders})
+            ON DUPLICATE KEY UPDATE is_available = FALSE, created_at = NOW()
+            """,
+            tuple(meeting_ids)
+        )
+    
+    def _sync_busy_slots(self, meeting_id: int, cursor=None):
+        """
+        Release busy slots of participants who declined; re-claim for the rest.
+        
+        Runs on the given cursor (inside its transaction) or on its own.
+        Re-claiming a slot someone holds for another meeting raises the
+        double-booking error, as the participant trigger does.
+        """
+        statements = (
+            """
+            DELETE FROM user_busy_slots
+            WHERE meeting_id = %s
+            AND EXISTS (
+                SELECT 1 FROM meeting_participants mp
+                WHERE mp.meeting_id = user_busy_slots.meeting_id
+                AND mp.user_id = user_busy_slots.user_id
+                AND mp.response = 'declined'
+            )
+            """,
+            """
+            INSERT INTO user_busy_slots (user_id, slot_id, meeting_date, meeting_id)
+            SELECT mp.user_id, m.slot_id, m.meeting_date, m.meeting_id
+            FROM meeting_participants mp
+            JOIN meetings m ON mp.meeting_id = m.meeting_id
+            WHERE mp.meeting_id = %s
+            AND mp.response != 'declined'
+            AND m.status = 'scheduled'
+            AND NOT EXISTS (
+                SELECT 1 FROM user_busy_slots b
+                WHERE b.user_id = mp.user_id AND b.meeting_id = m.meeting_id
+            )
+            """
+        )
+        try:
+            for statement in statements:
+                if cursor:
+                    cursor.execute(statement, (meeting_id,))
+                else:
+                    self.execute_query(statement, (meeting_id,), fetch=False)
+        except Error as e:
+            if e.errno != errorcode.ER_DUP_ENTRY:
+                raise
+            raise _double_booking_error()
+    
+    def rebuild_busy_slots(self) -> int:
+        """Recompute user_busy_slots from meetings and participants (backfill)."""
+        self.execute_query("DELETE FROM user_busy_slots", fetch=False)
+        return self.execute_query(
+            """
+            INSERT IGNORE INTO user_busy_slots (user_id, slot_id, meeting_date, meeting_id)
+            SELECT mp.user_id, m.slot_id, m.meeting_date, m.meeting_id
+            FROM meeting_participants mp
+            JOIN meetings m ON mp.meeting_id = m.meeting_id
+            WHERE m.status = 'scheduled'
+            AND mp.response != 'declined'
+            """,
+            fetch=False
+        )
+    
+    def create_meetings_bulk(self, meetings: List[Dict[str, Any]], chunk_size: int = 100,
+                             booking_mode: str = None) -> List[Dict[str, Any]]:
+        """
+        Create many meetings with multi-row inserts, one transaction per chunk.
+        
+        Args:
+            meetings: Validated meeting dicts with the create_meeting fields
+                (title, description, room_id, slot_id, meeting_date,
+                created_by, participants)
+            chunk_size: Number of meetings inserted per transaction
+            booking_mode: 'trigger' or 'set', defaults to BOOKING_MODE
+        
+        Returns:
+            One result per input item, in order:
+            {'index', 'status': 'created' | 'conflict' | 'error', 'meeting_id', 'message'}
+        """
+        self._invalidate_request_scope()
+        results = [{'index': i, 'status': None, 'meeting_id': None, 'message': None}
+                   for i in range(len(meetings))]
+        
+        # Room clashes are known before inserting anything: against existing
+        # rows (unique_room_slot ignores status) and within the batch itself.
+        pending = []
+        claimed = self._booked_room_slots(meetings)
+        series_clashes = self._series_clashes(meetings)
+        for index, meeting in enumerate(meetings):
+            if index in series_clashes:
+                results[index].update(status='conflict', message=series_clashes[index])
+                continue
+            room_key = (meeting.get('room_id'), meeting['slot_id'], meeting['meeting_date'])
+            if meeting.get('room_id') and room_key in claimed:
+                results[index].update(status='conflict', message='Room is already booked for this slot')
+                continue
+            if meeting.get('room_id'):
+                claimed.add(room_key)
+            pending.append(index)
+        
+        set_based = (booking_mode or BOOKING_MODE) == 'set'
+        connection = self.get_connection()
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            if set_based:
+                cursor.execute("SET @set_based_booking = 1")
+            for start in range(0, len(pending), chunk_size):
+                chunk = pending[start:start + chunk_size]
+                try:
+                    meeting_ids = self._insert_meeting_chunk(cursor, [meetings[i] for i in chunk], set_based)
+                    connection.commit()
+                    for index, meeting_id in zip(chunk, meeting_ids):
+                        results[index].update(status='created', meeting_id=meeting_id)
+                except Error:
+                    # Something in the chunk clashed (usually the participant
+                    # double-booking trigger); redo it row by row to find out which.
+                    connection.rollback()
+                    self._insert_meetings_one_by_one(connection, cursor, meetings, chunk, results, set_based)
+            return results
+        finally:
+            if cursor:
+                if set_based:
+                    self._clear_set_based_booking(cursor)
                 cursor.close()
             if connection:
                 connection.close()
     
+    def _series_clashes(self, meetings: List[Dict[str, Any]]) -> Dict[int, str]:
+        """
+        Direct bookings that clash with a series occurrence beyond the horizon.
+        
+        Those occurrences have no meetings row yet, so neither the room key nor
+        the participant triggers see them; they are checked the way
+        get_available_rooms and get_available_time_slots subtract them.
+        Meetings with a series_id are the series' own occurrences and skip the
+        check. Returns {index: message} for the clashing meetings.
+        """
+        direct = [(index, m) for index, m in enumerate(meetings) if not m.get('series_id')]
+        if not direct:
+            return {}
+        dates = [m['meeting_date'] for _, m in direct]
+        by_date = {}
+        for o in self.get_virtual_occurrences(min(dates), max(dates)):
+            by_date.setdefault(o['meeting_date'], []).append(o)
+        if not by_date:
+            return {}
+        
+        series_ids = list({o['series_id'] for occurrences in by_date.values() for o in occurrences})
+        placeholders = ', '.join(['%s'] * len(series_ids))
+        members = {}
+        for row in self.execute_query(
+            f"SELECT series_id, user_id FROM meeting_series_participants WHERE series_id IN ({placeholders})",
+            tuple(series_ids)
+        ):
+            members.setdefault(row['series_id'], set()).add(row['user_id'])
+        slots = {row['slot_id']: row for row in self.execute_query(
+            "SELECT slot_id, start_time, end_time FROM time_slots"
+        )}
+        
+        clashes = {}
+        for index, m in direct:
+            slot = slots.get(m['slot_id'])
+            participants = set(m.get('participants') or [])
+            for o in by_date.get(m['meeting_date'], []):
+                if m.get('room_id') and o['room_id'] == m['room_id'] and slot and _times_overlap(
+                        o['start_time'], o['end_time'], slot['start_time'], slot['end_time']):
+                    clashes[index] = 'Room is held by a recurring series at this time'
+                    break
+                if o['slot_id'] == m['slot_id'] and participants & members.get(o['series_id'], set()):
+                    clashes[index] = _double_booking_error().msg
+                    break
+        return clashes
+    
+    def _booked_room_slots(self, meetings: List[Dict[str, Any]], chunk_size: int = 500) -> set:
+        """Return the (room_id, slot_id, meeting_date) keys already taken in the DB."""
+        keys = list({(m['room_id'], m['slot_id'], m['meeting_date'])
+                     for m in meetings if m.get('room_id')})
+        booked = set()
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            query = """
+            SELECT room_id, slot_id, meeting_date
+            FROM meetings
+            WHERE (room_id, slot_id, meeting_date) IN ({})
+            """.format(', '.join(['(%s, %s, %s)'] * len(chunk)))
+            params = tuple(value for key in chunk for value in key)
+            for row in self.execute_query(query, params):
+                booked.add((row['room_id'], row['slot_id'], row['meeting_date']))
+        return booked
+    
+    def _insert_meeting_chunk(self, cursor, chunk: List[Dict[str, Any]], set_based: bool = False) -> List[int]:
+        """Insert a chunk of meetings plus participants; returns the new IDs in order."""
+        cursor.executemany(
+            """
+            INSERT INTO meetings (title, description, room_id, slot_id, meeting_date, created_by, series_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """,
+            [(m['title'], m.get('description', ''), m.get('room_id'), m['slot_id'],
+              m['meeting_date'], m['created_by'], m.get('series_id')) for m in chunk]
+        )
+        first_id = cursor.lastrowid
+        last_id = first_id + cursor.rowcount - 1
+        
+        # A multi-row insert reports only the first generated ID. InnoDB hands
+        # a simple insert consecutive IDs except in interleaved lock mode, so
+        # read back exactly that range and check it holds the chunk in order.
+        cursor.execute(
+            """
+            SELECT meeting_id, title, room_id, slot_id, meeting_date, created_by
+            FROM meetings
+            WHERE meeting_id BETWEEN %s AND %s
+            ORDER BY meeting_id
+            """,
+            (first_id, last_id)
+        )
+        inserted = {}
+        for row in cursor.fetchall():
+            key = (row['title'], row['room_id'], row['slot_id'], row['meeting_date'], row['created_by'])
+            inserted.setdefault(key, []).append(row['meeting_id'])
+        meeting_ids = []
+        for m in chunk:
+            key = (m['title'], m.get('room_id'), m['slot_id'], m['meeting_date'], m['created_by'])
+            if not inserted.get(key):
+                # IDs interleaved with another insert; the caller retries the
+                # chunk one meeting at a time
+                raise Error(msg=f'Meeting IDs {first_id}-{last_id} are not all from this chunk')
+            meeting_ids.append(inserted[key].pop(0))
+        
+        participant_values = [
+            (meeting_id, user_id, m.get('participant_response', 'pending'))
+            for meeting_id, m in zip(meeting_ids, chunk)
+            for user_id in (m.get('participants') or [])
+        ]
+        if participant_values:
+            cursor.executemany(
+                """
+                INSERT INTO meeting_participants (meeting_id, user_id, response)
+                VALUES (%s, %s, %s)
+                """,
+                participant_values
+            )
+            if set_based:
+                self._book_set_based(cursor, meeting_ids)
+        self._refresh_daily_schedule(meeting_ids, cursor)
+        self._rollup_created(cursor, meeting_ids)
+        self._sketch_participants(meeting_ids, cursor=cursor)
+        return meeting_ids
+    
+    def _insert_meetings_one_by_one(self, connection, cursor, meetings, indexes, results, set_based=False):
+        """Fallback for a failed chunk: one savepoint per meeting, one commit."""
+        for index in indexes:
+            cursor.execute("SAVEPOINT bulk_item")
+            try:
+                results[index].update(
+                    status='created',
+                    meeting_id=self._insert_meeting_chunk(cursor, [meetings[index]], set_based)[0]
+                )
+            except Error as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT bulk_item")
+                is_conflict = e.errno in (errorcode.ER_DUP_ENTRY, errorcode.ER_SIGNAL_EXCEPTION)
+                results[index].update(status='conflict' if is_conflict else 'error', message=e.msg)
+        connection.commit()
+    
     def get_upcoming_meetings(self, user_id: int = None, limit: int = 10) -> List[Dict]:
         """Get upcoming meetings, optionally filtered by user."""
         query = """
@@ -207,114 +867,1604 @@ class Database:
         query += " ORDER BY m.meeting_date, ts.start_time LIMIT %s"
         return self.execute_query(query, params + (limit,))
     
-    # Room Management
-    def get_available_rooms(self, date: date, start_time: str, end_time: str) -> List[Dict]:
-        """Get available rooms for a specific time slot."""
-        query = """
-        SELECT r.*
-        FROM meeting_rooms r
-        WHERE r.is_active = TRUE
-        AND r.room_id NOT IN (
-            SELECT m.room_id 
-            FROM meetings m
-            JOIN time_slots ts ON m.slot_id = ts.slot_id
-            WHERE m.meeting_date = %s
-            AND m.status != 'cancelled'
-            AND (
-                (ts.start_time < %s AND ts.end_time > %s) OR
-                (ts.start_time < %s AND ts.end_time > %s) OR
-                (ts.start_time >= %s AND ts.end_time <= %s)
-            )
-        )
-        """
-        return self.execute_query(
-            query, 
-            (date, end_time, start_time, start_time, end_time, start_time, end_time)
-        )
+    def cancel_meeting(self, meeting_id: int) -> int:
+        """Cancel a meeting; returns the number of rows changed."""
+        return self.cancel_meetings([meeting_id])
     
-    # Time Slot Management
-    def get_available_time_slots(self, user_id: int, date: date) -> List[Dict]:
-        """Get available time slots for a user on a specific date."""
-        query = """
-        SELECT ts.*
-        FROM time_slots ts
-        WHERE ts.slot_id NOT IN (
-            -- Slots where user has other meetings
-            SELECT m.slot_id
-            FROM meetings m
-            JOIN meeting_participants mp ON m.meeting_id = mp.meeting_id
-            WHERE m.meeting_date = %s
-            AND mp.user_id = %s
-            AND mp.response = 'accepted'
-            AND m.status != 'cancelled'
-            
-            UNION
+    def cancel_meetings(self, meeting_ids: List[int]) -> int:
+        """Cancel several meetings in one transaction; returns how many changed."""
+        if not meeting_ids:
+            return 0
+        self._invalidate_request_scope()
+        connection = self.get_connection()
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            placeholders = ', '.join(['%s'] * len(meeting_ids))
+            cursor.execute(
+                f"""
+                SELECT meeting_id, meeting_date, status
+                FROM meetings
+                WHERE meeting_id IN ({placeholders}) AND status != 'cancelled'
+                FOR UPDATE
+                """,
+                tuple(meeting_ids)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                connection.rollback()
+                return 0
             
-            -- Slots where user is marked as unavailable
-            SELECT ua.slot_id
-            FROM user_availability ua
-            WHERE ua.user_id = %s
-            AND ua.is_available = FALSE
-        )
-        ORDER BY ts.start_time
-        """
-        return self.execute_query(query, (date, user_id, user_id))
+            changed_ids = [row['meeting_id'] for row in rows]
+            placeholders = ', '.join(['%s'] * len(changed_ids))
+            cursor.execute(
+                f"UPDATE meetings SET status = 'cancelled' WHERE meeting_id IN ({placeholders})",
+                tuple(changed_ids)
+            )
+            self._rollup_status_changes(
+                cursor, [(row['meeting_date'], row['status'], 'cancelled') for row in rows]
+            )
+            self._refresh_daily_schedule(changed_ids, cursor)
+            connection.commit()
+            return len(changed_ids)
+        except Error as e:
+            connection.rollback()
+            print(f"Error cancelling meetings: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
     
-    # Participant Management
-    def update_participant_response(self, meeting_id: int, user_id: int, response: str) -> bool:
-        """Update a participant's response to a meeting invite."""
-        query = """
-        INSERT INTO meeting_participants (meeting_id, user_id, response)
-        VALUES (%s, %s, %s)
-        ON DUPLICATE KEY UPDATE response = %s, updated_at = NOW()
+    def update_meeting(self, meeting_id: int, fields: Dict[str, Any]) -> int:
+        """
+        Update the descriptive fields of a meeting.
+        
+        Args:
+            meeting_id: Meeting to update
+            fields: Any of title, description, room_id
+        
+        Returns:
+            Number of rows changed
         """
+        allowed = [name for name in ('title', 'description', 'room_id') if name in fields]
+        if not allowed:
+            return 0
+        assignments = ', '.join(f"{name} = %s" for name in allowed)
+        self._invalidate_request_scope()
+        connection = self.get_connection()
+        cursor = None
         try:
-            self.execute_query(query, (meeting_id, user_id, response, response), fetch=False)
-            return True
-        except Error:
-            return False
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(
+                f"UPDATE meetings SET {assignments} WHERE meeting_id = %s",
+                tuple(fields[name] for name in allowed) + (meeting_id,)
+            )
+            changed = cursor.rowcount
+            self._refresh_daily_schedule([meeting_id], cursor)
+            connection.commit()
+            return changed
+        except Error as e:
+            connection.rollback()
+            print(f"Error updating meeting: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
     
-    # Reporting
-    def get_meeting_analytics(self, start_date: date, end_date: date) -> Dict[str, Any]:
-        """Get analytics for meetings in a date range."""
-        # Get basic counts
-        query_counts = """
-        SELECT 
-            COUNT(*) as total_meetings,
-            SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
-            SUM(CASE WHEN status = 'cancelled' THEN 1 ELSE 0 END) as cancelled,
-            SUM(CASE WHEN status = 'scheduled' THEN 1 ELSE 0 END) as scheduled
-        FROM meetings
-        WHERE meeting_date BETWEEN %s AND %s
+    # Daily Schedule Materialization
+    def _refresh_daily_schedule(self, meeting_ids: List[int], cursor=None):
         """
-        counts = self.execute_query(query_counts, (start_date, end_date))[0]
+        Bring materialized_daily_schedule in line for the given meetings.
         
-        # Get top organizers
-        query_organizers = """
-        SELECT 
-            u.name as organizer,
-            COUNT(*) as meetings_created,
-            AVG(TIMESTAMPDIFF(MINUTE, ts.start_time, ts.end_time)) as avg_duration_minutes
-        FROM meetings m
-        JOIN users u ON m.created_by = u.user_id
-        JOIN time_slots ts ON m.slot_id = ts.slot_id
-        WHERE m.meeting_date BETWEEN %s AND %s
-        GROUP BY u.user_id
-        ORDER BY meetings_created DESC
-        LIMIT 5
+        Runs on the given cursor (inside its transaction) or in a transaction
+        of its own, so readers never see the meetings missing in between.
         """
-        top_organizers = self.execute_query(query_organizers, (start_date, end_date))
+        if not meeting_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(meeting_ids))
+        statements = (
+            f"DELETE FROM materialized_daily_schedule WHERE meeting_id IN ({placeholders})",
+            f"""
+            INSERT INTO materialized_daily_schedule
+                (meeting_id, title, meeting_date, start_time, end_time, room_name, organizer, status)
+            SELECT meeting_id, title, meeting_date, start_time, end_time, room_name, organizer, status
+            FROM daily_schedule
+            WHERE meeting_id IN ({placeholders})
+            """
+        )
+        if cursor:
+            for statement in statements:
+                cursor.execute(statement, tuple(meeting_ids))
+            return
         
-        return {
-            "period": {"start": start_date, "end": end_date},
-            "counts": counts,
-            "top_organizers": top_organizers
-        }
-    
-    # Utility methods
-    def check_room_availability(self, room_id: int, date: date, start_time: str, end_time: str) -> bool:
-        """Check if a room is available for a specific time slot."""
-        query = """
+        self._invalidate_request_scope()
+        connection = self.get_connection()
+        try:
+            cursor = connection.cursor()
+            for statement in statements:
+                cursor.execute(statement, tuple(meeting_ids))
+            connection.commit()
+        except Error as e:
+            connection.rollback()
+            print(f"Error refreshing daily schedule: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            connection.close()
+    
+    def get_daily_schedule(self, target_date: date) -> List[Dict]:
+        """Scheduled meetings for one day, read from the materialized table only."""
+        query = """
+        SELECT meeting_id, title, meeting_date, start_time, end_time, room_name, organizer, status
+        FROM materialized_daily_schedule
+        WHERE meeting_date = %s
+        ORDER BY start_time
+        """
+        return self.execute_query(query, (target_date,))
+    
+    def rebuild_daily_schedule(self, start_date: date = None, end_date: date = None) -> int:
+        """Recompute materialized_daily_schedule (optionally for a date range) from the base tables."""
+        condition, params = "", ()
+        if start_date and end_date:
+            condition, params = "WHERE meeting_date BETWEEN %s AND %s", (start_date, end_date)
+        self._invalidate_request_scope()
+        connection = self.get_connection()
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(f"DELETE FROM materialized_daily_schedule {condition}", params)
+            cursor.execute(
+                f"""
+                INSERT INTO materialized_daily_schedule
+                    (meeting_id, title, meeting_date, start_time, end_time, room_name, organizer, status)
+                SELECT meeting_id, title, meeting_date, start_time, end_time, room_name, organizer, status
+                FROM daily_schedule
+                {condition}
+                """,
+                params
+            )
+            rows = cursor.rowcount
+            connection.commit()
+            return rows
+        except Error as e:
+            connection.rollback()
+            print(f"Error rebuilding daily schedule: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+    
+    def check_daily_schedule(self, start_date: date = None, end_date: date = None) -> Dict[str, List[int]]:
+        """
+        Compare materialized_daily_schedule with the daily_schedule view.
+        
+        Returns:
+            {'missing': [...], 'extra': [...], 'mismatched': [...]} meeting IDs
+        """
+        view_range, table_range, params = "", "", ()
+        if start_date and end_date:
+            view_range = "AND v.meeting_date BETWEEN %s AND %s"
+            table_range = "AND s.meeting_date BETWEEN %s AND %s"
+            params = (start_date, end_date)
+        missing = self.execute_query(
+            f"""
+            SELECT v.meeting_id FROM daily_schedule v
+            LEFT JOIN materialized_daily_schedule s ON s.meeting_id = v.meeting_id
+            WHERE s.meeting_id IS NULL {view_range}
+            """,
+            params
+        )
+        extra = self.execute_query(
+            f"""
+            SELECT s.meeting_id FROM materialized_daily_schedule s
+            LEFT JOIN daily_schedule v ON v.meeting_id = s.meeting_id
+            WHERE v.meeting_id IS NULL {table_range}
+            """,
+            params
+        )
+        mismatched = self.execute_query(
+            f"""
+            SELECT s.meeting_id FROM materialized_daily_schedule s
+            JOIN daily_schedule v ON v.meeting_id = s.meeting_id
+            WHERE NOT (s.title <=> v.title AND s.meeting_date <=> v.meeting_date
+                AND s.start_time <=> v.start_time AND s.end_time <=> v.end_time
+                AND s.room_name <=> v.room_name AND s.organizer <=> v.organizer
+                AND s.status <=> v.status) {table_range}
+            """,
+            params
+        )
+        return {
+            'missing': [row['meeting_id'] for row in missing],
+            'extra': [row['meeting_id'] for row in extra],
+            'mismatched': [row['meeting_id'] for row in mismatched]
+        }
+    
+    def repair_daily_schedule(self, report: Dict[str, List[int]]) -> int:
+        """Refresh every meeting listed in a check_daily_schedule report."""
+        meeting_ids = sorted(set(report['missing'] + report['extra'] + report['mismatched']))
+        for start in range(0, len(meeting_ids), 500):
+            self._refresh_daily_schedule(meeting_ids[start:start + 500])
+        return len(meeting_ids)
+    
+    # Recurring Meeting Series
+    def create_meeting_series(self, title: str, description: str, room_id: Optional[int],
+                              slot_id: int, start_date: date, until_date: date, created_by: int,
+                              participants: List[int] = None, interval_weeks: int = 1) -> Dict[str, Any]:
+        """
+        Create a weekly meeting series and materialize its near-horizon occurrences.
+        
+        Returns:
+            {'series_id': int, 'materialized': result of materialize_series}
+        """
+        self._invalidate_request_scope()
+        connection = self.get_connection()
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(
+                """
+                INSERT INTO meeting_series
+                    (title, description, room_id, slot_id, start_date, until_date, interval_weeks, created_by)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                """,
+                (title, description, room_id, slot_id, start_date, until_date, interval_weeks, created_by)
+            )
+            series_id = cursor.lastrowid
+            if participants:
+                cursor.executemany(
+                    "INSERT INTO meeting_series_participants (series_id, user_id) VALUES (%s, %s)",
+                    [(series_id, user_id) for user_id in set(participants)]
+                )
+            connection.commit()
+        except Error as e:
+            connection.rollback()
+            print(f"Error creating meeting series: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+        
+        return {'series_id': series_id, 'materialized': self.materialize_series(series_id=series_id)}
+    
+    def _series_rows(self, start_date: date, end_date: date, series_id: int = None,
+                     participant_id: int = None, room_id: int = None,
+                     unmaterialized_only: bool = True) -> List[Dict]:
+        """Active series (joined with slot, room and organizer) that overlap a window."""
+        conditions = ["s.status = 'active'", "s.start_date <= %s", "s.until_date >= %s"]
+        params = [end_date, start_date]
+        if unmaterialized_only:
+            conditions.append("(s.materialized_until IS NULL OR s.materialized_until < %s)")
+            params.append(end_date)
+        if start_date == end_date:
+            conditions.append("ts.day_of_week = LOWER(DAYNAME(%s))")
+            params.append(start_date)
+        if series_id:
+            conditions.append("s.series_id = %s")
+            params.append(series_id)
+        if participant_id:
+            conditions.append("s.series_id IN (SELECT series_id FROM meeting_series_participants WHERE user_id = %s)")
+            params.append(participant_id)
+        if room_id:
+            conditions.append("s.room_id = %s")
+            params.append(room_id)
+        
+        query = f"""
+        SELECT s.*, ts.start_time, ts.end_time, ts.day_of_week,
+               mr.name as room_name, u.name as organizer_name,
+               (SELECT COUNT(*) FROM meeting_series_participants sp
+                WHERE sp.series_id = s.series_id) as participant_count
+        FROM meeting_series s
+        JOIN time_slots ts ON s.slot_id = ts.slot_id
+        JOIN users u ON s.created_by = u.user_id
+        LEFT JOIN meeting_rooms mr ON s.room_id = mr.room_id
+        WHERE {' AND '.join(conditions)}
+        """
+        return self.execute_query(query, tuple(params))
+    
+    def _series_exceptions(self, series_ids: List[int], start_date: date, end_date: date) -> Dict[int, set]:
+        """Skipped occurrence dates per series within a window."""
+        if not series_ids:
+            return {}
+        placeholders = ', '.join(['%s'] * len(series_ids))
+        rows = self.execute_query(
+            f"""
+            SELECT series_id, occurrence_date
+            FROM meeting_series_exceptions
+            WHERE series_id IN ({placeholders})
+            AND occurrence_date BETWEEN %s AND %s
+            """,
+            (*series_ids, start_date, end_date)
+        )
+        exceptions = {}
+        for row in rows:
+            exceptions.setdefault(row['series_id'], set()).add(row['occurrence_date'])
+        return exceptions
+    
+    def get_virtual_occurrences(self, start_date: date, end_date: date, **filters) -> List[Dict]:
+        """
+        Occurrences of active series in a window that are not in meetings yet.
+        
+        Args:
+            start_date: First date of the window
+            end_date: Last date of the window
+            **filters: series_id, participant_id or room_id (see _series_rows)
+        """
+        series = self._series_rows(start_date, end_date, **filters)
+        if not series:
+            return []
+        exceptions = self._series_exceptions([s['series_id'] for s in series], start_date, end_date)
+        return list(iter_virtual_occurrences(series, start_date, end_date, exceptions))
+    
+    def get_series_occurrences(self, series_id: int, start_date: date, end_date: date) -> List[Dict]:
+        """All occurrences of one series in a window, materialized or not."""
+        series = self._series_rows(start_date, end_date, series_id=series_id, unmaterialized_only=False)
+        materialized = self.execute_query(
+            """
+            SELECT m.meeting_id, m.series_id, m.title, m.meeting_date, m.slot_id,
+                   ts.start_time, ts.end_time, m.room_id, m.status
+            FROM meetings m
+            JOIN time_slots ts ON m.slot_id = ts.slot_id
+            WHERE m.series_id = %s AND m.meeting_date BETWEEN %s AND %s
+            """,
+            (series_id, start_date, end_date)
+        )
+        for row in materialized:
+            row['is_virtual'] = False
+        
+        virtual = []
+        if series:
+            exceptions = self._series_exceptions([series_id], start_date, end_date)
+            virtual = list(iter_virtual_occurrences(series, start_date, end_date, exceptions))
+        return sorted(materialized + virtual, key=lambda o: o['meeting_date'])
+    
+    def materialize_series(self, horizon_days: int = None, series_id: int = None) -> Dict[str, Any]:
+        """
+        Write series occurrences inside the horizon into meetings.
+        
+        Occurrences that clash with an existing booking are recorded as
+        'conflict' exceptions so they are not generated again.
+        
+        Returns:
+            {'series': int, 'created': int, 'conflicts': [{'series_id', 'meeting_date', 'message'}]}
+        """
+        today = date.today()
+        horizon = SERIES_HORIZON_DAYS if horizon_days is None else horizon_days
+        horizon_end = today + timedelta(days=horizon)
+        series = self._series_rows(today, horizon_end, series_id=series_id)
+        if not series:
+            return {'series': 0, 'created': 0, 'conflicts': []}
+        
+        series_ids = [s['series_id'] for s in series]
+        exceptions = self._series_exceptions(series_ids, today, horizon_end)
+        placeholders = ', '.join(['%s'] * len(series_ids))
+        members = {}
+        for row in self.execute_query(
+            f"SELECT series_id, user_id FROM meeting_series_participants WHERE series_id IN ({placeholders})",
+            tuple(series_ids)
+        ):
+            members.setdefault(row['series_id'], []).append(row['user_id'])
+        
+        meetings = []
+        materialized_until = {}
+        for s in series:
+            window = materialization_window(s, today, horizon)
+            if not window:
+                continue
+            materialized_until[s['series_id']] = window[1]
+            skipped = exceptions.get(s['series_id'], frozenset())
+            for occurrence_date in iter_occurrence_dates(s, window[0], window[1], skipped):
+                meetings.append({
+                    'title': s['title'],
+                    'description': s['description'] or '',
+                    'room_id': s['room_id'],
+                    'slot_id': s['slot_id'],
+                    'meeting_date': occurrence_date,
+                    'created_by': s['created_by'],
+                    'series_id': s['series_id'],
+                    'participants': members.get(s['series_id'], []),
+                    # Joining a series accepts its occurrences
+                    'participant_response': 'accepted'
+                })
+        
+        results = self.create_meetings_bulk(meetings) if meetings else []
+        conflicts = [
+            {'series_id': m['series_id'], 'meeting_date': m['meeting_date'], 'message': r['message']}
+            for m, r in zip(meetings, results) if r['status'] != 'created'
+        ]
+        if conflicts:
+            self.execute_query(
+                f"""
+                INSERT IGNORE INTO meeting_series_exceptions (series_id, occurrence_date, reason)
+                VALUES {', '.join(["(%s, %s, 'conflict')"] * len(conflicts))}
+                """,
+                tuple(v for c in conflicts for v in (c['series_id'], c['meeting_date'])),
+                fetch=False
+            )
+        for sid, until in materialized_until.items():
+            self.execute_query(
+                "UPDATE meeting_series SET materialized_until = %s WHERE series_id = %s",
+                (until, sid),
+                fetch=False
+            )
+        
+        return {
+            'series': len(materialized_until),
+            'created': sum(1 for r in results if r['status'] == 'created'),
+            'conflicts': conflicts
+        }
+    
+    def skip_series_occurrence(self, series_id: int, occurrence_date: date) -> bool:
+        """Drop one occurrence of a series, cancelling it if already materialized."""
+        self.execute_query(
+            """
+            INSERT INTO meeting_series_exceptions (series_id, occurrence_date, reason)
+            VALUES (%s, %s, 'skipped')
+            ON DUPLICATE KEY UPDATE reason = 'skipped'
+            """,
+            (series_id, occurrence_date),
+            fetch=False
+        )
+        cancelled = self.execute_query(
+            "SELECT meeting_id FROM meetings WHERE series_id = %s AND meeting_date = %s AND status = 'scheduled'",
+            (series_id, occurrence_date)
+        )
+        self.cancel_meetings([row['meeting_id'] for row in cancelled])
+        return True
+    
+    def cancel_series(self, series_id: int) -> bool:
+        """Cancel a series and its upcoming materialized occurrences."""
+        updated = self.execute_query(
+            "UPDATE meeting_series SET status = 'cancelled' WHERE series_id = %s AND status = 'active'",
+            (series_id,),
+            fetch=False
+        )
+        meeting_ids = [row['meeting_id'] for row in self.execute_query(
+            """
+            SELECT meeting_id FROM meetings
+            WHERE series_id = %s AND meeting_date >= CURDATE() AND status = 'scheduled'
+            """,
+            (series_id,)
+        )]
+        self.cancel_meetings(meeting_ids)
+        return bool(updated)
+    
+    # Batch Scheduling
+    def schedule_meetings(self, requests: List[Dict[str, Any]], dry_run: bool = False,
+                          chunk_size: int = 100) -> List[Dict[str, Any]]:
+        """
+        Find a slot (and room) for many meeting requests at once and book them.
+        
+        Existing meetings, series occurrences and room bookings in the combined
+        window are loaded into a BatchScheduler once; the placements are then
+        written with create_meetings_bulk.
+        
+        Args:
+            requests: Validated dicts with title, description, created_by,
+                participants, window_start, window_end, room_required and
+                optional min_capacity / min_duration_minutes
+            dry_run: Return the plan without creating meetings
+            chunk_size: Meetings per bulk insert transaction
+        
+        Returns:
+            One result per request, in order: {'index', 'status':
+            'scheduled' | 'unschedulable' | 'conflict' | 'error', 'meeting_id',
+            'meeting_date', 'slot_id', 'room_id', 'reason'}
+        """
+        if not requests:
+            return []
+        start_date = min(r['window_start'] for r in requests)
+        end_date = max(r['window_end'] for r in requests)
+        people = {user_id for r in requests for user_id in [r['created_by'], *r.get('participants', [])]}
+        scheduler = self._load_scheduler(start_date, end_date, people)
+        
+        results = scheduler.schedule([
+            dict(r, people=[r['created_by'], *r.get('participants', [])]) for r in requests
+        ])
+        for result in results:
+            result['meeting_id'] = None
+        
+        scheduled = [result for result in results if result['status'] == 'scheduled']
+        if dry_run or not scheduled:
+            return results
+        
+        created = self.create_meetings_bulk(
+            [
+                {
+                    'title': requests[result['index']]['title'],
+                    'description': requests[result['index']].get('description', ''),
+                    'room_id': result['room_id'],
+                    'slot_id': result['slot_id'],
+                    'meeting_date': result['meeting_date'],
+                    'created_by': requests[result['index']]['created_by'],
+                    'participants': requests[result['index']].get('participants', [])
+                }
+                for result in scheduled
+            ],
+            chunk_size=chunk_size
+        )
+        # Bookings made since the data was loaded surface as conflicts here
+        for result, outcome in zip(scheduled, created):
+            if outcome['status'] == 'created':
+                result['meeting_id'] = outcome['meeting_id']
+            else:
+                result.update(status=outcome['status'], reason=outcome['message'])
+        return results
+    
+    def _load_scheduler(self, start_date: date, end_date: date, people) -> BatchScheduler:
+        """
+        BatchScheduler over a window with the existing commitments of `people`
+        (meetings, series occurrences) and of every active room loaded.
+        """
+        scheduler = BatchScheduler(
+            self.execute_query("SELECT slot_id, start_time, end_time, day_of_week FROM time_slots"),
+            self.execute_query("SELECT room_id, name, capacity FROM meeting_rooms WHERE is_active = TRUE"),
+            start_date,
+            end_date
+        )
+        
+        placeholders = ', '.join(['%s'] * len(people))
+        user_busy = self.execute_query(
+            f"""
+            SELECT mp.user_id, m.meeting_date, ts.start_time, ts.end_time
+            FROM meetings m
+            JOIN meeting_participants mp ON m.meeting_id = mp.meeting_id
+            JOIN time_slots ts ON m.slot_id = ts.slot_id
+            WHERE m.meeting_date BETWEEN %s AND %s
+            AND m.status = 'scheduled'
+            AND mp.response != 'declined'
+            AND mp.user_id IN ({placeholders})
+            UNION ALL
+            SELECT m.created_by, m.meeting_date, ts.start_time, ts.end_time
+            FROM meetings m
+            JOIN time_slots ts ON m.slot_id = ts.slot_id
+            WHERE m.meeting_date BETWEEN %s AND %s
+            AND m.status = 'scheduled'
+            AND m.created_by IN ({placeholders})
+            """,
+            (start_date, end_date, *people, start_date, end_date, *people)
+        )
+        for row in user_busy:
+            scheduler.mark_user_busy(row['user_id'], row['meeting_date'], row['start_time'], row['end_time'])
+        
+        room_busy = self.execute_query(
+            """
+            SELECT m.room_id, m.slot_id, m.meeting_date, m.status, ts.start_time, ts.end_time
+            FROM meetings m
+            JOIN time_slots ts ON m.slot_id = ts.slot_id
+            WHERE m.meeting_date BETWEEN %s AND %s
+            AND m.room_id IS NOT NULL
+            """,
+            (start_date, end_date)
+        )
+        for row in room_busy:
+            scheduler.mark_room_busy(
+                row['room_id'], row['meeting_date'], row['start_time'], row['end_time'],
+                # unique_room_slot still holds the exact slot of a cancelled meeting
+                slot_id=row['slot_id'] if row['status'] == 'cancelled' else None
+            )
+        
+        occurrences = self.get_virtual_occurrences(start_date, end_date)
+        series_members = {}
+        if occurrences:
+            series_ids = list({o['series_id'] for o in occurrences})
+            rows = self.execute_query(
+                f"""
+                SELECT series_id, user_id FROM meeting_series_participants
+                WHERE series_id IN ({', '.join(['%s'] * len(series_ids))})
+                """,
+                tuple(series_ids)
+            )
+            for row in rows:
+                series_members.setdefault(row['series_id'], set()).add(row['user_id'])
+        for o in occurrences:
+            for user_id in series_members.get(o['series_id'], set()) | {o['created_by']}:
+                scheduler.mark_user_busy(user_id, o['meeting_date'], o['start_time'], o['end_time'])
+            if o['room_id']:
+                scheduler.mark_room_busy(o['room_id'], o['meeting_date'], o['start_time'], o['end_time'])
+        return scheduler
+    
+    # Room Management
+    def get_available_rooms(self, date: date, start_time: str, end_time: str) -> List[Dict]:
+        """Get available rooms for a specific time slot."""
+        query = """
+        SELECT r.*
+        FROM meeting_rooms r
+        WHERE r.is_active = TRUE
+        AND r.room_id NOT IN (
+            SELECT m.room_id 
+            FROM meetings m
+            JOIN time_slots ts ON m.slot_id = ts.slot_id
+            WHERE m.meeting_date = %s
+            AND m.status != 'cancelled'
+            AND (
+                (ts.start_time < %s AND ts.end_time > %s) OR
+                (ts.start_time < %s AND ts.end_time > %s) OR
+                (ts.start_time >= %s AND ts.end_time <= %s)
+            )
+        )
+        """
+        rooms = self.execute_query(
+            query, 
+            (date, end_time, start_time, start_time, end_time, start_time, end_time)
+        )
+        # Rooms held by series occurrences beyond the materialized horizon
+        busy = {
+            o['room_id'] for o in self.get_virtual_occurrences(date, date)
+            if o['room_id'] and _times_overlap(o['start_time'], o['end_time'], start_time, end_time)
+        }
+        return [room for room in rooms if room['room_id'] not in busy]
+    
+    # Time Slot Management
+    def get_available_time_slots(self, user_id: int, date: date) -> List[Dict]:
+        """Get available time slots for a user on a specific date."""
+        query = """
+        SELECT ts.*
+        FROM time_slots ts
+        WHERE ts.slot_id NOT IN (
+            -- Slots where user has other meetings
+            SELECT m.slot_id
+            FROM meetings m
+            JOIN meeting_participants mp ON m.meeting_id = mp.meeting_id
+            WHERE m.meeting_date = %s
+            AND mp.user_id = %s
+            AND mp.response = 'accepted'
+            AND m.status != 'cancelled'
+            
+            UNION
+            
+            -- Slots where user is marked as unavailable
+            SELECT ua.slot_id
+            FROM user_availability ua
+            WHERE ua.user_id = %s
+            AND ua.is_available = FALSE
+        )
+        ORDER BY ts.start_time
+        """
+        slots = self.execute_query(query, (date, user_id, user_id))
+        busy = {o['slot_id'] for o in self.get_virtual_occurrences(date, date, participant_id=user_id)}
+        return [slot for slot in slots if slot['slot_id'] not in busy]
+    
+    # Participant Management
+    def update_participant_response(self, meeting_id: int, user_id: int, response: str) -> bool:
+        """Update a participant's response to a meeting invite."""
+        query = """
+        INSERT INTO meeting_participants (meeting_id, user_id, response)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE response = %s, updated_at = NOW()
+        """
+        self._invalidate_request_scope()
+        connection = self.get_connection()
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(query, (meeting_id, user_id, response, response))
+            # A response that re-claims a taken slot is rolled back with it
+            self._sync_busy_slots(meeting_id, cursor)
+            self._sketch_participants([meeting_id], [user_id], cursor)
+            connection.commit()
+            return True
+        except Error:
+            connection.rollback()
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+    
+    def update_participant_responses_bulk(self, meeting_id: int, responses: List[Dict[str, Any]]) -> List[Dict]:
+        """
+        Record many participant responses for one meeting in one transaction.
+        
+        Args:
+            meeting_id: Meeting the responses belong to
+            responses: Validated [{'user_id': int, 'response': str}, ...];
+                when a user appears twice the last entry wins
+        
+        Returns:
+            The rows whose response actually changed:
+            [{'user_id', 'previous_response', 'response'}, ...]
+            (previous_response is None for newly added participants),
+            or None when the meeting does not exist
+        """
+        latest = {}
+        for item in responses:
+            latest[item['user_id']] = item['response']
+        if not latest:
+            return []
+        user_ids = list(latest)
+        
+        self._invalidate_request_scope()
+        connection = self.get_connection()
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("SELECT meeting_id FROM meetings WHERE meeting_id = %s", (meeting_id,))
+            if not cursor.fetchall():
+                return None
+            placeholders = ', '.join(['%s'] * len(user_ids))
+            cursor.execute(
+                f"""
+                SELECT user_id, response
+                FROM meeting_participants
+                WHERE meeting_id = %s AND user_id IN ({placeholders})
+                FOR UPDATE
+                """,
+                (meeting_id, *user_ids)
+            )
+            previous = {row['user_id']: row['response'] for row in cursor.fetchall()}
+            
+            cursor.execute(
+                f"""
+                INSERT INTO meeting_participants (meeting_id, user_id, response)
+                VALUES {', '.join(['(%s, %s, %s)'] * len(user_ids))}
+                ON DUPLICATE KEY UPDATE response = VALUES(response), updated_at = NOW()
+                """,
+                tuple(value for user_id in user_ids for value in (meeting_id, user_id, latest[user_id]))
+            )
+            self._sync_busy_slots(meeting_id, cursor)
+            new_user_ids = [user_id for user_id in user_ids if user_id not in previous]
+            if new_user_ids:
+                self._sketch_participants([meeting_id], new_user_ids, cursor)
+            connection.commit()
+        except Error as e:
+            connection.rollback()
+            print(f"Error updating participant responses: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+        
+        return [
+            {'user_id': user_id, 'previous_response': previous.get(user_id), 'response': latest[user_id]}
+            for user_id in user_ids
+            if previous.get(user_id) != latest[user_id]
+        ]
+    
+    # Mentoring
+    def match_mentees(self, student_ids: List[int] = None, interests: Dict[int, List[str]] = None,
+                      use_availability: bool = False, year: int = 1, dry_run: bool = False,
+                      batch_size: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Assign students without a FAM to FAMs in one transaction.
+        
+        The FAM rows are locked for the whole match so concurrent runs cannot
+        overfill a FAM; mentee counters are then bumped by the number of new
+        assignments instead of being recounted.
+        
+        Args:
+            student_ids: Students to place; default every unassigned student of `year`
+            interests: {student_id: [keyword, ...]} matched against FAM specialization
+            use_availability: Prefer FAMs whose weekly availability overlaps the student's
+            year: Study year of the default student set
+            dry_run: Return the matches without writing them
+            batch_size: Rows per multi-row insert
+        
+        Returns:
+            One result per student (see matching.match_students)
+        """
+        self._invalidate_request_scope()
+        connection = self.get_connection()
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(
+                """
+                SELECT id, user_id, department, specialization, rating, mentees, max_mentees
+                FROM fams
+                WHERE is_available = TRUE
+                FOR UPDATE
+                """
+            )
+            fams = cursor.fetchall()
+            
+            query = """
+            SELECT s.id, s.user_id, s.department
+            FROM students s
+            WHERE NOT EXISTS (SELECT 1 FROM fam_mentees fm WHERE fm.student_id = s.id)
+            """
+            if student_ids:
+                query += f" AND s.id IN ({', '.join(['%s'] * len(student_ids))})"
+                params = tuple(student_ids)
+            else:
+                query += " AND s.year = %s"
+                params = (year,)
+            cursor.execute(query + " ORDER BY s.id", params)
+            students = cursor.fetchall()
+            
+            availability = None
+            if use_availability:
+                user_ids = {row['user_id'] for row in fams + students if row['user_id']}
+                availability = {}
+                if user_ids:
+                    cursor.execute(
+                        f"""
+                        SELECT user_id, slot_id FROM user_availability
+                        WHERE is_available = TRUE AND user_id IN ({', '.join(['%s'] * len(user_ids))})
+                        """,
+                        tuple(user_ids)
+                    )
+                    slots_by_user = {}
+                    for row in cursor.fetchall():
+                        slots_by_user.setdefault(row['user_id'], []).append(row['slot_id'])
+                    availability = {user_id: availability_mask(slots) for user_id, slots in slots_by_user.items()}
+            
+            results = match_students(students, fams, interests, availability)
+            matched = [(r['fam_id'], r['student_id']) for r in results if r['status'] == 'matched']
+            if dry_run or not matched:
+                connection.rollback()
+                return results
+            
+            for start in range(0, len(matched), batch_size):
+                batch = matched[start:start + batch_size]
+                cursor.execute(
+                    f"INSERT INTO fam_mentees (fam_id, student_id) VALUES {', '.join(['(%s, %s)'] * len(batch))}",
+                    tuple(value for pair in batch for value in pair)
+                )
+            
+            added = {}
+            for fam_id, _ in matched:
+                added[fam_id] = added.get(fam_id, 0) + 1
+            self._bump_mentee_counts(cursor, added)
+            connection.commit()
+            return results
+        except Error as e:
+            connection.rollback()
+            print(f"Error matching mentees: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+    
+    def find_mentor_slots(self, student_id: int, start_date: date, end_date: date,
+                          department: str = None, room_required: bool = True,
+                          limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Ranked (mentor, date, slot, room) options for a student to meet a FAM.
+        
+        Candidates are the student's own FAM(s) and the available FAMs of the
+        department (the student's unless given). All calendars are loaded
+        into one BatchScheduler, so each mentor's meetings are read once.
+        Own FAMs rank first, then earlier dates and times, then higher rating.
+        """
+        student = self.execute_query(
+            "SELECT id, user_id, department FROM students WHERE id = %s", (student_id,)
+        )
+        if not student:
+            raise ValueError(f"Student {student_id} does not exist")
+        student = student[0]
+        if not student['user_id']:
+            raise ValueError(f"Student {student_id} has no user account")
+        
+        mentors = self.execute_query(
+            """
+            SELECT f.id as fam_id, f.user_id, f.name, f.rating,
+                   fm.student_id IS NOT NULL as is_own_fam
+            FROM fams f
+            LEFT JOIN fam_mentees fm ON fm.fam_id = f.id AND fm.student_id = %s
+            WHERE f.user_id IS NOT NULL
+            AND f.user_id != %s
+            AND (fm.student_id IS NOT NULL OR (f.department = %s AND f.is_available = TRUE))
+            """,
+            (student_id, student['user_id'], department or student['department'])
+        )
+        if not mentors:
+            return []
+        
+        scheduler = self._load_scheduler(
+            start_date, end_date, {student['user_id']} | {m['user_id'] for m in mentors}
+        )
+        options = []
+        for mentor in mentors:
+            slots = scheduler.open_slots([student['user_id'], mentor['user_id']], start_date, end_date, room_required)
+            # Each mentor's options come earliest first, so `limit` per mentor is enough
+            for count, (meeting_date, slot, room) in enumerate(slots):
+                if count >= limit:
+                    break
+                options.append({
+                    'fam_id': mentor['fam_id'],
+                    'mentor_user_id': mentor['user_id'],
+                    'mentor_name': mentor['name'],
+                    'is_own_fam': bool(mentor['is_own_fam']),
+                    'meeting_date': meeting_date,
+                    'slot_id': slot['slot_id'],
+                    'start_time': slot['start_time'],
+                    'end_time': slot['end_time'],
+                    'room_id': room['room_id'] if room else None,
+                    'room_name': room['name'] if room else None,
+                    '_rating': float(mentor['rating'] or 0)
+                })
+        
+        options.sort(key=lambda o: (not o['is_own_fam'], o['meeting_date'], o['start_time'], -o['_rating'], o['fam_id']))
+        ranked = []
+        for rank, option in enumerate(options[:limit], start=1):
+            option.pop('_rating')
+            ranked.append(dict(option, rank=rank))
+        return ranked
+    
+    def _bump_mentee_counts(self, cursor, added: Dict[int, int]):
+        """Add {fam_id: new mentees} to fams.mentees with one UPDATE."""
+        cases = ' '.join(['WHEN %s THEN %s'] * len(added))
+        cursor.execute(
+            f"""
+            UPDATE fams
+            SET mentees = mentees + CASE id {cases} ELSE 0 END
+            WHERE id IN ({', '.join(['%s'] * len(added))})
+            """,
+            (*[value for item in added.items() for value in item], *added)
+        )
+    
+    def recount_mentees(self, fam_ids: List[int] = None) -> int:
+        """Recompute fams.mentees from fam_mentees (repair only; matching keeps it current)."""
+        query = """
+        UPDATE fams f
+        LEFT JOIN (SELECT fam_id, COUNT(*) as mentee_count FROM fam_mentees GROUP BY fam_id) c
+            ON c.fam_id = f.id
+        SET f.mentees = COALESCE(c.mentee_count, 0)
+        """
+        params = ()
+        if fam_ids:
+            query += f" WHERE f.id IN ({', '.join(['%s'] * len(fam_ids))})"
+            params = tuple(fam_ids)
+        return self.execute_query(query, params, fetch=False)
+    
+    # Student Grades
+    def save_grades(self, entries: List[Dict[str, Any]], chunk_size: int = 500) -> Dict[str, int]:
+        """
+        Insert or update grades with multi-row upserts on unique_grade_entry.
+        
+        Each chunk is one transaction that locks the affected grade rows,
+        writes them and applies the matching deltas to the grade summaries.
+        If a chunk fails, the chunks before it stay committed.
+        
+        Args:
+            entries: Validated dicts with student_id, subject_id, fam_id, grade,
+                semester, academic_year and optional feedback; for repeated
+                keys the last entry wins
+            chunk_size: Entries per transaction
+        
+        Returns:
+            {'created': int, 'updated': int, 'unchanged': int}
+        """
+        latest = {}
+        for entry in entries:
+            key = (entry['student_id'], entry['subject_id'], entry['semester'], entry['academic_year'])
+            latest[key] = entry
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0}
+        if not latest:
+            return counts
+        
+        subject_ids = list({key[1] for key in latest})
+        credits = {
+            row['id']: row['credits'] for row in self.execute_query(
+                f"SELECT id, credits FROM subjects WHERE id IN ({', '.join(['%s'] * len(subject_ids))})",
+                tuple(subject_ids)
+            )
+        }
+        
+        self._invalidate_request_scope()
+        keys = list(latest)
+        connection = self.get_connection()
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            for start in range(0, len(keys), chunk_size):
+                chunk = keys[start:start + chunk_size]
+                cursor.execute(
+                    f"""
+                    SELECT student_id, subject_id, fam_id, grade, semester, academic_year, feedback
+                    FROM student_grades
+                    WHERE (student_id, subject_id, semester, academic_year) IN
+                        ({', '.join(['(%s, %s, %s, %s)'] * len(chunk))})
+                    FOR UPDATE
+                    """,
+                    tuple(value for key in chunk for value in key)
+                )
+                previous = {
+                    (row['student_id'], row['subject_id'], row['semester'], row['academic_year']): row
+                    for row in cursor.fetchall()
+                }
+                
+                changed = []
+                for key in chunk:
+                    entry, old = latest[key], previous.get(key)
+                    if old is None:
+                        counts['created'] += 1
+                    elif (old['fam_id'], old['grade'], old['feedback']) == (
+                            entry['fam_id'], entry['grade'], entry.get('feedback')):
+                        counts['unchanged'] += 1
+                        continue
+                    else:
+                        counts['updated'] += 1
+                    changed.append(key)
+                if not changed:
+                    connection.commit()
+                    continue
+                
+                cursor.execute(
+                    f"""
+                    INSERT INTO student_grades
+                        (student_id, subject_id, fam_id, grade, semester, academic_year, feedback)
+                    VALUES {', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(changed))}
+                    ON DUPLICATE KEY UPDATE
+                        fam_id = VALUES(fam_id),
+                        grade = VALUES(grade),
+                        feedback = VALUES(feedback)
+                    """,
+                    tuple(
+                        value for key in changed for value in (
+                            latest[key]['student_id'], latest[key]['subject_id'], latest[key]['fam_id'],
+                            latest[key]['grade'], latest[key]['semester'], latest[key]['academic_year'],
+                            latest[key].get('feedback')
+                        )
+                    )
+                )
+                self._apply_grade_deltas(cursor, *summary_deltas(
+                    [previous[key] for key in changed if key in previous],
+                    [latest[key] for key in changed],
+                    credits
+                ))
+                connection.commit()
+            return counts
+        except Error as e:
+            connection.rollback()
+            print(f"Error saving grades: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+    
+    def _apply_grade_deltas(self, cursor, students: Dict[tuple, list], distribution: Dict[tuple, int],
+                            batch_size: int = 1000):
+        """Add summary deltas (see grades.summary_deltas) inside the caller's transaction."""
+        student_rows = [key + tuple(totals) for key, totals in students.items()]
+        for start in range(0, len(student_rows), batch_size):
+            batch = student_rows[start:start + batch_size]
+            cursor.execute(
+                f"""
+                INSERT INTO student_semester_summary
+                    (student_id, academic_year, semester, subjects, credits, quality_points)
+                VALUES {', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(batch))}
+                ON DUPLICATE KEY UPDATE
+                    subjects = subjects + VALUES(subjects),
+                    credits = credits + VALUES(credits),
+                    quality_points = quality_points + VALUES(quality_points)
+                """,
+                tuple(value for row in batch for value in row)
+            )
+        
+        grade_rows = [key + (count,) for key, count in distribution.items()]
+        for start in range(0, len(grade_rows), batch_size):
+            batch = grade_rows[start:start + batch_size]
+            cursor.execute(
+                f"""
+                INSERT INTO fam_grade_distribution (fam_id, academic_year, semester, grade, grade_count)
+                VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(batch))}
+                ON DUPLICATE KEY UPDATE grade_count = grade_count + VALUES(grade_count)
+                """,
+                tuple(value for row in batch for value in row)
+            )
+    
+    def rebuild_grade_summaries(self) -> int:
+        """Recompute the grade summaries from student_grades; returns grade rows read."""
+        self._invalidate_request_scope()
+        connection = self.get_connection()
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("DELETE FROM student_semester_summary")
+            cursor.execute("DELETE FROM fam_grade_distribution")
+            cursor.execute("SELECT id, credits FROM subjects")
+            credits = {row['id']: row['credits'] for row in cursor.fetchall()}
+            cursor.execute(
+                "SELECT student_id, subject_id, fam_id, grade, semester, academic_year FROM student_grades"
+            )
+            rows = cursor.fetchall()
+            self._apply_grade_deltas(cursor, *summary_deltas([], rows, credits))
+            cursor.execute("DELETE FROM fam_grade_distribution WHERE grade_count = 0")
+            connection.commit()
+            return len(rows)
+        except Error as e:
+            connection.rollback()
+            print(f"Error rebuilding grade summaries: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+    
+    def get_student_grades(self, student_id: int) -> Dict[str, Any]:
+        """A student's grades with per-semester and cumulative GPA."""
+        grades = self.execute_query(
+            """
+            SELECT g.subject_id, sub.subject_code, sub.subject_name, sub.credits,
+                   g.grade, g.semester, g.academic_year, g.fam_id, g.feedback
+            FROM student_grades g
+            LEFT JOIN subjects sub ON g.subject_id = sub.id
+            WHERE g.student_id = %s
+            ORDER BY g.academic_year, g.semester, sub.subject_code
+            """,
+            (student_id,)
+        )
+        semesters = self.execute_query(
+            """
+            SELECT academic_year, semester, subjects, credits, quality_points
+            FROM student_semester_summary
+            WHERE student_id = %s AND subjects > 0
+            ORDER BY academic_year, semester
+            """,
+            (student_id,)
+        )
+        for row in semesters:
+            row['quality_points'] = float(row['quality_points'])
+            row['gpa'] = gpa(row['quality_points'], row['credits'])
+        return {
+            "student_id": student_id,
+            "grades": grades,
+            "semesters": semesters,
+            "cumulative_gpa": gpa(
+                sum(row['quality_points'] for row in semesters),
+                sum(row['credits'] for row in semesters)
+            )
+        }
+    
+    def get_fam_mentee_grades(self, fam_id: int, academic_year: str = None,
+                              semester: str = None) -> Dict[str, Any]:
+        """Grade summaries of every mentee of a FAM plus the FAM's grade distribution."""
+        summary_filter, params = "", [fam_id]
+        if academic_year:
+            summary_filter += " AND ss.academic_year = %s"
+        if semester:
+            summary_filter += " AND ss.semester = %s"
+        filter_params = [value for value in (academic_year, semester) if value]
+        
+        rows = self.execute_query(
+            f"""
+            SELECT s.id as student_id, s.name, s.srn,
+                   ss.academic_year, ss.semester, ss.subjects, ss.credits, ss.quality_points
+            FROM fam_mentees fm
+            JOIN students s ON fm.student_id = s.id
+            LEFT JOIN student_semester_summary ss
+                ON ss.student_id = s.id AND ss.subjects > 0 {summary_filter}
+            WHERE fm.fam_id = %s
+            ORDER BY s.name, ss.academic_year, ss.semester
+            """,
+            tuple(filter_params + params)
+        )
+        mentees = {}
+        for row in rows:
+            mentee = mentees.setdefault(row['student_id'], {
+                'student_id': row['student_id'], 'name': row['name'], 'srn': row['srn'], 'semesters': []
+            })
+            if row['semester'] is not None:
+                mentee['semesters'].append({
+                    'academic_year': row['academic_year'],
+                    'semester': row['semester'],
+                    'subjects': row['subjects'],
+                    'gpa': gpa(row['quality_points'], row['credits'])
+                })
+        
+        distribution_filter = summary_filter.replace('ss.', '')
+        distribution = self.execute_query(
+            f"""
+            SELECT grade, SUM(grade_count) as count
+            FROM fam_grade_distribution
+            WHERE fam_id = %s AND grade_count > 0 {distribution_filter}
+            GROUP BY grade
+            ORDER BY grade
+            """,
+            tuple(params + filter_params)
+        )
+        return {
+            "fam_id": fam_id,
+            "mentees": list(mentees.values()),
+            "grade_distribution": {row['grade']: int(row['count']) for row in distribution}
+        }
+    
+    # Reporting
+    def get_meeting_analytics(self, start_date: date, end_date: date) -> Dict[str, Any]:
+        """
+        Get analytics for meetings in a date range.
+        
+        Sums the daily rollup tables, so the cost depends on the number of
+        days (and organizers) in the range rather than on meeting volume.
+        """
+        # Get basic counts
+        query_counts = """
+        SELECT 
+            COALESCE(SUM(total), 0) as total_meetings,
+            COALESCE(SUM(completed), 0) as completed,
+            COALESCE(SUM(cancelled), 0) as cancelled,
+            COALESCE(SUM(scheduled), 0) as scheduled
+        FROM meeting_daily_rollup
+        WHERE rollup_date BETWEEN %s AND %s
+        """
+        counts = self.execute_query(query_counts, (start_date, end_date))[0]
+        
+        # Get top organizers
+        query_organizers = """
+        SELECT 
+            u.name as organizer,
+            SUM(r.meetings) as meetings_created,
+            SUM(r.duration_minutes) / SUM(r.meetings) as avg_duration_minutes
+        FROM organizer_daily_rollup r
+        JOIN users u ON r.organizer_id = u.user_id
+        WHERE r.rollup_date BETWEEN %s AND %s
+        GROUP BY r.organizer_id
+        ORDER BY meetings_created DESC
+        LIMIT 5
+        """
+        top_organizers = self.execute_query(query_organizers, (start_date, end_date))
+        
+        return {
+            "period": {"start": start_date, "end": end_date},
+            "counts": counts,
+            "top_organizers": top_organizers
+        }
+    
+    def get_meeting_timeseries_rows(self, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        """One compact row per meeting in the range, for client-side bucketing."""
+        query = """
+        SELECT 
+            m.meeting_date,
+            m.status = 'cancelled' as cancelled,
+            CASE WHEN m.room_id IS NULL OR m.status = 'cancelled' THEN 0
+                 ELSE TIMESTAMPDIFF(MINUTE, ts.start_time, ts.end_time) END as room_minutes,
+            COUNT(mp.user_id) as invited,
+            COALESCE(SUM(mp.response = 'accepted'), 0) as accepted
+        FROM meetings m
+        JOIN time_slots ts ON m.slot_id = ts.slot_id
+        LEFT JOIN meeting_participants mp ON m.meeting_id = mp.meeting_id
+        WHERE m.meeting_date BETWEEN %s AND %s
+        GROUP BY m.meeting_id
+        """
+        return self.execute_query(query, (start_date, end_date))
+    
+    def get_meeting_timeseries(self, start_date: date, end_date: date, bucket: str = 'day') -> Dict[str, Any]:
+        """
+        Get per-day/week/month meeting analytics for a date range.
+        
+        Fetches the whole range in one query and buckets it in memory (see
+        analytics.aggregate_timeseries).
+        """
+        rows = self.get_meeting_timeseries_rows(start_date, end_date)
+        return {
+            "period": {"start": start_date, "end": end_date},
+            "bucket": bucket,
+            "series": aggregate_timeseries(rows, start_date, end_date, bucket)
+        }
+    
+    def get_room_utilization_rows(self, start_date: date, end_date: date) -> List[Dict[str, Any]]:
+        """One row per booked, non-cancelled meeting in the range with its attendance."""
+        query = """
+        SELECT 
+            m.room_id,
+            m.meeting_date,
+            ts.start_time,
+            ts.end_time,
+            TIMESTAMPDIFF(MINUTE, ts.start_time, ts.end_time) as duration_minutes,
+            COALESCE(SUM(mp.response != 'declined'), 0) as attendees
+        FROM meetings m
+        JOIN time_slots ts ON m.slot_id = ts.slot_id
+        LEFT JOIN meeting_participants mp ON m.meeting_id = mp.meeting_id
+        WHERE m.meeting_date BETWEEN %s AND %s
+        AND m.room_id IS NOT NULL
+        AND m.status != 'cancelled'
+        GROUP BY m.meeting_id
+        """
+        return self.execute_query(query, (start_date, end_date))
+    
+    def get_room_utilization(self, start_date: date, end_date: date) -> Dict[str, Any]:
+        """
+        Get the room utilization report (occupancy heatmap, peak hours, idle
+        rooms, attendance vs capacity) for a date range.
+        
+        Results are cached per range; see ReportCache.
+        """
+        cache_key = ('room_utilization', start_date, end_date)
+        cached = _report_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        rows = self.get_room_utilization_rows(start_date, end_date)
+        rooms = self.execute_query(
+            "SELECT room_id, name, capacity FROM meeting_rooms WHERE is_active = TRUE ORDER BY room_id"
+        )
+        slots = self.execute_query("SELECT start_time, end_time, day_of_week FROM time_slots")
+        report = {
+            "period": {"start": start_date, "end": end_date},
+            **room_utilization(rows, rooms, slots, start_date, end_date)
+        }
+        _report_cache.put(cache_key, report)
+        return report
+    
+    def get_distinct_participants(self, start_date: date, end_date: date, organizer_id: int = None,
+                                  mode: str = 'approx') -> Dict[str, Any]:
+        """
+        Count distinct participants of meetings in a date range.
+        
+        'approx' merges the per-day HyperLogLog sketches (cost independent of
+        meeting volume), 'exact' runs COUNT(DISTINCT) over meeting_participants,
+        'both' returns the two side by side for validation. Everyone ever
+        invited counts, whatever the meeting status or their response.
+        """
+        result = {
+            "period": {"start": start_date, "end": end_date},
+            "organizer_id": organizer_id,
+            "mode": mode
+        }
+        
+        if mode in ('approx', 'both'):
+            if organizer_id:
+                registers = self.execute_query(
+                    """
+                    SELECT register_index, MAX(register_rank) as register_rank
+                    FROM participant_organizer_sketch
+                    WHERE organizer_id = %s AND sketch_date BETWEEN %s AND %s
+                    GROUP BY register_index
+                    """,
+                    (organizer_id, start_date, end_date)
+                )
+            else:
+                registers = self.execute_query(
+                    """
+                    SELECT register_index, MAX(register_rank) as register_rank
+                    FROM participant_day_sketch
+                    WHERE sketch_date BETWEEN %s AND %s
+                    GROUP BY register_index
+                    """,
+                    (start_date, end_date)
+                )
+            sketch = HyperLogLog({row['register_index']: row['register_rank'] for row in registers})
+            result['approximate'] = sketch.count()
+            result['standard_error'] = HLL_STANDARD_ERROR
+        
+        if mode in ('exact', 'both'):
+            query = """
+            SELECT COUNT(DISTINCT mp.user_id) as distinct_participants
+            FROM meetings m
+            JOIN meeting_participants mp ON m.meeting_id = mp.meeting_id
+            WHERE m.meeting_date BETWEEN %s AND %s
+            """
+            params = [start_date, end_date]
+            if organizer_id:
+                query += " AND m.created_by = %s"
+                params.append(organizer_id)
+            result['exact'] = self.execute_query(query, tuple(params))[0]['distinct_participants']
+        
+        return result
+    
+    def _sketch_participants(self, meeting_ids: List[int], user_ids: List[int] = None, cursor=None):
+        """
+        Add participants of the given meetings to the day and organizer sketches.
+        
+        Adding a participant twice is harmless, so callers may re-sketch a
+        whole meeting. Runs on the given cursor (inside its transaction) or on
+        its own.
+        """
+        placeholders = ', '.join(['%s'] * len(meeting_ids))
+        query = f"""
+        SELECT m.meeting_date, m.created_by, mp.user_id
+        FROM meetings m
+        JOIN meeting_participants mp ON m.meeting_id = mp.meeting_id
+        WHERE m.meeting_id IN ({placeholders})
+        """
+        params = list(meeting_ids)
+        if user_ids:
+            query += f" AND mp.user_id IN ({', '.join(['%s'] * len(user_ids))})"
+            params.extend(user_ids)
+        if cursor:
+            cursor.execute(query, tuple(params))
+            rows = cursor.fetchall()
+        else:
+            rows = self.execute_query(query, tuple(params))
+        
+        for statement, values in self._sketch_statements(rows):
+            if cursor:
+                cursor.execute(statement, values)
+            else:
+                self.execute_query(statement, values, fetch=False)
+    
+    @staticmethod
+    def _sketch_statements(rows, batch_size: int = 1000):
+        """Register upserts (keeping the larger rank) for (meeting_date, created_by, user_id) rows."""
+        day_registers, organizer_registers = {}, {}
+        for row in rows:
+            index, rank = register_for(row['user_id'])
+            day_key = (row['meeting_date'], index)
+            organizer_key = (row['meeting_date'], row['created_by'], index)
+            day_registers[day_key] = max(rank, day_registers.get(day_key, 0))
+            organizer_registers[organizer_key] = max(rank, organizer_registers.get(organizer_key, 0))
+        
+        tables = (
+            ('participant_day_sketch', '(sketch_date, register_index, register_rank)', '(%s, %s, %s)',
+             [key + (rank,) for key, rank in day_registers.items()]),
+            ('participant_organizer_sketch', '(sketch_date, organizer_id, register_index, register_rank)',
+             '(%s, %s, %s, %s)', [key + (rank,) for key, rank in organizer_registers.items()])
+        )
+        for table, columns, placeholder, values in tables:
+            for start in range(0, len(values), batch_size):
+                batch = values[start:start + batch_size]
+                yield (
+                    f"""
+                    INSERT INTO {table} {columns}
+                    VALUES {', '.join([placeholder] * len(batch))}
+                    ON DUPLICATE KEY UPDATE register_rank = GREATEST(register_rank, VALUES(register_rank))
+                    """,
+                    tuple(value for row in batch for value in row)
+                )
+    
+    def rebuild_participant_sketches(self, start_date: date = None, end_date: date = None) -> int:
+        """Recompute the participant sketches from meeting_participants; returns rows sketched."""
+        condition, params = "", ()
+        if start_date and end_date:
+            condition, params = "WHERE sketch_date BETWEEN %s AND %s", (start_date, end_date)
+        
+        self._invalidate_request_scope()
+        connection = self.get_connection()
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(f"DELETE FROM participant_day_sketch {condition}", params)
+            cursor.execute(f"DELETE FROM participant_organizer_sketch {condition}", params)
+            cursor.execute(
+                f"""
+                SELECT m.meeting_date, m.created_by, mp.user_id
+                FROM meetings m
+                JOIN meeting_participants mp ON m.meeting_id = mp.meeting_id
+                {condition.replace('sketch_date', 'm.meeting_date')}
+                """,
+                params
+            )
+            rows = cursor.fetchall()
+            for statement, values in self._sketch_statements(rows):
+                cursor.execute(statement, values)
+            connection.commit()
+            return len(rows)
+        except Error as e:
+            connection.rollback()
+            print(f"Error rebuilding participant sketches: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+    
+    def _rollup_created(self, cursor, meeting_ids: List[int]):
+        """Add newly inserted meetings to the daily rollups (caller's transaction)."""
+        placeholders = ', '.join(['%s'] * len(meeting_ids))
+        cursor.execute(
+            f"""
+            INSERT INTO meeting_daily_rollup (rollup_date, total, scheduled, completed, cancelled)
+            SELECT meeting_date, COUNT(*),
+                   SUM(status = 'scheduled'), SUM(status = 'completed'), SUM(status = 'cancelled')
+            FROM meetings
+            WHERE meeting_id IN ({placeholders})
+            GROUP BY meeting_date
+            ON DUPLICATE KEY UPDATE
+                total = total + VALUES(total),
+                scheduled = scheduled + VALUES(scheduled),
+                completed = completed + VALUES(completed),
+                cancelled = cancelled + VALUES(cancelled)
+            """,
+            tuple(meeting_ids)
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO organizer_daily_rollup (rollup_date, organizer_id, meetings, duration_minutes)
+            SELECT m.meeting_date, m.created_by, COUNT(*),
+                   SUM(TIMESTAMPDIFF(MINUTE, ts.start_time, ts.end_time))
+            FROM meetings m
+            JOIN time_slots ts ON m.slot_id = ts.slot_id
+            WHERE m.meeting_id IN ({placeholders})
+            GROUP BY m.meeting_date, m.created_by
+            ON DUPLICATE KEY UPDATE
+                meetings = meetings + VALUES(meetings),
+                duration_minutes = duration_minutes + VALUES(duration_minutes)
+            """,
+            tuple(meeting_ids)
+        )
+    
+    def _rollup_status_changes(self, cursor, changes: List[Tuple[date, str, str]]):
+        """Move meetings between status counters: [(meeting_date, old_status, new_status), ...]."""
+        deltas = {}
+        for meeting_date, old_status, new_status in changes:
+            # Statuses become column names below, so only the ENUM values pass
+            for status in (old_status, new_status):
+                if status not in MEETING_STATUSES:
+                    raise ValueError(f"Unknown meeting status: {status!r}")
+            if old_status == new_status:
+                continue
+            key = (meeting_date, old_status, new_status)
+            deltas[key] = deltas.get(key, 0) + 1
+        for (meeting_date, old_status, new_status), count in deltas.items():
+            cursor.execute(
+                f"""
+                UPDATE meeting_daily_rollup
+                SET {old_status} = {old_status} - %s, {new_status} = {new_status} + %s
+                WHERE rollup_date = %s
+                """,
+                (count, count, meeting_date)
+            )
+    
+    def compact_rollups(self, start_date: date = None, end_date: date = None) -> Dict[str, int]:
+        """
+        Recompute the daily rollups from meetings, dropping empty days.
+        
+        Run nightly over a recent window to absorb status changes made outside
+        Database (e.g. meetings marked completed) or without a range to rebuild
+        everything.
+        """
+        condition, params = "", ()
+        if start_date and end_date:
+            condition, params = "WHERE rollup_date BETWEEN %s AND %s", (start_date, end_date)
+        meeting_condition = condition.replace('rollup_date', 'm.meeting_date')
+        
+        self._invalidate_request_scope()
+        connection = self.get_connection()
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(f"DELETE FROM meeting_daily_rollup {condition}", params)
+            cursor.execute(f"DELETE FROM organizer_daily_rollup {condition}", params)
+            cursor.execute(
+                f"""
+                INSERT INTO meeting_daily_rollup (rollup_date, total, scheduled, completed, cancelled)
+                SELECT m.meeting_date, COUNT(*),
+                       SUM(m.status = 'scheduled'), SUM(m.status = 'completed'), SUM(m.status = 'cancelled')
+                FROM meetings m
+                {meeting_condition}
+                GROUP BY m.meeting_date
+                """,
+                params
+            )
+            days = cursor.rowcount
+            cursor.execute(
+                f"""
+                INSERT INTO organizer_daily_rollup (rollup_date, organizer_id, meetings, duration_minutes)
+                SELECT m.meeting_date, m.created_by, COUNT(*),
+                       SUM(TIMESTAMPDIFF(MINUTE, ts.start_time, ts.end_time))
+                FROM meetings m
+                JOIN time_slots ts ON m.slot_id = ts.slot_id
+                {meeting_condition}
+                GROUP BY m.meeting_date, m.created_by
+                """,
+                params
+            )
+            organizer_days = cursor.rowcount
+            connection.commit()
+            return {'days': days, 'organizer_days': organizer_days}
+        except Error as e:
+            connection.rollback()
+            print(f"Error compacting rollups: {e}")
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if connection:
+                connection.close()
+    
+    # Utility methods
+    def check_room_availability(self, room_id: int, date: date, start_time: str, end_time: str) -> bool:
+        """Check if a room is available for a specific time slot."""
+        query = """
         SELECT COUNT(*) as count
         FROM meetings m
         JOIN time_slots ts ON m.slot_id = ts.slot_id
@@ -331,7 +2481,12 @@ class Database:
             query, 
             (room_id, date, end_time, start_time, start_time, end_time, start_time, end_time)
         )
-        return result[0]['count'] == 0
+        if result[0]['count'] > 0:
+            return False
+        return not any(
+            _times_overlap(o['start_time'], o['end_time'], start_time, end_time)
+            for o in self.get_virtual_occurrences(date, date, room_id=room_id)
+        )
     
     def get_user_schedule(self, user_id: int, start_date: date, end_date: date) -> List[Dict]:
         """Get a user's schedule between two dates."""
@@ -362,7 +2517,11 @@ class Database:
         AND mp.response = 'accepted'
         ORDER BY m.meeting_date, ts.start_time
         """
-        return self.execute_query(query, (user_id, start_date, end_date))
+        schedule = self.execute_query(query, (user_id, start_date, end_date))
+        virtual = self.get_virtual_occurrences(start_date, end_date, participant_id=user_id)
+        if not virtual:
+            return schedule
+        return sorted(schedule + virtual, key=lambda m: (m['meeting_date'], _as_timedelta(m['start_time'])))
 
     def get_meeting_details_with_participants(self, meeting_id: int) -> Optional[Dict]:
         """Get detailed meeting information with nested participant data."""
@@ -386,7 +2545,7 @@ class Database:
             (
                 SELECT JSON_ARRAYAGG(
                     JSON_OBJECT(
-                        'user_id', p.user_id,
+                        'user_id', mp.user_id,
                         'name', u2.name,
                         'email', u2.email,
                         'response', mp.response,
@@ -493,7 +2652,13 @@ class Database:
         GROUP BY mp.user_id
         """
         results = self.execute_complex_query(query, (user_id, start_date, end_date, user_id, start_date, end_date), nested_results=True)
-        return results[0] if results else {'schedule': [], 'conflicts': []}
+        virtual = self.get_virtual_occurrences(start_date, end_date, participant_id=user_id)
+        if results:
+            if virtual:
+                results[0]['result'] = _merge_virtual_schedule(results[0]['result'], virtual)
+            return results[0]
+        empty = {'schedule': [], 'conflicts': []}
+        return _merge_virtual_schedule(empty, virtual) if virtual else empty
 
     def search_meetings(self, search_params: Dict[str, Any]) -> List[Dict]:
         """
@@ -262,8 +262,10 @@ def get_daily_schedule(target_date: date = None) -> List[Dict[str, Any]]:
         target_date = date.today()
         
     try:
+        # Served from the materialized table so frequent polling never
+        # touches the base tables (see daily_schedule.py)
         query = """
-            SELECT * FROM daily_schedule 
+            SELECT * FROM materialized_daily_schedule 
             WHERE meeting_date = %s
             ORDER BY start_time
         """
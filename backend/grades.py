@@ -0,0 +1,58 @@
+"""
+grades.py - Grade Summaries
+Grade points and the summary deltas a grade insert or update causes.
+
+student_semester_summary and fam_grade_distribution are kept current by
+adding deltas on every grade write instead of rescanning student_grades:
+a changed grade subtracts its old row and adds its new one.
+"""
+
+# 4.0 scale; grades outside it count towards subjects and distributions only
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 4.0, 'A-': 3.7,
+    'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+    'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+    'D+': 1.3, 'D': 1.0, 'F': 0.0
+}
+
+def gpa(quality_points, credits):
+    """Credit-weighted GPA, or None when nothing graded on the scale."""
+    if not credits:
+        return None
+    return round(float(quality_points) / float(credits), 2)
+
+def summary_deltas(old_rows, new_rows, credits):
+    """
+    Changes to the summary tables caused by replacing old_rows with new_rows.
+
+    Args:
+        old_rows: Grade rows as they were (empty for new entries)
+        new_rows: Grade rows as written; rows have student_id, fam_id,
+            subject_id, semester, academic_year and grade
+        credits: {subject_id: credits}
+
+    Returns:
+        (student_deltas, distribution_deltas):
+        {(student_id, academic_year, semester): [subjects, credits, quality_points]}
+        {(fam_id, academic_year, semester, grade): count}, zero entries dropped
+    """
+    students, distribution = {}, {}
+    for sign, rows in ((-1, old_rows), (1, new_rows)):
+        for row in rows:
+            key = (row['student_id'], row['academic_year'], row['semester'])
+            totals = students.setdefault(key, [0, 0, 0.0])
+            totals[0] += sign
+            points = GRADE_POINTS.get(row['grade'])
+            if points is not None:
+                subject_credits = credits.get(row['subject_id'], 0)
+                totals[1] += sign * subject_credits
+                totals[2] += sign * points * subject_credits
+
+            grade_key = (row['fam_id'], row['academic_year'], row['semester'], row['grade'])
+            distribution[grade_key] = distribution.get(grade_key, 0) + sign
+
+    students = {key: [subjects, credit_total, round(quality, 2)]
+                for key, (subjects, credit_total, quality) in students.items()
+                if subjects or credit_total or round(quality, 2)}
+    distribution = {key: count for key, count in distribution.items() if count}
+    return students, distribution
@@ -4,12 +4,29 @@ Tests complete user workflows end-to-end
 """
 
 import unittest
+import json
+import logging
+import queue
+import tempfile
+import threading
+import time
 import sys
 import os
 sys.path.insert(0, os.path.dirname(__file__))
 
-from database import db
+from database import db, Database
+from analytics import BUCKETS, aggregate_timeseries
+import metrics
+from slow_queries import SlowQueryLog
+from profiling import RequestProfiler
+import tracing
+import logger
+import access_log
+import replay
+import synthetic_data
+from validators import validate_grade_entry
 from datetime import date, timedelta
+from mysql.connector import Error
 
 class IntegrationTestCase(unittest.TestCase):
     """Base test case with common setup/teardown."""
@@ -21,13 +38,24 @@ class IntegrationTestCase(unittest.TestCase):
         print("Setting up integration tests")
         print("="*60)
     
+    # Tables whose rows a test may create, with their id column. Deleting
+    # them cascades to meetings, participants, mentees and grades.
+    CREATED_ROWS = (('users', 'user_id'), ('fams', 'id'), ('students', 'id'))
+    
     def setUp(self):
         """Setup for each test."""
         self.test_date = date.today() + timedelta(days=1)
+        self._last_ids = {
+            table: db.execute_query(f"SELECT COALESCE(MAX({column}), 0) AS id FROM {table}")[0]['id']
+            for table, column in self.CREATED_ROWS
+        }
     
     def tearDown(self):
-        """Cleanup after each test."""
-        pass
+        """Remove the rows the test created, so every test starts from the same data."""
+        for table, column in self.CREATED_ROWS:
+            db.execute_query(
+                f"DELETE FROM {table} WHERE {column} > %s", (self._last_ids[table],), fetch=False
+            )
 
 class UserWorkflowTests(IntegrationTestCase):
     """Test user-related workflows."""
@@ -110,6 +138,76 @@ class MeetingWorkflowTests(IntegrationTestCase):
         
         print(f"  Found {len(meetings)} upcoming meetings")
     
+    def test_daily_schedule_follows_create_and_cancel(self):
+        """Test that the materialized daily schedule tracks writes."""
+        print("\n✓ Testing: Materialized daily schedule")
+        
+        schedule_date = self.test_date + timedelta(days=45)
+        meeting_id = db.create_meeting(
+            title="Front Desk Meeting",
+            description="Daily schedule",
+            room_id=None,
+            slot_id=2,
+            meeting_date=schedule_date,
+            created_by=self.user1_id,
+            participants=[]
+        )
+        daily = db.get_daily_schedule(schedule_date)
+        self.assertIn(meeting_id, [row['meeting_id'] for row in daily])
+        
+        db.update_meeting(meeting_id, {'title': "Renamed Front Desk Meeting"})
+        daily = {row['meeting_id']: row for row in db.get_daily_schedule(schedule_date)}
+        self.assertEqual(daily[meeting_id]['title'], "Renamed Front Desk Meeting")
+        
+        # A failed update leaves both the meeting and its schedule row alone
+        with self.assertRaises(Error):
+            db.update_meeting(meeting_id, {'title': "Half-applied", 'room_id': 999999})
+        daily = {row['meeting_id']: row for row in db.get_daily_schedule(schedule_date)}
+        self.assertEqual(daily[meeting_id]['title'], "Renamed Front Desk Meeting")
+        
+        db.cancel_meeting(meeting_id)
+        daily = db.get_daily_schedule(schedule_date)
+        self.assertNotIn(meeting_id, [row['meeting_id'] for row in daily])
+        
+        report = db.check_daily_schedule(schedule_date, schedule_date)
+        self.assertEqual(report, {'missing': [], 'extra': [], 'mismatched': []})
+        
+        print(f"  Meeting {meeting_id} tracked through create/update/cancel")
+    
+    def test_auto_assign_room_picks_best_fit(self):
+        """Test that auto room assignment takes the smallest room that fits."""
+        print("\n✓ Testing: Automatic room assignment")
+        
+        meeting_date = self.test_date + timedelta(days=50)
+        slot = db.execute_query("SELECT start_time, end_time FROM time_slots WHERE slot_id = 4")[0]
+        free_rooms = db.get_available_rooms(meeting_date, slot['start_time'], slot['end_time'])
+        fitting = sorted((r for r in free_rooms if r['capacity'] >= 2), key=lambda r: (r['capacity'], r['room_id']))
+        if not fitting:
+            self.skipTest("No free room at the test slot")
+        
+        created = db.create_meeting_with_room(
+            title="Auto Room Meeting",
+            description="Best-fit room",
+            slot_id=4,
+            meeting_date=meeting_date,
+            created_by=self.user1_id,
+            participants=[self.user2_id]
+        )
+        self.assertEqual(created['room_id'], fitting[0]['room_id'])
+        
+        # The room is taken now, so the next one is chosen
+        if len(fitting) > 1:
+            second = db.create_meeting_with_room(
+                title="Second Auto Room Meeting",
+                description="Next best-fit room",
+                slot_id=4,
+                meeting_date=meeting_date,
+                created_by=self.user1_id
+            )
+            self.assertEqual(second['room_id'], fitting[1]['room_id'])
+        
+        print(f"  Meeting {created['meeting_id']} placed in room {created['room_id']}")
+    
     def test_search_meetings(self):
         """Test searching for meetings."""
         print("\n✓ Testing: Search meetings")
@@ -135,6 +233,226 @@ class MeetingWorkflowTests(IntegrationTestCase):
         
         print(f"  Search found {len(meetings)} meeting(s)")
 
+class BulkMeetingWorkflowTests(IntegrationTestCase):
+    """Test bulk meeting creation."""
+    
+    def setUp(self):
+        """Setup for bulk meeting tests."""
+        super().setUp()
+        self.organizer_id = db.create_user("Bulk Organizer", "bulk.organizer@university.edu", "professor")
+        self.student_id = db.create_user("Bulk Student", "bulk.student@university.edu", "student")
+    
+    def test_bulk_create_reports_room_conflicts(self):
+        """Test that a clashing room booking is reported without failing the batch."""
+        print("\n✓ Testing: Bulk create meetings")
+        
+        meetings = [
+            {
+                'title': "Advising Session %d" % i,
+                'description': "Bulk created",
+                'room_id': 2,
+                'slot_id': i + 1,
+                'meeting_date': self.test_date + timedelta(days=30),
+                'created_by': self.organizer_id,
+                'participants': [self.student_id]
+            }
+            for i in range(3)
+        ]
+        # Same room, slot and date as the first item
+        meetings.append(dict(meetings[0], title="Clashing Session", participants=[]))
+        
+        results = db.create_meetings_bulk(meetings, chunk_size=2)
+        statuses = [r['status'] for r in results]
+        self.assertEqual(statuses, ['created', 'created', 'created', 'conflict'])
+        self.assertEqual(len({r['meeting_id'] for r in results[:3]}), 3)
+        
+        meeting = db.get_meeting_details_with_participants(results[1]['meeting_id'])
+        self.assertEqual(meeting['title'], "Advising Session 1")
+        
+        print(f"  Bulk results: {statuses}")
+    
+    def test_bulk_create_marks_an_undated_item_invalid(self):
+        """Test that an item without a date is reported on its own while the rest are created."""
+        print("\n✓ Testing: Bulk create with an invalid item")
+        
+        import app as app_module
+        item = {
+            'title': "Dated Session",
+            'room_id': 2,
+            'slot_id': 1,
+            'meeting_date': (self.test_date + timedelta(days=31)).isoformat(),
+            'created_by': self.organizer_id
+        }
+        undated = dict(item, title="Undated Session")
+        del undated['meeting_date']
+        response = app_module.app.test_client().post('/api/meetings/bulk', json={'meetings': [item, undated]})
+        
+        self.assertEqual(response.status_code, 207)
+        results = response.get_json()['data']
+        self.assertEqual([r['status'] for r in results], ['created', 'invalid'])
+        self.assertEqual([e['field'] for e in results[1]['errors']], ['meeting_date'])
+        
+        print(f"  Bulk results: {[r['status'] for r in results]}")
+    
+    def test_batch_scheduler_avoids_double_booking(self):
+        """Test that scheduled requests sharing a participant get different slots."""
+        print("\n✓ Testing: Batch auto-scheduler")
+        
+        window_start = self.test_date + timedelta(days=35)
+        requests = [
+            {
+                'title': "Advising Slot %d" % i,
+                'description': "Auto scheduled",
+                'created_by': self.organizer_id,
+                'participants': [self.student_id],
+                'window_start': window_start,
+                'window_end': window_start + timedelta(days=6),
+                'room_required': False,
+                # As sent by a client that leaves the minimum unset
+                'min_duration_minutes': None
+            }
+            for i in range(3)
+        ]
+        
+        plan = db.schedule_meetings(requests, dry_run=True)
+        self.assertTrue(all(r['meeting_id'] is None for r in plan))
+        
+        results = db.schedule_meetings(requests)
+        scheduled = [r for r in results if r['status'] == 'scheduled']
+        self.assertEqual(len(scheduled), 3)
+        self.assertEqual(len({(r['meeting_date'], r['slot_id']) for r in scheduled}), 3)
+        self.assertTrue(all(r['meeting_id'] for r in scheduled))
+        
+        print(f"  Scheduled: {[(str(r['meeting_date']), r['slot_id']) for r in scheduled]}")
+    
+    def test_schedule_marks_a_request_without_window_invalid(self):
+        """Test that a request missing its window is reported on its own."""
+        print("\n✓ Testing: Batch auto-scheduler with an invalid request")
+        
+        import app as app_module
+        window_start = self.test_date + timedelta(days=35)
+        item = {
+            'title': "Windowed Request",
+            'created_by': self.organizer_id,
+            'participants': [self.student_id],
+            'window_start': window_start.isoformat(),
+            'window_end': (window_start + timedelta(days=6)).isoformat(),
+            'room_required': False
+        }
+        response = app_module.app.test_client().post('/api/meetings/schedule', json={
+            'requests': [item, {'title': "Windowless Request", 'created_by': self.organizer_id}],
+            'dry_run': True
+        })
+        
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()['data']
+        self.assertEqual([r['status'] for r in results], ['scheduled', 'invalid'])
+        self.assertEqual({e['field'] for e in results[1]['errors']}, {'window_start', 'window_end'})
+        
+        print(f"  Results: {[r['status'] for r in results]}")
+
+    def test_synthetic_load_bypasses_triggers_and_rebuilds(self):
+        """Test that a bulk-loaded synthetic dataset is reproducible and fully indexed."""
+        print("\n✓ Testing: Synthetic dataset bulk load")
+        
+        def dataset():
+            return synthetic_data.SyntheticDataset(
+                users=30, meetings=60, rooms=3, seed=11, days_back=10, days_ahead=10,
+                email_domain='synthetic-test.invalid', room_prefix='Synthetic Test Room'
+            )
+        slots = db.execute_query("SELECT slot_id, start_time, day_of_week FROM time_slots")
+        users, rooms = list(dataset().user_rows(1)), list(dataset().room_rows(1))
+        first = list(dataset().meeting_days(1, users, rooms, slots))
+        self.assertEqual(first, list(dataset().meeting_days(1, users, rooms, slots)))
+        
+        try:
+            result = synthetic_data.load(dataset(), 'insert', chunk_size=25, progress=lambda message: None)
+            first_id = result['first_ids']['meetings']
+            self.assertEqual(result['rows']['users'], 30)
+            
+            # Past dates went through the meeting date trigger
+            past = db.execute_query(
+                "SELECT COUNT(*) AS n FROM meetings WHERE meeting_id >= %s AND meeting_date < CURDATE()",
+                (first_id,)
+            )[0]['n']
+            self.assertGreater(past, 0)
+            
+            # Busy slots and availability were rebuilt for every participant row
+            participants = db.execute_query(
+                "SELECT COUNT(*) AS n FROM meeting_participants WHERE meeting_id >= %s", (first_id,)
+            )[0]['n']
+            busy = db.execute_query(
+                "SELECT COUNT(*) AS n FROM user_busy_slots WHERE meeting_id >= %s", (first_id,)
+            )[0]['n']
+            self.assertEqual(participants, result['rows']['meeting_participants'])
+            self.assertGreater(busy, 0)
+        finally:
+            removed = synthetic_data.clear('synthetic-test.invalid', 'Synthetic Test Room', progress=lambda message: None)
+        self.assertEqual(removed, {'users': 30, 'rooms': 3})
+        
+        print(f"  Loaded: {result['rows']}")
+
+class BookingPathTests(IntegrationTestCase):
+    """Test the trigger-based and set-based double-booking checks."""
+    
+    def setUp(self):
+        """Setup for booking path tests."""
+        super().setUp()
+        self.organizer_id = db.create_user("Booking Organizer", "booking.organizer@university.edu", "professor")
+        self.student_id = db.create_user("Booking Student", "booking.student@university.edu", "student")
+    
+    def test_both_paths_reject_double_booking(self):
+        """Test that a participant cannot be booked twice in one slot either way."""
+        print("\n✓ Testing: Double-booking checks (trigger and set-based)")
+        
+        for offset, mode in enumerate(('trigger', 'set')):
+            meeting_date = self.test_date + timedelta(days=60 + offset)
+            db.create_meeting(
+                title=f"First {mode} booking",
+                description="",
+                room_id=None,
+                slot_id=3,
+                meeting_date=meeting_date,
+                created_by=self.organizer_id,
+                participants=[self.student_id],
+                booking_mode=mode
+            )
+            # Same participant, slot and date, booked through the other path
+            with self.assertRaises(Error):
+                db.create_meeting(
+                    title=f"Clashing {mode} booking",
+                    description="",
+                    room_id=None,
+                    slot_id=3,
+                    meeting_date=meeting_date,
+                    created_by=self.organizer_id,
+                    participants=[self.student_id],
+                    booking_mode='set' if mode == 'trigger' else 'trigger'
+                )
+        
+        print("  Double booking rejected on both paths")
+
+    def test_busy_slot_sync_rejects_a_taken_slot(self):
+        """Test that re-claiming busy slots reports a clash instead of skipping it."""
+        print("\n✓ Testing: Busy slot re-claim conflicts")
+        
+        meeting_date = self.test_date + timedelta(days=70)
+        declined_id = db.create_meeting("Declined booking", "", None, 3, meeting_date,
+                                        self.organizer_id, [self.student_id])
+        self.assertTrue(db.update_participant_response(declined_id, self.student_id, 'declined'))
+        db.create_meeting("Later booking", "", None, 3, meeting_date, self.organizer_id, [self.student_id])
+        
+        # A plain UPDATE fires no participant trigger; only the sync can notice
+        db.execute_query(
+            "UPDATE meeting_participants SET response = 'accepted' WHERE meeting_id = %s AND user_id = %s",
+            (declined_id, self.student_id), fetch=False
+        )
+        with self.assertRaises(Error) as raised:
+            db._sync_busy_slots(declined_id)
+        self.assertIn('another meeting', raised.exception.msg)
+        
+        print("  Taken slot reported as a double booking")
+
 class ParticipantWorkflowTests(IntegrationTestCase):
     """Test participant-related workflows."""
     
@@ -171,6 +489,259 @@ class ParticipantWorkflowTests(IntegrationTestCase):
         
         print(f"  Participant response updated successfully")
 
+    def test_bulk_update_participant_responses(self):
+        """Test recording several responses in one call."""
+        print("\n✓ Testing: Bulk update participant responses")
+        
+        responses = [
+            {'user_id': self.user2_id, 'response': 'accepted'},
+            {'user_id': self.user1_id, 'response': 'accepted'}
+        ]
+        changed = db.update_participant_responses_bulk(self.meeting_id, responses)
+        self.assertEqual(
+            {(c['user_id'], c['previous_response']) for c in changed},
+            {(self.user2_id, 'pending'), (self.user1_id, None)}
+        )
+        
+        # Repeating the same responses changes nothing
+        self.assertEqual(db.update_participant_responses_bulk(self.meeting_id, responses), [])
+        
+        # An unknown meeting is a 404, not a foreign key error
+        import app as app_module
+        response = app_module.app.test_client().post('/api/meetings/999999999/respond/bulk',
+                                                     json={'responses': responses})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json()['message'], 'Meeting not found')
+        
+        print(f"  {len(changed)} responses changed")
+
+class SeriesWorkflowTests(IntegrationTestCase):
+    """Test recurring meeting series."""
+    
+    def setUp(self):
+        """Setup for series tests."""
+        super().setUp()
+        self.organizer_id = db.create_user("Series Organizer", "series.organizer@university.edu", "professor")
+        self.student_id = db.create_user("Series Student", "series.student@university.edu", "student")
+    
+    def test_series_expands_beyond_horizon(self):
+        """Test that a semester-long series is materialized only near term."""
+        print("\n✓ Testing: Recurring series expansion")
+        
+        start_date = self.test_date
+        until_date = start_date + timedelta(weeks=15)
+        created = db.create_meeting_series(
+            title="Weekly Office Hours",
+            description="Recurring",
+            room_id=None,
+            slot_id=1,
+            start_date=start_date,
+            until_date=until_date,
+            created_by=self.organizer_id,
+            participants=[self.student_id]
+        )
+        series_id = created['series_id']
+        
+        occurrences = db.get_series_occurrences(series_id, start_date, until_date)
+        self.assertIn(len(occurrences), (15, 16))
+        materialized = [o for o in occurrences if not o['is_virtual']]
+        self.assertLessEqual(len(materialized), 3)
+        
+        # Far-future occurrences show up in the participant's schedule
+        far_date = occurrences[-1]['meeting_date']
+        schedule = db.get_user_schedule(self.student_id, far_date, far_date)
+        self.assertTrue(any(m.get('series_id') == series_id for m in schedule))
+        
+        # Materialized and generated occurrences render times alike
+        with_conflicts = db.get_user_schedule_with_conflicts(self.student_id, start_date, until_date)
+        conflicts_view = with_conflicts['result']['schedule']
+        self.assertEqual({entry['meeting_id'] is None for entry in conflicts_view}, {True, False})
+        self.assertEqual(len({len(entry['start_time']) for entry in conflicts_view}), 1)
+        
+        # Skipping an occurrence removes it
+        db.skip_series_occurrence(series_id, far_date)
+        occurrences = db.get_series_occurrences(series_id, far_date, far_date)
+        self.assertEqual(occurrences, [])
+        
+        print(f"  {len(materialized)} occurrence(s) materialized up front")
+    
+    def test_direct_booking_respects_unmaterialized_occurrences(self):
+        """Test that a direct booking cannot take a room or person from a far-future occurrence."""
+        print("\n✓ Testing: Direct booking against a series beyond the horizon")
+        
+        start_date = self.test_date + timedelta(days=60)
+        series_id = db.create_meeting_series(
+            title="Far Seminar",
+            description="Recurring",
+            room_id=3,
+            slot_id=1,
+            start_date=start_date,
+            until_date=start_date + timedelta(weeks=4),
+            created_by=self.organizer_id,
+            participants=[self.student_id]
+        )['series_id']
+        occurrence = db.get_series_occurrences(series_id, start_date, start_date + timedelta(weeks=4))[0]
+        self.assertTrue(occurrence['is_virtual'])
+        other_id = db.create_user("Series Bystander", "series.bystander@university.edu", "student")
+        booking = {
+            'title': "Direct Booking",
+            'description': "",
+            'room_id': 3,
+            'slot_id': 1,
+            'meeting_date': occurrence['meeting_date'],
+            'created_by': other_id,
+            'participants': []
+        }
+        
+        with self.assertRaises(Error):
+            db.create_meeting(**booking)
+        with self.assertRaises(Error):
+            db.create_meeting(**dict(booking, room_id=None, participants=[self.student_id]))
+        results = db.create_meetings_bulk([booking, dict(booking, room_id=None, participants=[other_id])])
+        self.assertEqual([r['status'] for r in results], ['conflict', 'created'])
+        
+        print(f"  Bulk results: {[r['status'] for r in results]}")
+    
+    def test_series_without_dates_is_rejected(self):
+        """Test that a series request missing its dates gets field errors, not a 500."""
+        print("\n✓ Testing: Series validation without dates")
+        
+        import app as app_module
+        response = app_module.app.test_client().post('/api/series', json={
+            'title': "Undated Series",
+            'slot_id': 1,
+            'created_by': self.organizer_id
+        })
+        self.assertEqual(response.status_code, 400)
+        fields = {e['field'] for e in response.get_json()['errors']}
+        self.assertEqual(fields, {'start_date', 'until_date'})
+        
+        print(f"  Rejected fields: {sorted(fields)}")
+
+class MentoringWorkflowTests(IntegrationTestCase):
+    """Test FAM mentor matching."""
+    
+    def setUp(self):
+        """Setup for mentoring tests."""
+        super().setUp()
+        self.fam_id = db.execute_query(
+            """
+            INSERT INTO fams (name, srn, department, year, specialization, rating, max_mentees)
+            VALUES ('Test Mentor', 'FAMTEST01', 'Test Department', 3, 'Testing, Python', 4.5, 2)
+            """,
+            fetch=False
+        )
+        self.student_ids = [
+            db.execute_query(
+                "INSERT INTO students (name, srn, department, year) VALUES (%s, %s, 'Test Department', 1)",
+                (f"Test Mentee {i}", f"SRNTEST0{i}"),
+                fetch=False
+            )
+            for i in range(3)
+        ]
+    
+    def test_match_respects_capacity_and_counts_incrementally(self):
+        """Test that matching fills a FAM up to max_mentees and bumps its counter."""
+        print("\n✓ Testing: Mentor matching")
+        
+        plan = db.match_mentees(student_ids=self.student_ids, dry_run=True)
+        self.assertEqual([r['status'] for r in plan], ['matched', 'matched', 'unmatched'])
+        
+        results = db.match_mentees(student_ids=self.student_ids)
+        self.assertEqual([r['fam_id'] for r in results[:2]], [self.fam_id, self.fam_id])
+        self.assertEqual(results[2]['reason'], 'All FAMs in department are full')
+        
+        fam = db.execute_query("SELECT mentees FROM fams WHERE id = %s", (self.fam_id,))[0]
+        self.assertEqual(fam['mentees'], 2)
+        
+        # Already matched students are skipped on the next run
+        again = db.match_mentees(student_ids=self.student_ids[:2])
+        self.assertEqual(again, [])
+        
+        print(f"  Matched {len([r for r in results if r['status'] == 'matched'])} of {len(results)} students")
+    
+    def test_find_mentor_slots_skips_busy_times(self):
+        """Test that mentor slot search ranks the own FAM and avoids booked slots."""
+        print("\n✓ Testing: Mentor availability search")
+        
+        mentor_user = db.create_user("Test Mentor User", "mentor.test@university.edu", "student")
+        student_user = db.create_user("Test Mentee User", "mentee.test@university.edu", "student")
+        db.execute_query("UPDATE fams SET user_id = %s WHERE id = %s", (mentor_user, self.fam_id), fetch=False)
+        db.execute_query(
+            "UPDATE students SET user_id = %s WHERE id = %s", (student_user, self.student_ids[0]), fetch=False
+        )
+        db.match_mentees(student_ids=self.student_ids[:1])
+        
+        window_start = self.test_date + timedelta(days=80)
+        window_end = window_start + timedelta(days=6)
+        options = db.find_mentor_slots(self.student_ids[0], window_start, window_end, room_required=False)
+        self.assertTrue(options)
+        self.assertTrue(options[0]['is_own_fam'])
+        self.assertEqual([o['rank'] for o in options], list(range(1, len(options) + 1)))
+        
+        # Book the mentor into the best option; it must disappear
+        first = options[0]
+        db.create_meeting(
+            title="Mentor Busy",
+            description="Blocks the first option",
+            room_id=None,
+            slot_id=first['slot_id'],
+            meeting_date=first['meeting_date'],
+            created_by=mentor_user,
+            participants=[]
+        )
+        again = db.find_mentor_slots(self.student_ids[0], window_start, window_end, room_required=False)
+        self.assertNotIn(
+            (first['meeting_date'], first['slot_id']),
+            [(o['meeting_date'], o['slot_id']) for o in again if o['fam_id'] == self.fam_id]
+        )
+        
+        print(f"  {len(options)} options, best: {first['meeting_date']} slot {first['slot_id']}")
+    
+    def test_grade_summaries_follow_imports_and_updates(self):
+        """Test that GPA and grade distribution summaries track grade upserts."""
+        print("\n✓ Testing: Grade summaries")
+        
+        db.match_mentees(student_ids=self.student_ids[:1])
+        subjects = {
+            row['subject_code']: row['id'] for row in db.execute_query(
+                "SELECT id, subject_code FROM subjects WHERE subject_code IN ('CS101', 'CS401')"
+            )
+        }
+        entry = {'student_id': self.student_ids[0], 'fam_id': self.fam_id,
+                 'semester': 'Fall', 'academic_year': '2099-2100'}
+        
+        counts = db.save_grades([
+            dict(entry, subject_id=subjects['CS101'], grade='A'),
+            dict(entry, subject_id=subjects['CS401'], grade='B')
+        ])
+        self.assertEqual(counts, {'created': 2, 'updated': 0, 'unchanged': 0})
+        grades = db.get_student_grades(self.student_ids[0])
+        self.assertEqual(grades['semesters'][0]['gpa'], round((4 * 4.0 + 3 * 3.0) / 7, 2))
+        
+        # Re-importing updates in place through unique_grade_entry
+        counts = db.save_grades([
+            dict(entry, subject_id=subjects['CS101'], grade='A'),
+            dict(entry, subject_id=subjects['CS401'], grade='A')
+        ])
+        self.assertEqual(counts, {'created': 0, 'updated': 1, 'unchanged': 1})
+        
+        summary = db.get_fam_mentee_grades(self.fam_id, academic_year='2099-2100')
+        mentee = next(m for m in summary['mentees'] if m['student_id'] == self.student_ids[0])
+        self.assertEqual(mentee['semesters'][0]['gpa'], 4.0)
+        self.assertEqual(summary['grade_distribution'], {'A': 2})
+        
+        # Incremental summaries match a full rebuild
+        db.rebuild_grade_summaries()
+        self.assertEqual(db.get_fam_mentee_grades(self.fam_id, academic_year='2099-2100'), summary)
+        
+        # Malformed entries come back as field errors rather than exceptions
+        errors = validate_grade_entry(dict(entry, subject_id=subjects['CS101'], grade=['A'], feedback='x' * 1001))
+        self.assertEqual([e['field'] for e in errors], ['grade', 'feedback'])
+        self.assertEqual(errors[1]['message'], 'Feedback must not exceed 1000 characters')
+        
+        print(f"  GPA {mentee['semesters'][0]['gpa']}, distribution {summary['grade_distribution']}")
+
 class AvailabilityWorkflowTests(IntegrationTestCase):
     """Test availability-related workflows."""
     
@@ -206,6 +777,376 @@ class AnalyticsWorkflowTests(IntegrationTestCase):
         self.assertIn('top_organizers', analytics)
         
         print(f"  Analytics retrieved successfully")
+    
+    def test_rollups_track_create_and_cancel(self):
+        """Test that analytics rollups stay in step with meeting writes."""
+        print("\n✓ Testing: Analytics rollups")
+        
+        organizer_id = db.create_user("Rollup Organizer", "rollup.test@university.edu", "professor")
+        rollup_date = date.today() + timedelta(days=60)
+        
+        def counts():
+            return db.get_meeting_analytics(rollup_date, rollup_date)['counts']
+        
+        before = counts()
+        meeting_id = db.create_meeting(
+            title="Rollup Meeting",
+            description="Analytics rollups",
+            room_id=None,
+            slot_id=3,
+            meeting_date=rollup_date,
+            created_by=organizer_id,
+            participants=[]
+        )
+        after_create = counts()
+        self.assertEqual(after_create['total_meetings'], before['total_meetings'] + 1)
+        self.assertEqual(after_create['scheduled'], before['scheduled'] + 1)
+        
+        db.cancel_meeting(meeting_id)
+        after_cancel = counts()
+        self.assertEqual(after_cancel['scheduled'], before['scheduled'])
+        self.assertEqual(after_cancel['cancelled'], before['cancelled'] + 1)
+        
+        # Compaction recomputes the same numbers from the base tables
+        db.compact_rollups(rollup_date, rollup_date)
+        self.assertEqual(counts(), after_cancel)
+        
+        print(f"  Rollups for {rollup_date} match after create/cancel/compact")
+    
+    def test_get_meeting_timeseries(self):
+        """Test that time-series buckets add up to the range totals."""
+        print("\n✓ Testing: Meeting time series")
+        
+        start_date = date.today() - timedelta(days=90)
+        end_date = date.today() + timedelta(days=90)
+        rows = db.get_meeting_timeseries_rows(start_date, end_date)
+        
+        for bucket in BUCKETS:
+            series = db.get_meeting_timeseries(start_date, end_date, bucket)['series']
+            self.assertEqual(sum(b['meetings'] for b in series), len(rows))
+            # The pure-Python fallback must agree with whichever path ran
+            self.assertEqual(series, aggregate_timeseries(rows, start_date, end_date, bucket, use_numpy=False))
+        
+        print(f"  {len(rows)} meetings bucketed by day/week/month")
+    
+    def test_room_utilization_report(self):
+        """Test the room utilization report and its cache."""
+        print("\n✓ Testing: Room utilization report")
+        
+        start_date = date.today() - timedelta(days=30)
+        end_date = date.today() + timedelta(days=30)
+        report = db.get_room_utilization(start_date, end_date)
+        
+        booked = len([row for row in db.get_room_utilization_rows(start_date, end_date)
+                      if row['room_id'] in report['heatmap']['room_ids']])
+        self.assertEqual(sum(room['meetings'] for room in report['rooms']), booked)
+        for room in report['rooms']:
+            self.assertEqual(room['room_id'] in report['idle_rooms'], room['meetings'] == 0)
+        self.assertIs(db.get_room_utilization(start_date, end_date), report)
+        
+        # A write clears the cache
+        db.create_user("Utilization User", "utilization.test@university.edu", "student")
+        self.assertIsNot(db.get_room_utilization(start_date, end_date), report)
+        
+        print(f"  {booked} bookings across {len(report['rooms'])} rooms")
+    
+    def test_distinct_participants_sketch(self):
+        """Test approximate distinct participants against the exact count."""
+        print("\n✓ Testing: Distinct participants (approx vs exact)")
+        
+        organizer_id = db.create_user("Sketch Organizer", "sketch.test@university.edu", "professor")
+        student_ids = [
+            db.create_user(f"Sketch Student {i}", f"sketch{i}.test@university.edu", "student")
+            for i in range(5)
+        ]
+        sketch_date = date.today() + timedelta(days=75)
+        for slot_id in (1, 2):
+            db.create_meeting(
+                title="Sketch Meeting",
+                description="Distinct participants",
+                room_id=None,
+                slot_id=slot_id,
+                meeting_date=sketch_date,
+                created_by=organizer_id,
+                participants=student_ids
+            )
+        
+        result = db.get_distinct_participants(sketch_date, sketch_date, organizer_id, mode='both')
+        self.assertEqual(result['exact'], len(student_ids))
+        # Small cardinalities fall in HyperLogLog's exact linear-counting range
+        self.assertEqual(result['approximate'], result['exact'])
+        
+        print(f"  approx={result['approximate']} exact={result['exact']}")
+
+class InstrumentationTests(IntegrationTestCase):
+    """Test request and database instrumentation."""
+    
+    def test_request_metrics_count_database_work(self):
+        """Test that queries inside a request are attributed to its route."""
+        print("\n✓ Testing: Request metrics")
+        
+        db.add_listener(metrics.on_database_event)
+        labels = (('method', 'GET'), ('route', '/test/metrics'))
+        stats = metrics.start_request()
+        db.execute_query("SELECT 1 AS one")
+        db.execute_complex_query("SELECT 2 AS two")
+        metrics.finish_request(stats, 'GET', '/test/metrics', 200)
+        
+        self.assertEqual(stats.queries, 2)
+        self.assertGreater(stats.db_seconds, 0)
+        collected = metrics.registry.collect()
+        self.assertGreaterEqual(collected[('http_requests_total', labels + (('status', '200'),))], 1)
+        self.assertIn(('db_query_duration_seconds', (('kind', 'complex'),)), collected)
+        
+        rendered = metrics.registry.render()
+        self.assertIn('http_request_db_queries_bucket{method="GET",route="/test/metrics",le="2"}', rendered)
+        self.assertIn('# TYPE db_pool_wait_seconds histogram', rendered)
+        
+        print(f"  {stats.queries} queries, {stats.db_seconds * 1000:.2f} ms DB time")
+    
+    def test_metrics_fold_finished_threads(self):
+        """Test that a thread's metrics outlive it without keeping its shard."""
+        print("\n✓ Testing: Metrics shards of finished threads")
+        
+        registry = metrics.MetricsRegistry()
+        registry.counter('test_total', 'Test counter.')
+        threads = [threading.Thread(target=registry.inc, args=('test_total',)) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(registry.collect()[('test_total', ())], 50)
+        self.assertEqual(len(registry._shards), 0)
+        
+        print("  50 threads counted, no shards left")
+    
+    def test_query_timing_excludes_pool_wait(self):
+        """Test that a slow connection checkout is reported as pool wait, not query time."""
+        print("\n✓ Testing: Query timing after checkout")
+        
+        events = []
+        pool = db._connection_pool
+        checkout = pool.get_connection
+        
+        def slow_checkout():
+            time.sleep(0.2)
+            return checkout()
+        
+        listener = lambda event, info: events.append((event, info['seconds']))
+        pool.get_connection = slow_checkout
+        db.add_listener(listener)
+        try:
+            db.execute_query("SELECT room_id FROM meeting_rooms WHERE room_id = %s", (1,))
+            db.execute_complex_query("SELECT room_id FROM meeting_rooms WHERE room_id = %s", (2,))
+        finally:
+            db.remove_listener(listener)
+            del pool.get_connection
+        
+        waits = [seconds for event, seconds in events if event == 'pool_wait']
+        queries = [seconds for event, seconds in events if event == 'query']
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(all(seconds >= 0.2 for seconds in waits))
+        self.assertTrue(all(seconds < 0.2 for seconds in queries))
+        
+        print(f"  Pool wait {max(waits):.3f}s, query {max(queries):.4f}s")
+    
+    def test_slow_query_log_captures_plans(self):
+        """Test that slow queries are fingerprinted and EXPLAINed out of band."""
+        print("\n✓ Testing: Slow query log")
+        
+        lines = []
+        slow_log = SlowQueryLog(threshold_ms=0, explain_sample=1.0,
+                                connect=db.open_dedicated_connection, writer=lines.append)
+        db.add_listener(slow_log.on_database_event)
+        try:
+            for room_count in (1, 3):
+                db.execute_query(
+                    f"SELECT room_id FROM meeting_rooms WHERE room_id IN ({', '.join(['%s'] * room_count)})",
+                    tuple(range(1, room_count + 1))
+                )
+        finally:
+            db.remove_listener(slow_log.on_database_event)
+        slow_log.flush()
+        
+        # Both IN lists share a fingerprint; only the first was explained
+        summary = slow_log.summary()
+        self.assertEqual(len(summary), 1)
+        self.assertEqual(summary[0]['count'], 2)
+        self.assertIn('IN (?+)', summary[0]['sql'])
+        self.assertEqual(summary[0]['plan_tables'][0]['table'], 'meeting_rooms')
+        
+        entries = [json.loads(line) for line in lines]
+        self.assertEqual(sum(1 for entry in entries if 'plan' in entry), 1)
+        self.assertEqual(sorted(entry['params'] for entry in entries), [['int'], ['int*3']])
+        
+        print(f"  {summary[0]['fingerprint']}: {summary[0]['plan_tables']}")
+    
+    def test_sampled_requests_feed_collapsed_stacks(self):
+        """Test that aggregate profiling writes flame graph stacks per route."""
+        print("\n✓ Testing: Aggregate request profiling")
+        
+        with tempfile.TemporaryDirectory() as output_dir:
+            profiler = RequestProfiler(sample_percent=100, output_dir=output_dir, flush_seconds=0)
+            state = profiler.start({}, 'GET /test/profile')
+            db.execute_query("SELECT SLEEP(0.1) AS slept")
+            profiler.finish(state)
+            
+            with open(profiler.aggregate_path) as handle:
+                lines = handle.read().splitlines()
+        
+        self.assertTrue(lines)
+        self.assertTrue(all(line.startswith('GET /test/profile;') for line in lines))
+        self.assertTrue(any('database.py:execute_query' in line for line in lines))
+        
+        samples = sum(int(line.rsplit(' ', 1)[1]) for line in lines)
+        print(f"  {samples} samples in {len(lines)} distinct stacks")
+    
+    def test_trace_nests_sql_under_database_calls(self):
+        """Test that a traced request exports route -> Database call -> SQL spans."""
+        print("\n✓ Testing: Request tracing")
+        
+        exported = []
+        tracer = tracing.Tracer(exporter=exported.append)
+        tracer.instrument(Database)
+        db.add_listener(tracer.on_database_event)
+        try:
+            incoming = '00-' + 'a' * 32 + '-' + 'b' * 16 + '-01'
+            request_span = tracer.start_request({'traceparent': incoming}, 'GET /test/trace')
+            db.get_user_schedule_with_conflicts(1, self.test_date, self.test_date + timedelta(days=7))
+            tracer.finish_request(request_span, 200)
+        finally:
+            db.remove_listener(tracer.on_database_event)
+        
+        self.assertEqual(len(exported), 1)
+        spans = json.loads(exported[0])['resourceSpans'][0]['scopeSpans'][0]['spans']
+        by_id = {span['spanId']: span for span in spans}
+        names = {span['name'] for span in spans}
+        self.assertTrue({'GET /test/trace', 'Database.get_user_schedule_with_conflicts', 'db.query',
+                         'db.pool_wait'} <= names)
+        self.assertTrue(all(span['traceId'] == 'a' * 32 for span in spans))
+        
+        root = next(span for span in spans if span['name'] == 'GET /test/trace')
+        self.assertEqual(root['parentSpanId'], 'b' * 16)
+        query = next(span for span in spans if span['name'] == 'db.query')
+        self.assertEqual(by_id[query['parentSpanId']]['name'], 'Database.get_user_schedule_with_conflicts')
+        
+        print(f"  {len(spans)} spans: {sorted(names)}")
+    
+    def test_full_log_queue_drops_and_counts(self):
+        """Test that logging never blocks on a full queue and counts what it drops."""
+        print("\n✓ Testing: Log queue overflow")
+        
+        test_logger = logging.getLogger('test_log_queue')
+        test_logger.propagate = False
+        records = queue.Queue(maxsize=2)
+        handler = logger.DroppingQueueHandler(records)
+        test_logger.addHandler(handler)
+        before = logger.dropped_records().get('test_log_queue', 0)
+        try:
+            for i in range(5):
+                test_logger.warning("record %s", i)
+        finally:
+            test_logger.removeHandler(handler)
+        
+        self.assertEqual(records.qsize(), 2)
+        self.assertEqual(logger.dropped_records()['test_log_queue'] - before, 3)
+        # Messages are formatted before they leave the calling thread
+        self.assertEqual(records.get_nowait().msg, "record 0")
+        self.assertIn('log_records_dropped_total{logger="test_log_queue"}', metrics.registry.render())
+
+    def test_access_log_report(self):
+        """Test that the access log analyzer weights sampled lines and splits windows."""
+        print("\n✓ Testing: Access log report")
+        
+        lines = [
+            "2025-11-17 10:00:01 - GET /api/users/3 | Route: /api/users/<int:user_id> | User: 1 | Status: 200 | Duration: 10.00ms\n",
+            "2025-11-17 10:00:02 - GET /api/users/4 | Route: /api/users/<int:user_id> | User: 1 | Status: 500 | Duration: 90.00ms | Sample: 0.5\n",
+            "2025-11-17 10:00:03 - GET /api/users/4 | Error: Database error\n",
+            '{"timestamp": "2025-11-17T11:30:00.000", "level": "INFO", "logger": "api_logger", "message": "", '
+            '"method": "POST", "endpoint": "/api/meetings", "route": "/api/meetings", "user_id": 2, '
+            '"status": 201, "duration_ms": 40.0}\n'
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'api.log')
+            with open(f"{path}.1", 'w') as handle:
+                handle.writelines(lines[:3])
+            with open(path, 'w') as handle:
+                handle.writelines(lines[3:])
+            files = access_log.log_files(path)
+            self.assertEqual(files, [f"{path}.1", path])
+            report = access_log.AccessReport(window_seconds=3600).consume(access_log.iter_entries(files)).to_dict()
+            later = list(access_log.iter_entries(files, since='2025-11-17 11:00:00'))
+        
+        self.assertEqual(report['lines'], 3)
+        users = next(row for row in report['endpoints'] if row['endpoint'] == 'GET /api/users/<int:user_id>')
+        # The sampled 500 stands for two requests
+        self.assertEqual(users['requests'], 3)
+        self.assertAlmostEqual(users['server_error_ratio'], 2 / 3, places=3)
+        self.assertLess(abs(users['p99_ms'] - 90) / 90, 0.05)
+        self.assertEqual([w['requests'] for w in report['windows']], [3, 1])
+        self.assertEqual(report['top_users'][0], {'user_id': '1', 'requests': 3})
+        self.assertEqual([entry.method for entry in later], ['POST'])
+        
+        print(f"  {report['lines']} lines, {len(report['windows'])} windows")
+
+    def test_batch_writes_one_access_log_line(self):
+        """Test that batch sub-requests stay out of the access log and bodies are redacted."""
+        print("\n✓ Testing: Batch access logging")
+        
+        import app as app_module
+        if not app_module.ACCESS_LOG_ENABLED:
+            self.skipTest("ACCESS_LOG_ENABLED is off")
+        logged = []
+        original = app_module.log_api_request
+        app_module.log_api_request = lambda method, endpoint, *args, **kwargs: logged.append(endpoint)
+        try:
+            response = app_module.app.test_client().post('/api/batch', json={'requests': [
+                {'id': 'rooms', 'method': 'GET', 'path': '/api/rooms'},
+                {'id': 'slots', 'method': 'GET', 'path': '/api/timeslots'}
+            ]})
+        finally:
+            app_module.log_api_request = original
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(logged, ['/api/batch'])
+        self.assertEqual(
+            app_module._redact({'requests': [{'body': {'password': 'secret', 'name': 'A'}}], 'token': 't'}),
+            {'requests': [{'body': {'password': '[redacted]', 'name': 'A'}}], 'token': '[redacted]'}
+        )
+        
+        print(f"  Logged {logged}")
+
+    def test_replay_rebuilds_logged_requests(self):
+        """Test that replay keeps logged queries and bodies and fills gaps from templates."""
+        print("\n✓ Testing: Replay request building")
+        
+        logged = access_log.parse_line(
+            '2025-11-17 10:00:01 - POST /api/meetings/search | Route: /api/meetings/search | Status: 200 '
+            '| Duration: 12.00ms | Body: {"title_keyword":"a | b"} | Sample: 0.25\n'
+        )
+        self.assertEqual(logged.body, {'title_keyword': 'a | b'})
+        self.assertEqual(logged.weight, 4)
+        
+        replayer = replay.Replayer('http://replay.invalid/')
+        self.assertEqual(replayer.build_request(logged),
+                         ('POST', 'http://replay.invalid/api/meetings/search', None, {'title_keyword': 'a | b'}))
+        
+        with_query = access_log.parse_line(
+            "2025-11-17 10:00:02 - GET /api/rooms/available?date=2025-11-18&start_time=10:00 "
+            "| Route: /api/rooms/available | Status: 200 | Duration: 3.00ms\n"
+        )
+        self.assertEqual(replayer.build_request(with_query)[1],
+                         'http://replay.invalid/api/rooms/available?date=2025-11-18&start_time=10:00')
+        
+        # Text logs without bodies: writes take the test_api.py payload
+        bodiless = logged._replace(body=None)
+        self.assertEqual(replayer.build_request(bodiless)[3]['status'], 'scheduled')
+        synthetic = next(replay.template_entries(1, methods=('POST',), seed=7))
+        method, url, params, body = replayer.build_request(synthetic)
+        self.assertEqual(method, 'POST')
+        self.assertTrue(url.startswith('http://replay.invalid/api/'))
+        self.assertIsNotNone(body)
 
 def run_tests():
     """Run all integration tests."""
@@ -220,9 +1161,14 @@ def run_tests():
     # Add test classes
     suite.addTests(loader.loadTestsFromTestCase(UserWorkflowTests))
     suite.addTests(loader.loadTestsFromTestCase(MeetingWorkflowTests))
+    suite.addTests(loader.loadTestsFromTestCase(BulkMeetingWorkflowTests))
+    suite.addTests(loader.loadTestsFromTestCase(BookingPathTests))
     suite.addTests(loader.loadTestsFromTestCase(ParticipantWorkflowTests))
+    suite.addTests(loader.loadTestsFromTestCase(SeriesWorkflowTests))
+    suite.addTests(loader.loadTestsFromTestCase(MentoringWorkflowTests))
     suite.addTests(loader.loadTestsFromTestCase(AvailabilityWorkflowTests))
     suite.addTests(loader.loadTestsFromTestCase(AnalyticsWorkflowTests))
+    suite.addTests(loader.loadTestsFromTestCase(InstrumentationTests))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
@@ -1,12 +1,29 @@
 """
 logger.py - Logging Configuration
 Centralized logging for the application
+
+Log calls never touch a file on the calling thread: every logger hands its
+records to one bounded queue, and a background listener thread writes them
+to the rotating files and the console. When the queue is full, records are
+dropped and counted (see dropped_records()) instead of blocking requests.
+The API request log can be sampled at high traffic (API_LOG_SAMPLE_RATE);
+kept records carry their sample_rate so reports can re-weight them.
 """
 
+import atexit
+import copy
+import json
 import logging
 import logging.handlers
 import os
+import queue
+import random
+import threading
+from collections import Counter
 from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
 
 # Create logs directory if it doesn't exist
 LOG_DIR = 'logs'
@@ -17,6 +34,125 @@ if not os.path.exists(LOG_DIR):
 ERROR_LOG = os.path.join(LOG_DIR, 'error.log')
 INFO_LOG = os.path.join(LOG_DIR, 'info.log')
 API_LOG = os.path.join(LOG_DIR, 'api.log')
+SLOW_QUERY_LOG = os.path.join(LOG_DIR, 'slow_queries.log')
+TRACE_LOG = os.path.join(LOG_DIR, 'traces.jsonl')
+
+# 'text' or 'json' (one JSON document per line) for the application and API logs
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()
+# Records waiting for the writer thread before new ones are dropped
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+# Share of INFO API request records kept; warnings and errors are always kept
+API_LOG_SAMPLE_RATE = float(os.getenv('API_LOG_SAMPLE_RATE', 1.0))
+
+class JsonFormatter(logging.Formatter):
+    """One JSON document per record, with any `fields` passed via extra=."""
+
+    def format(self, record):
+        document = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        document.update(getattr(record, 'fields', None) or {})
+        if getattr(record, 'sample_rate', 1.0) != 1.0:
+            document['sample_rate'] = record.sample_rate
+        if record.exc_text:
+            document['exception'] = record.exc_text
+        return json.dumps(document, default=str)
+
+class TextFormatter(logging.Formatter):
+    """The configured text format, marking records kept by sampling."""
+
+    def format(self, record):
+        text = super().format(record)
+        if getattr(record, 'sample_rate', 1.0) != 1.0:
+            text += f" | Sample: {record.sample_rate:g}"
+        return text
+
+class SamplingFilter(logging.Filter):
+    """Keep `rate` of the records below WARNING; warnings and errors always pass."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1:
+            return True
+        if random.random() < self.rate:
+            record.sample_rate = self.rate
+            return True
+        return False
+
+_dropped = Counter()
+_dropped_lock = threading.Lock()
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that counts and drops records when the queue is full."""
+
+    def prepare(self, record):
+        # Resolve the message and traceback here, while args and exc_info are
+        # still valid; formatting itself happens on the writer thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with _dropped_lock:
+                _dropped[record.name] += 1
+
+class _Router(logging.Handler):
+    """Runs on the writer thread: passes each record to its logger's handlers."""
+
+    def __init__(self):
+        super().__init__()
+        self.routes = {}
+
+    def handle(self, record):
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room: a full queue must still be drained on shutdown
+        self.queue.put(self._sentinel)
+
+_log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_router = _Router()
+_listener = _Listener(_log_queue, _router)
+
+def _route(target_logger, handlers):
+    """Send target_logger's records through the queue to handlers."""
+    _router.routes[target_logger.name] = handlers
+    target_logger.addHandler(DroppingQueueHandler(_log_queue))
+
+def set_sample_rate(target_logger, rate):
+    """
+    Keep `rate` (0-1) of target_logger's INFO and DEBUG records. Sampling runs
+    on the calling thread, so dropped records are never queued.
+    """
+    for existing in [f for f in target_logger.filters if isinstance(f, SamplingFilter)]:
+        target_logger.removeFilter(existing)
+    if rate < 1:
+        target_logger.addFilter(SamplingFilter(rate))
+
+def _line_formatter(text_format):
+    if LOG_FORMAT == 'json':
+        return JsonFormatter()
+    return TextFormatter(text_format, datefmt='%Y-%m-%d %H:%M:%S')
 
 def setup_logging():
     """Setup and configure logging for the application."""
@@ -26,10 +162,7 @@ def setup_logging():
     logger.setLevel(logging.DEBUG)
     
     # Create formatters
-    detailed_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    detailed_formatter = _line_formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     
     # Error Log Handler (WARNING and above)
     error_handler = logging.handlers.RotatingFileHandler(
@@ -54,10 +187,8 @@ def setup_logging():
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(detailed_formatter)
     
-    # Add handlers to logger
-    logger.addHandler(error_handler)
-    logger.addHandler(info_handler)
-    logger.addHandler(console_handler)
+    # Write through the queue
+    _route(logger, [error_handler, info_handler, console_handler])
     
     return logger
 
@@ -66,12 +197,10 @@ def setup_api_logger():
     
     api_logger = logging.getLogger('api_logger')
     api_logger.setLevel(logging.INFO)
+    api_logger.propagate = False
     
     # API formatter - more concise
-    api_formatter = logging.Formatter(
-        '%(asctime)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    api_formatter = _line_formatter('%(asctime)s - %(message)s')
     
     # API Log Handler
     api_handler = logging.handlers.RotatingFileHandler(
@@ -82,13 +211,68 @@ def setup_api_logger():
     api_handler.setLevel(logging.INFO)
     api_handler.setFormatter(api_formatter)
     
-    api_logger.addHandler(api_handler)
+    _route(api_logger, [api_handler])
+    set_sample_rate(api_logger, API_LOG_SAMPLE_RATE)
     
     return api_logger
 
+def setup_slow_query_logger():
+    """Setup logger for slow queries: one JSON document per line."""
+    
+    slow_query_logger = logging.getLogger('slow_query_logger')
+    slow_query_logger.setLevel(logging.INFO)
+    slow_query_logger.propagate = False
+    
+    # Slow Query Log Handler
+    slow_query_handler = logging.handlers.RotatingFileHandler(
+        SLOW_QUERY_LOG,
+        maxBytes=10*1024*1024,  # 10MB
+        backupCount=5
+    )
+    slow_query_handler.setLevel(logging.INFO)
+    slow_query_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    _route(slow_query_logger, [slow_query_handler])
+    
+    return slow_query_logger
+
+def setup_trace_logger():
+    """Setup logger for exported traces: one OTLP JSON document per line."""
+    
+    trace_logger = logging.getLogger('trace_logger')
+    trace_logger.setLevel(logging.INFO)
+    trace_logger.propagate = False
+    
+    # Trace Log Handler
+    trace_handler = logging.handlers.RotatingFileHandler(
+        TRACE_LOG,
+        maxBytes=50*1024*1024,  # 50MB
+        backupCount=5
+    )
+    trace_handler.setLevel(logging.INFO)
+    trace_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    _route(trace_logger, [trace_handler])
+    
+    return trace_logger
+
 # Initialize loggers
 logger = setup_logging()
 api_logger = setup_api_logger()
+slow_query_logger = setup_slow_query_logger()
+trace_logger = setup_trace_logger()
+
+_listener.start()
+atexit.register(_listener.stop)
+
+def flush_logs():
+    """Block until every queued record has been written."""
+    _log_queue.join()
+
+def dropped_records():
+    """{logger name: records dropped because the queue was full}."""
+    with _dropped_lock:
+        return dict(_dropped)
 
 # Convenience functions
 def log_info(message):
@@ -107,16 +291,40 @@ def log_debug(message):
     """Log debug level message."""
     logger.debug(message)
 
-def log_api_request(method, endpoint, user_id=None, status=None):
-    """Log API request."""
+def log_api_request(method, endpoint, user_id=None, status=None, duration_ms=None, route=None,
+                    query=None, body=None):
+    """
+    Log API request.
+    
+    Args:
+        method: HTTP method
+        endpoint: Request path
+        user_id: Authenticated user, if any
+        status: Response status code
+        duration_ms: Time to handle the request
+        route: Matched URL rule, e.g. /api/users/<int:user_id>
+        query: Raw query string, so the request can be replayed
+        body: JSON request body, so the request can be replayed
+    """
+    query_info = f"?{query}" if query else ""
+    route_info = f" | Route: {route}" if route else ""
     user_info = f" | User: {user_id}" if user_id else ""
     status_info = f" | Status: {status}" if status else ""
-    api_logger.info(f"{method} {endpoint}{user_info}{status_info}")
+    duration_info = f" | Duration: {duration_ms:.2f}ms" if duration_ms is not None else ""
+    body_info = f" | Body: {json.dumps(body, separators=(',', ':'), default=str)}" if body is not None else ""
+    api_logger.info(
+        f"{method} {endpoint}{query_info}{route_info}{user_info}{status_info}{duration_info}{body_info}",
+        extra={'fields': {'method': method, 'endpoint': endpoint, 'query': query or None, 'route': route,
+                          'user_id': user_id, 'status': status, 'duration_ms': duration_ms, 'body': body}}
+    )
 
 def log_api_error(method, endpoint, error_message, user_id=None):
     """Log API error."""
     user_info = f" | User: {user_id}" if user_id else ""
-    api_logger.error(f"{method} {endpoint} | Error: {error_message}{user_info}")
+    api_logger.error(
+        f"{method} {endpoint} | Error: {error_message}{user_info}",
+        extra={'fields': {'method': method, 'endpoint': endpoint, 'user_id': user_id, 'error': error_message}}
+    )
 
 if __name__ == '__main__':
     # Test logging
@@ -127,8 +335,11 @@ if __name__ == '__main__':
         1 / 0
     except:
         log_error("An error occurred", exc_info=True)
+    flush_logs()
     
     print("\n✅ Logging system initialized")
     print(f"  Error log: {ERROR_LOG}")
     print(f"  Info log: {INFO_LOG}")
     print(f"  API log: {API_LOG}")
+    print(f"  Slow query log: {SLOW_QUERY_LOG}")
+    print(f"  Trace log: {TRACE_LOG}")
@@ -0,0 +1,74 @@
+"""
+matching.py - FAM Mentor Matching
+Assigns students to FAM mentors in one in-memory pass.
+
+Each student goes to the FAM in their department with free capacity that
+scores best on, in order: shared specialization keywords, overlapping weekly
+availability (optional), lowest current load, highest rating. Capacities are
+decremented as students are placed, so one batch never overfills a FAM.
+"""
+
+def specialization_keywords(text):
+    """Lower-cased keywords from a comma separated specialization string."""
+    return {part.strip().lower() for part in (text or '').split(',') if part.strip()}
+
+def availability_mask(slot_ids):
+    """Bitset of weekly slot ids a user is available in."""
+    mask = 0
+    for slot_id in slot_ids:
+        mask |= 1 << slot_id
+    return mask
+
+def match_students(students, fams, interests=None, availability=None):
+    """
+    Pick a FAM for every student that can be placed.
+
+    Args:
+        students: Dicts with id, department and user_id
+        fams: Dicts with id, department, specialization, rating, mentees,
+            max_mentees and user_id
+        interests: {student_id: [keyword, ...]} matched against specialization
+        availability: {user_id: slot bitset}; None skips the availability term
+
+    Returns:
+        One result per student, in order:
+        {'student_id', 'fam_id', 'status': 'matched' | 'unmatched', 'reason'}
+    """
+    interests = interests or {}
+    by_department = {}
+    for fam in fams:
+        candidate = dict(fam, keywords=specialization_keywords(fam.get('specialization')),
+                         mentees=fam.get('mentees') or 0)
+        by_department.setdefault(fam['department'], []).append(candidate)
+
+    results = []
+    for student in students:
+        candidates = [fam for fam in by_department.get(student['department'], [])
+                      if fam['mentees'] < fam['max_mentees']]
+        if not candidates:
+            reason = ('No FAM in department' if student['department'] not in by_department
+                      else 'All FAMs in department are full')
+            results.append({'student_id': student['id'], 'fam_id': None,
+                            'status': 'unmatched', 'reason': reason})
+            continue
+
+        wanted = {keyword.strip().lower() for keyword in interests.get(student['id'], [])}
+        student_slots = (availability or {}).get(student.get('user_id'), 0)
+
+        def score(fam):
+            overlap = 0
+            if availability is not None:
+                overlap = (student_slots & availability.get(fam.get('user_id'), 0)).bit_count()
+            return (
+                len(wanted & fam['keywords']),
+                overlap,
+                -fam['mentees'] / fam['max_mentees'],
+                float(fam.get('rating') or 0),
+                -fam['id']
+            )
+
+        best = max(candidates, key=score)
+        best['mentees'] += 1
+        results.append({'student_id': student['id'], 'fam_id': best['id'],
+                        'status': 'matched', 'reason': None})
+    return results
@@ -0,0 +1,212 @@
+"""
+metrics.py - Request & Database Metrics
+Per-route latency histograms, database time and query count per request,
+connection pool wait time and status counts, rendered in the Prometheus text
+format for GET /metrics.
+
+Every thread records into its own shard, a plain dict no other thread writes,
+so recording takes no lock; a scrape sums the shards. When a thread ends, its
+shard is folded into a shared total, so thread-per-request servers keep one
+shard per live thread. Values are per process: with several worker processes,
+scrape each one.
+"""
+
+import contextvars
+import threading
+import weakref
+from bisect import bisect_left
+from time import perf_counter
+
+import logger
+
+# Histogram upper bounds: seconds, and queries per request
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+class MetricsRegistry:
+    """Counters and histograms with per-thread shards."""
+
+    def __init__(self):
+        self._definitions = {}   # name -> (type, help, buckets)
+        self._sources = {}       # name -> callable returning {labels: value}
+        self._local = threading.local()
+        self._shards = {}        # id(shard) -> shard, one per live thread
+        self._retired = {}       # values of shards whose thread has ended
+        self._shards_lock = threading.Lock()
+
+    def counter(self, name, help_text, source=None):
+        """
+        Define a counter. With source, values are read at scrape time from
+        source(), a {labels: value} dict kept by the code being measured.
+        """
+        self._definitions[name] = ('counter', help_text, None)
+        if source is not None:
+            self._sources[name] = source
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self._definitions[name] = ('histogram', help_text, tuple(buckets))
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            # Once per thread. The thread-local drops the token when the
+            # thread ends, and the finalizer moves the shard into _retired.
+            shard = self._local.shard = {}
+            token = self._local.token = _ThreadToken()
+            with self._shards_lock:
+                self._shards[id(shard)] = shard
+            weakref.finalize(token, self._retire, shard)
+        return shard
+
+    def _retire(self, shard):
+        with self._shards_lock:
+            del self._shards[id(shard)]
+            for key, value in shard.items():
+                _merge(self._retired, key, value)
+
+    def inc(self, name, labels=(), value=1):
+        """Add value to a counter; labels is a tuple of (name, value) pairs."""
+        shard = self._shard()
+        key = (name, labels)
+        shard[key] = shard.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        """Record one histogram observation."""
+        buckets = self._definitions[name][2]
+        shard = self._shard()
+        key = (name, labels)
+        series = shard.get(key)
+        if series is None:
+            # One count per bucket, one for values above the last bound, then the sum
+            series = shard[key] = [0] * (len(buckets) + 2)
+        series[bisect_left(buckets, value)] += 1
+        series[-1] += value
+
+    def collect(self):
+        """{(name, labels): value} summed over every thread."""
+        merged = {}
+        with self._shards_lock:
+            # Taken together, so a shard retired meanwhile is not counted twice
+            shards = list(self._shards.values())
+            for key, value in self._retired.items():
+                _merge(merged, key, value)
+        for shard in shards:
+            # list() copies under the GIL while the owner may be adding keys
+            for key, value in list(shard.items()):
+                _merge(merged, key, value)
+        for name, source in self._sources.items():
+            for labels, value in source().items():
+                merged[(name, labels)] = value
+        return merged
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format."""
+        by_name = {}
+        for (name, labels), value in self.collect().items():
+            by_name.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name, (kind, help_text, buckets) in self._definitions.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(by_name.get(name, ()), key=lambda series: series[0]):
+                if kind == 'counter':
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + (float('inf'),), value[:-1]):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(value[-1])}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return '\n'.join(lines) + '\n'
+
+class _ThreadToken:
+    """Weakly referenceable marker that lives exactly as long as its thread's local."""
+    __slots__ = ('__weakref__',)
+
+def _merge(totals, key, value):
+    """Add a counter value or histogram series into totals."""
+    if isinstance(value, list):
+        current = totals.get(key)
+        if current is None:
+            totals[key] = list(value)
+        else:
+            for i, part in enumerate(value):
+                current[i] += part
+    else:
+        totals[key] = totals.get(key, 0) + value
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+registry = MetricsRegistry()
+registry.histogram('http_request_duration_seconds', 'HTTP request latency by route.')
+registry.counter('http_requests_total', 'HTTP requests by route and status code.')
+registry.histogram('http_request_db_seconds', 'Database time spent per HTTP request by route.')
+registry.histogram('http_request_db_queries', 'Database queries per HTTP request by route.', QUERY_COUNT_BUCKETS)
+registry.histogram('db_query_duration_seconds', 'Database query latency by kind.')
+registry.counter('db_query_errors_total', 'Failed database queries by kind.')
+registry.histogram('db_pool_wait_seconds', 'Time to acquire a pooled database connection.')
+registry.counter('log_records_dropped_total', 'Log records dropped because the log queue was full, by logger.',
+                 source=lambda: {(('logger', name),): count for name, count in logger.dropped_records().items()})
+
+# Database work of the request being handled in this context
+_request_stats = contextvars.ContextVar('metrics_request_stats', default=None)
+
+class RequestStats:
+    """Database totals of one request."""
+    __slots__ = ('started', 'db_seconds', 'queries', '_token')
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.db_seconds = 0.0
+        self.queries = 0
+        self._token = None
+
+def start_request():
+    """Begin measuring a request; pass the result to finish_request()."""
+    stats = RequestStats()
+    stats._token = _request_stats.set(stats)
+    return stats
+
+def finish_request(stats, method, route, status):
+    """Record a request begun with start_request()."""
+    elapsed = perf_counter() - stats.started
+    try:
+        _request_stats.reset(stats._token)
+    except ValueError:
+        # Finished in a different context than it started (never nested)
+        pass
+    labels = (('method', method), ('route', route))
+    registry.observe('http_request_duration_seconds', labels, elapsed)
+    registry.inc('http_requests_total', labels + (('status', str(status)),))
+    registry.observe('http_request_db_seconds', labels, stats.db_seconds)
+    registry.observe('http_request_db_queries', labels, stats.queries)
+
+def on_database_event(event, info):
+    """Database listener (see Database.add_listener)."""
+    if event == 'query':
+        labels = (('kind', info['kind']),)
+        registry.observe('db_query_duration_seconds', labels, info['seconds'])
+        if info['error'] is not None:
+            registry.inc('db_query_errors_total', labels)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.db_seconds += info['seconds']
+            stats.queries += 1
+    elif event == 'pool_wait':
+        registry.observe('db_pool_wait_seconds', (), info['seconds'])
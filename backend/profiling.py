@@ -0,0 +1,215 @@
+"""
+profiling.py - Request Profiling
+Profiles single requests on demand and samples a share of all requests into
+collapsed-stack files for flame graphs.
+
+On demand: a request carrying X-Profile-Token (matching PROFILING_TOKEN) runs
+under cProfile (X-Profile-Mode: cprofile, the default) or the stack sampler
+(X-Profile-Mode: sample). The profile is stored under logs/profiles and named
+in the X-Profile-Id response header; X-Profile-Output: inline returns it as
+the response body instead of the route's own.
+
+Aggregate: PROFILE_SAMPLE_PERCENT of requests are stack-sampled and merged
+into logs/profiles/aggregate-<pid>.collapsed, one "frame;frame;... count"
+line per stack with the route as the root frame, ready for flamegraph.pl or
+speedscope.
+
+Nothing here runs unless the app enables it; when enabled, unprofiled
+requests cost one header lookup and one random number.
+"""
+
+import atexit
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from logger import LOG_DIR
+
+PROFILE_DIR = os.path.join(LOG_DIR, 'profiles')
+
+TOKEN_HEADER = 'X-Profile-Token'
+MODE_HEADER = 'X-Profile-Mode'
+OUTPUT_HEADER = 'X-Profile-Output'
+PROFILE_MODES = ('cprofile', 'sample')
+
+def collapse_stack(frame):
+    """'file:function;...' from the outermost frame to frame."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+def render_collapsed(stacks):
+    """Collapsed-stack text: one 'stack count' line per stack."""
+    return ''.join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+class StackSampler:
+    """
+    One background thread that periodically records the current stack of
+    every registered thread. It sleeps while nothing is registered.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._targets = {}   # thread id -> Counter of collapsed stacks
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id):
+        """Begin sampling thread_id; returns the Counter its stacks go into."""
+        stacks = Counter()
+        with self._lock:
+            self._targets[thread_id] = stacks
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return stacks
+
+    def stop(self, thread_id):
+        """Stop sampling thread_id and return its stacks."""
+        with self._lock:
+            return self._targets.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, stacks in self._targets.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[collapse_stack(frame)] += 1
+                if not self._targets:
+                    self._wake.clear()
+            del frames
+            time.sleep(self.interval)
+
+class RequestProfiler:
+    """Starts and finishes profiles around requests (see the app's hooks)."""
+
+    def __init__(self, token='', sample_percent=0.0, output_dir=PROFILE_DIR,
+                 interval=0.005, flush_seconds=60):
+        """
+        Args:
+            token: Secret that X-Profile-Token must match; empty disables
+                on-demand profiling
+            sample_percent: Share of requests (0-100) merged into the
+                aggregate collapsed-stack file
+            output_dir: Where profiles are written
+            interval: Seconds between stack samples
+            flush_seconds: How often the aggregate file is rewritten
+        """
+        self.token = token
+        self.sample_percent = sample_percent
+        self.output_dir = output_dir
+        self.flush_seconds = flush_seconds
+        self.sampler = StackSampler(interval)
+        # cProfile can only trace one request at a time per process
+        self._cprofile_lock = threading.Lock()
+        self._aggregate = Counter()
+        self._aggregate_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.aggregate_path = os.path.join(output_dir, f"aggregate-{os.getpid()}.collapsed")
+        if sample_percent:
+            atexit.register(self.flush)
+
+    def start(self, headers, label):
+        """
+        Profile the current request if asked to or sampled.
+
+        Args:
+            headers: Request headers
+            label: Route label, e.g. 'GET /api/users/<int:user_id>'
+
+        Returns:
+            State for finish(), or None when the request is not profiled
+        """
+        token = headers.get(TOKEN_HEADER)
+        if token and self.token and hmac.compare_digest(token, self.token):
+            mode = headers.get(MODE_HEADER, 'cprofile').lower()
+            state = {'label': label, 'mode': mode if mode in PROFILE_MODES else 'cprofile',
+                     'inline': headers.get(OUTPUT_HEADER, '').lower() == 'inline'}
+            if state['mode'] == 'cprofile':
+                if not self._cprofile_lock.acquire(blocking=False):
+                    return {'label': label, 'mode': None, 'error': 'Another request is being profiled'}
+                state['profile'] = cProfile.Profile()
+                state['profile'].enable()
+            else:
+                self.sampler.start(threading.get_ident())
+            return state
+        if self.sample_percent and random.random() * 100 < self.sample_percent:
+            self.sampler.start(threading.get_ident())
+            return {'label': label, 'mode': 'aggregate'}
+        return None
+
+    def finish(self, state, response=None):
+        """Stop the profile begun by start() and store or attach it to response."""
+        mode = state['mode']
+        if mode is None:
+            if response is not None:
+                response.headers['X-Profile-Error'] = state['error']
+            return response
+
+        if mode == 'aggregate':
+            stacks = self.sampler.stop(threading.get_ident())
+            with self._aggregate_lock:
+                for stack, count in stacks.items():
+                    self._aggregate[f"{state['label']};{stack}"] += count
+                due = time.monotonic() - self._last_flush >= self.flush_seconds
+            if due:
+                self.flush()
+            return response
+
+        if mode == 'cprofile':
+            state['profile'].disable()
+            self._cprofile_lock.release()
+            output = io.StringIO()
+            stats = pstats.Stats(state['profile'], stream=output)
+            stats.sort_stats('cumulative').print_stats(40)
+            text, extension = output.getvalue(), 'prof'
+        else:
+            stacks = self.sampler.stop(threading.get_ident())
+            text, extension = render_collapsed(stacks), 'collapsed'
+
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', state['label']).strip('_')
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S}-{slug}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{profile_id}.{extension}")
+        if mode == 'cprofile':
+            stats.dump_stats(path)
+        else:
+            with open(path, 'w') as handle:
+                handle.write(text)
+
+        if response is not None:
+            if state['inline']:
+                response.set_data(text)
+                response.content_type = 'text/plain; charset=utf-8'
+            response.headers['X-Profile-Id'] = f"{profile_id}.{extension}"
+        return response
+
+    def flush(self):
+        """Rewrite the aggregate collapsed-stack file with everything sampled so far."""
+        with self._aggregate_lock:
+            self._last_flush = time.monotonic()
+            if not self._aggregate:
+                return
+            os.makedirs(self.output_dir, exist_ok=True)
+            temporary = f"{self.aggregate_path}.tmp"
+            with open(temporary, 'w') as handle:
+                handle.write(render_collapsed(self._aggregate))
+            os.replace(temporary, self.aggregate_path)
@@ -0,0 +1,116 @@
+"""
+recurrence.py - Recurring Meeting Series
+Expands weekly meeting series into individual occurrences on demand.
+
+A series is stored as a single meeting_series row (a weekly rule on one time
+slot) plus skipped dates in meeting_series_exceptions. Only the next
+SERIES_HORIZON_DAYS are materialized into the meetings table; everything
+further out is generated lazily for whatever date window a query asks for.
+"""
+
+import os
+from datetime import date, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# How far ahead occurrences are written to the meetings table
+SERIES_HORIZON_DAYS = int(os.getenv('SERIES_HORIZON_DAYS', 14))
+
+def first_occurrence(start_date, day_of_week):
+    """First date on or after start_date that falls on day_of_week."""
+    offset = (WEEKDAYS.index(day_of_week.lower()) - start_date.weekday()) % 7
+    return start_date + timedelta(days=offset)
+
+def iter_occurrence_dates(series, window_start, window_end, exceptions=frozenset()):
+    """
+    Yield the dates of one series that fall inside [window_start, window_end].
+
+    Jumps straight to the first occurrence in the window, so the cost depends
+    on the window size rather than on how long the series has been running.
+
+    Args:
+        series: Row with start_date, until_date, day_of_week, interval_weeks
+        window_start: First date of interest
+        window_end: Last date of interest
+        exceptions: Dates to leave out
+    """
+    first = first_occurrence(series['start_date'], series['day_of_week'])
+    step = 7 * max(int(series.get('interval_weeks') or 1), 1)
+    last = min(series['until_date'], window_end)
+
+    current = first
+    if window_start > first:
+        periods = -(-(window_start - first).days // step)  # ceiling division
+        current = first + timedelta(days=periods * step)
+
+    while current <= last:
+        if current not in exceptions:
+            yield current
+        current += timedelta(days=step)
+
+def iter_virtual_occurrences(series_rows, window_start, window_end, exceptions=None):
+    """
+    Yield meeting-shaped dicts for occurrences that are not materialized yet.
+
+    Occurrences up to a series' materialized_until already exist as rows in
+    meetings (or were skipped), so only later dates are generated here.
+
+    Args:
+        series_rows: Series rows joined with their time slot (see
+            Database._series_rows)
+        window_start: First date of interest
+        window_end: Last date of interest
+        exceptions: {series_id: set of skipped dates}
+    """
+    exceptions = exceptions or {}
+    for series in series_rows:
+        start = window_start
+        if series.get('materialized_until') and series['materialized_until'] >= start:
+            start = series['materialized_until'] + timedelta(days=1)
+        skipped = exceptions.get(series['series_id'], frozenset())
+        for occurrence_date in iter_occurrence_dates(series, start, window_end, skipped):
+            yield {
+                'meeting_id': None,
+                'series_id': series['series_id'],
+                'title': series['title'],
+                'description': series.get('description'),
+                'meeting_date': occurrence_date,
+                'slot_id': series['slot_id'],
+                'start_time': series['start_time'],
+                'end_time': series['end_time'],
+                'day_of_week': series['day_of_week'],
+                'room_id': series.get('room_id'),
+                'room_name': series.get('room_name'),
+                'created_by': series['created_by'],
+                'organizer_name': series.get('organizer_name'),
+                'participant_count': series.get('participant_count', 0),
+                'status': 'scheduled',
+                'is_virtual': True
+            }
+
+def materialization_window(series, today=None, horizon_days=None):
+    """
+    Date range of a series that should be written to meetings now.
+
+    Returns:
+        (start, end) or None when nothing new falls inside the horizon
+    """
+    today = today or date.today()
+    horizon_end = today + timedelta(days=SERIES_HORIZON_DAYS if horizon_days is None else horizon_days)
+    start = max(today, series['start_date'])
+    if series.get('materialized_until'):
+        start = max(start, series['materialized_until'] + timedelta(days=1))
+    end = min(horizon_end, series['until_date'])
+    return (start, end) if start <= end else None
+
+if __name__ == '__main__':
+    # Run periodically (e.g. nightly cron) to roll the materialized horizon forward
+    from database import db
+
+    result = db.materialize_series()
+    print(f"✓ Materialized {result['created']} occurrence(s) across {result['series']} series")
+    for conflict in result['conflicts']:
+        print(f"  ⊘ Series {conflict['series_id']} on {conflict['meeting_date']}: {conflict['message']}")
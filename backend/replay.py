@@ -0,0 +1,294 @@
+"""
+replay.py - Traffic Replay Load Generator
+Replays requests recorded in logs/api.log (see access_log.py) against a
+running instance and reports throughput and latency percentiles per endpoint.
+
+Pacing:
+    --speed 1       original timing (the default); --speed 5 is five times faster
+    --max-rate      send as fast as --concurrency workers allow
+
+Requests are read from the log as they are due, so a replay of any length
+holds at most a few batches of them in memory. Only GET requests are
+replayed unless --writes is given; point writes at a scratch instance.
+
+Records without a logged body (text logs, or ACCESS_LOG_BODIES off) get the
+body of the matching template below, taken from the calls in test_api.py.
+With no log at all, --templates N replays N requests drawn from the
+templates instead.
+
+Usage:
+    python replay.py [files ...] [--base-url http://localhost:5000] [--speed 2 | --max-rate]
+                     [--concurrency 16] [--limit 10000] [--writes] [--token JWT] [--json]
+    python replay.py --templates 5000 --max-rate --concurrency 32
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import requests
+
+from access_log import (
+    AccessEntry, EndpointStats, endpoint_key, format_ms, iter_entries, log_files, print_endpoints
+)
+
+READ_METHODS = ('GET', 'HEAD')
+
+def request_templates():
+    """
+    One request per route, mirroring test_api.py: {'METHOD route': (path, params, body)}.
+    Dates are relative to today so replays keep hitting current data.
+    """
+    today = date.today()
+    tomorrow = (today + timedelta(days=1)).strftime('%Y-%m-%d')
+    week = (today + timedelta(days=7)).strftime('%Y-%m-%d')
+    month_ago = (today - timedelta(days=30)).strftime('%Y-%m-%d')
+    today = today.strftime('%Y-%m-%d')
+    return {
+        'GET /api/health': ('/api/health', None, None),
+        'POST /api/auth/login': ('/api/auth/login', None, {"email": "alice@university.edu", "role": "student"}),
+        'GET /api/users/<int:user_id>': ('/api/users/1', None, None),
+        'POST /api/users': ('/api/users', None, {"name": "Replay Student", "email": "replay@university.edu",
+                                                 "role": "student"}),
+        'GET /api/meetings/upcoming': ('/api/meetings/upcoming', {"user_id": 1, "limit": 5}, None),
+        'GET /api/meetings/<int:meeting_id>': ('/api/meetings/1', None, None),
+        'POST /api/meetings': ('/api/meetings', None, {
+            "title": "Replay Meeting", "description": "Replayed traffic", "room_id": 1, "slot_id": 1,
+            "meeting_date": tomorrow, "created_by": 1, "participants": [2, 3]
+        }),
+        'POST /api/meetings/schedule': ('/api/meetings/schedule', None, {
+            "requests": [{"title": "Replay Advising", "created_by": 1, "participants": [2],
+                          "window_start": tomorrow, "window_end": week}],
+            "dry_run": True
+        }),
+        'POST /api/meetings/search': ('/api/meetings/search', None, {"title_keyword": "Meeting",
+                                                                     "status": "scheduled"}),
+        'GET /api/rooms': ('/api/rooms', None, None),
+        'GET /api/rooms/available': ('/api/rooms/available', {"date": tomorrow, "start_time": "10:00",
+                                                              "end_time": "11:00"}, None),
+        'GET /api/timeslots': ('/api/timeslots', None, None),
+        'GET /api/timeslots/available': ('/api/timeslots/available', {"user_id": 1, "date": tomorrow}, None),
+        'POST /api/meetings/<int:meeting_id>/respond': ('/api/meetings/1/respond', None,
+                                                        {"user_id": 2, "response": "accepted"}),
+        'GET /api/user/<int:user_id>/schedule': ('/api/user/1/schedule', {"start_date": today, "end_date": week},
+                                                 None),
+        'POST /api/fams/match': ('/api/fams/match', None, {"dry_run": True}),
+        'GET /api/students/<int:student_id>/mentor-slots': ('/api/students/1/mentor-slots',
+                                                             {"start_date": tomorrow, "limit": 5}, None),
+        'GET /api/students/<int:student_id>/grades': ('/api/students/1/grades', None, None),
+        'GET /api/fams/<int:fam_id>/mentee-grades': ('/api/fams/1/mentee-grades',
+                                                     {"academic_year": "2024-2025"}, None),
+        'GET /api/analytics/meetings': ('/api/analytics/meetings', {"start_date": month_ago, "end_date": today},
+                                        None),
+        'GET /api/analytics/rooms/utilization': ('/api/analytics/rooms/utilization',
+                                                 {"start_date": month_ago, "end_date": today}, None),
+        'POST /api/batch': ('/api/batch', None, {"requests": [
+            {"id": "user", "method": "GET", "path": "/api/users/1"},
+            {"id": "rooms", "method": "GET", "path": "/api/rooms"},
+            {"id": "schedule", "method": "GET", "path": "/api/user/1/schedule",
+             "params": {"start_date": today, "end_date": week}}
+        ]})
+    }
+
+def template_entries(count, methods=READ_METHODS, seed=None):
+    """count entries drawn uniformly from the templates, one second apart."""
+    rng = random.Random(seed)
+    keys = [key for key in request_templates() if key.split(' ', 1)[0] in methods]
+    start = datetime.now().replace(microsecond=0)
+    for i in range(count):
+        method, route = rng.choice(keys).split(' ', 1)
+        yield AccessEntry((start + timedelta(seconds=i)).isoformat(sep=' '), method, None, route,
+                          None, 0, None, 1.0)
+
+class Replayer:
+    """Sends access log entries on schedule from a thread pool and aggregates the results."""
+
+    def __init__(self, base_url, concurrency=8, speed=1.0, max_rate=False, token=None, timeout=30,
+                 expand_samples=True):
+        """
+        Args:
+            base_url: Instance to replay against, e.g. http://localhost:5000
+            concurrency: Worker threads (requests in flight at most)
+            speed: Time compression; 1 keeps the recorded gaps between requests
+            max_rate: Ignore recorded timing and send as fast as workers allow
+            token: Bearer token sent with every request
+            timeout: Seconds before a request counts as failed
+            expand_samples: Send a record kept by log sampling 1 / sample_rate
+                times (on average), reproducing the full load
+        """
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.speed = speed
+        self.max_rate = max_rate
+        self.timeout = timeout
+        self.expand_samples = expand_samples
+        self.headers = {'Authorization': f"Bearer {token}"} if token else {}
+        self.templates = request_templates()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.endpoints = {}
+        self.failures = 0
+        self.sent = 0
+        self.max_lag = 0.0
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(self.headers)
+        return session
+
+    def build_request(self, entry):
+        """(method, url, query, body) for an entry, filling gaps from the templates."""
+        key = endpoint_key(entry)
+        template = self.templates.get(key)
+        path, query, body = entry.path, entry.query, entry.body
+        if template is not None:
+            if not path:
+                path, query = template[0], template[1]
+            if body is None and entry.method not in READ_METHODS:
+                body = template[2]
+        url = f"{self.base_url}{path}"
+        if isinstance(query, str):
+            url, query = f"{url}?{query}", None
+        return entry.method, url, query, body
+
+    def _send(self, entry):
+        method, url, params, body = self.build_request(entry)
+        started = time.perf_counter()
+        try:
+            response = self._session().request(method, url, params=params, json=body, timeout=self.timeout)
+            status = response.status_code
+        except requests.RequestException:
+            status = None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            if status is None:
+                self.failures += 1
+                return
+            key = endpoint_key(entry)
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+            stats.add(entry._replace(status=status, duration_ms=elapsed_ms, weight=1.0))
+
+    def _copies(self, entry):
+        if not self.expand_samples or entry.weight == 1.0:
+            return 1
+        whole = int(entry.weight)
+        return whole + (1 if random.random() < entry.weight - whole else 0)
+
+    def run(self, entries, limit=None):
+        """Replay entries (in log order) and return the report."""
+        # Bounded hand-off: the reader never runs more than a few batches ahead
+        slots = threading.BoundedSemaphore(self.concurrency * 4)
+
+        def send(entry):
+            try:
+                self._send(entry)
+            finally:
+                slots.release()
+
+        first = None
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='replay') as pool:
+            for entry in entries:
+                if limit is not None and self.sent >= limit:
+                    break
+                if not self.max_rate:
+                    recorded = datetime.fromisoformat(entry.timestamp).timestamp()
+                    if first is None:
+                        first = recorded
+                    due = started + (recorded - first) / self.speed
+                    wait = due - time.perf_counter()
+                    if wait > 0:
+                        time.sleep(wait)
+                    else:
+                        self.max_lag = max(self.max_lag, -wait)
+                for _ in range(self._copies(entry)):
+                    slots.acquire()
+                    pool.submit(send, entry)
+                    self.sent += 1
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed):
+        """Throughput and latency per endpoint, busiest first."""
+        rows = []
+        for key, stats in sorted(self.endpoints.items(), key=lambda item: -item[1].requests):
+            rows.append(dict(endpoint=key, **stats.to_dict(elapsed)))
+        completed = sum(row['requests'] for row in rows)
+        total = EndpointStats()
+        for stats in self.endpoints.values():
+            total.merge(stats)
+        return {
+            'base_url': self.base_url,
+            'mode': 'max-rate' if self.max_rate else f"{self.speed:g}x",
+            'concurrency': self.concurrency,
+            'sent': self.sent,
+            'completed': completed,
+            'failed': self.failures,
+            'seconds': round(elapsed, 3),
+            'throughput_per_sec': round(completed / elapsed, 2) if elapsed else None,
+            'max_schedule_lag_sec': round(self.max_lag, 3),
+            'overall': total.to_dict(elapsed) if completed else None,
+            'endpoints': rows
+        }
+
+def _print_report(report):
+    print(f"✓ Replayed {report['sent']} requests against {report['base_url']} "
+          f"({report['mode']}, {report['concurrency']} workers) in {report['seconds']} s")
+    print(f"  {report['throughput_per_sec']} req/s, {report['completed']} completed, {report['failed']} failed, "
+          f"max schedule lag {report['max_schedule_lag_sec']} s")
+    if report['overall']:
+        overall = report['overall']
+        print(f"  p50 {format_ms(overall['p50_ms'])} ms, p95 {format_ms(overall['p95_ms'])} ms, "
+              f"p99 {format_ms(overall['p99_ms'])} ms, 5xx {overall['server_error_ratio']:.1%}\n")
+    print_endpoints(report['endpoints'])
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded API traffic")
+    parser.add_argument('files', nargs='*', help="Access logs (default: logs/api.log and its backups)")
+    parser.add_argument('--base-url', default='http://localhost:5000', help="Instance to replay against")
+    pacing = parser.add_mutually_exclusive_group()
+    pacing.add_argument('--speed', type=float, default=1.0, help="Replay speed factor (1 = original rate)")
+    pacing.add_argument('--max-rate', action='store_true', help="Send as fast as the workers allow")
+    parser.add_argument('--concurrency', type=int, default=8, help="Worker threads")
+    parser.add_argument('--limit', type=int, help="Stop after this many requests")
+    parser.add_argument('--since', help="Only requests at or after this time")
+    parser.add_argument('--until', help="Only requests before this time")
+    parser.add_argument('--writes', action='store_true', help="Also replay POST/PUT/DELETE requests")
+    parser.add_argument('--no-expand-samples', action='store_true',
+                        help="Send sampled log records once instead of 1 / sample_rate times")
+    parser.add_argument('--templates', type=int, metavar='N',
+                        help="Replay N requests drawn from the test_api.py templates instead of a log")
+    parser.add_argument('--seed', type=int, help="Random seed for --templates")
+    parser.add_argument('--token', help="Bearer token sent with every request")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.speed <= 0 or args.concurrency < 1:
+        parser.error("--speed must be positive and --concurrency at least 1")
+    methods = None if args.writes else READ_METHODS
+    if args.templates:
+        entries = template_entries(args.templates, methods or ('GET', 'HEAD', 'POST', 'PUT', 'DELETE'), args.seed)
+    else:
+        since = datetime.fromisoformat(args.since).isoformat(sep=' ') if args.since else None
+        until = datetime.fromisoformat(args.until).isoformat(sep=' ') if args.until else None
+        entries = iter_entries(args.files or log_files(), since, until)
+        if methods:
+            entries = (entry for entry in entries if entry.method in methods)
+
+    replayer = Replayer(args.base_url, args.concurrency, args.speed, args.max_rate, args.token,
+                        expand_samples=not args.no_expand_samples)
+    report = replayer.run(entries, args.limit)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+"""
+scheduler.py - Batch Meeting Scheduler
+Places many meeting requests at once over in-memory availability bitsets.
+
+Every (date, time slot) in the scheduling window gets a bit position. Each
+user and room has an int bitmask of the positions where they are busy, so
+"is everyone free, and is a big enough room free" is a few ORs and ANDs per
+request. Requests are placed greedily, most constrained first; a repair pass
+then tries to fit each leftover request by moving one placed request that
+blocks it.
+"""
+
+from bisect import bisect_left
+from datetime import timedelta
+
+from recurrence import WEEKDAYS
+
+def _bits(mask):
+    """Positions of the set bits in mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def _lowest_bit(mask):
+    return (mask & -mask).bit_length() - 1
+
+class BatchScheduler:
+    """
+    Greedy-plus-repair placement of meeting requests.
+
+    Requests are dicts with:
+        people: user ids that must be free (organizer and participants)
+        window_start, window_end: dates the meeting may fall on
+        room_required: whether a room must be booked
+        min_capacity: seats the room needs (defaults to len(people))
+        min_duration_minutes: only consider slots at least this long
+    """
+
+    def __init__(self, slots, rooms, start_date, end_date):
+        """
+        Args:
+            slots: Time slots with slot_id, start_time, end_time, day_of_week
+            rooms: Active rooms with room_id and capacity
+            start_date: First date any request may use
+            end_date: Last date any request may use
+        """
+        by_day = {}
+        for slot in slots:
+            by_day.setdefault(slot['day_of_week'], []).append(slot)
+
+        self.positions = []
+        self._by_date = {}
+        current = start_date
+        while current <= end_date:
+            day_slots = sorted(by_day.get(WEEKDAYS[current.weekday()], []), key=lambda s: s['start_time'])
+            for slot in day_slots:
+                self._by_date.setdefault(current, []).append(len(self.positions))
+                self.positions.append((current, slot))
+            current += timedelta(days=1)
+        self._index = {(d, slot['slot_id']): i for i, (d, slot) in enumerate(self.positions)}
+
+        # Positions that cannot be used together with each position (same
+        # date, overlapping times), itself included
+        self._conflicts = [0] * len(self.positions)
+        for indexes in self._by_date.values():
+            for i in indexes:
+                _, slot = self.positions[i]
+                self._conflicts[i] = self._overlap_mask(self.positions[i][0], slot['start_time'], slot['end_time'])
+
+        self.rooms = sorted(rooms, key=lambda room: (room['capacity'], room['room_id']))
+        self._capacities = [room['capacity'] for room in self.rooms]
+        self._user_base = {}
+        self._room_base = {room['room_id']: 0 for room in self.rooms}
+        self._user_busy = {}
+        self._room_busy = dict(self._room_base)
+
+        self.requests = []
+        self.placements = {}   # request index -> (position, room_id or None)
+
+    # Existing commitments
+    def _overlap_mask(self, meeting_date, start_time, end_time):
+        mask = 0
+        for i in self._by_date.get(meeting_date, ()):
+            slot = self.positions[i][1]
+            if slot['start_time'] < end_time and slot['end_time'] > start_time:
+                mask |= 1 << i
+        return mask
+
+    def mark_user_busy(self, user_id, meeting_date, start_time, end_time):
+        """Record an existing meeting of user_id."""
+        mask = self._overlap_mask(meeting_date, start_time, end_time)
+        self._user_base[user_id] = self._user_base.get(user_id, 0) | mask
+        self._user_busy[user_id] = self._user_busy.get(user_id, 0) | mask
+
+    def mark_room_busy(self, room_id, meeting_date, start_time, end_time, slot_id=None):
+        """
+        Record an existing booking of room_id.
+
+        With slot_id only that exact position is blocked (cancelled meetings
+        still hold their row in unique_room_slot).
+        """
+        if room_id not in self._room_base:
+            return
+        if slot_id is not None:
+            index = self._index.get((meeting_date, slot_id))
+            mask = 1 << index if index is not None else 0
+        else:
+            mask = self._overlap_mask(meeting_date, start_time, end_time)
+        self._room_base[room_id] |= mask
+        self._room_busy[room_id] |= mask
+
+    # Feasibility
+    def _window_mask(self, request):
+        mask = 0
+        # A client may send null, which validation lets through as "no minimum"
+        min_minutes = request.get('min_duration_minutes') or 0
+        for i, (position_date, slot) in enumerate(self.positions):
+            if not request['window_start'] <= position_date <= request['window_end']:
+                continue
+            minutes = (slot['end_time'] - slot['start_time']).total_seconds() / 60
+            if minutes >= min_minutes:
+                mask |= 1 << i
+        return mask
+
+    def _fitting_rooms(self, request):
+        if not request['room_required']:
+            return []
+        return self.rooms[bisect_left(self._capacities, request['seats']):]
+
+    def _people_free(self, request):
+        busy = 0
+        for user_id in request['people']:
+            busy |= self._user_busy.get(user_id, 0)
+        return request['window'] & ~busy
+
+    def _feasible(self, request):
+        """Positions where everyone and (if required) a fitting room are free."""
+        free = self._people_free(request)
+        if request['room_required']:
+            room_free = 0
+            for room in self._fitting_rooms(request):
+                room_free |= free & ~self._room_busy[room['room_id']]
+            free = room_free
+        return free
+
+    # Placement
+    def _place(self, index, position, room_id=None):
+        request = self.requests[index]
+        if request['room_required'] and room_id is None:
+            # Best fit: the smallest fitting room free at this position
+            room_id = next(
+                room['room_id'] for room in self._fitting_rooms(request)
+                if not self._room_busy[room['room_id']] >> position & 1
+            )
+        conflicts = self._conflicts[position]
+        for user_id in request['people']:
+            self._user_busy[user_id] = self._user_busy.get(user_id, 0) | conflicts
+        if room_id is not None:
+            self._room_busy[room_id] |= conflicts
+        self.placements[index] = (position, room_id)
+
+    def _unplace(self, index):
+        position, room_id = self.placements.pop(index)
+        request = self.requests[index]
+        # Overlapping slots mean masks can share bits; rebuild from what remains
+        for user_id in request['people']:
+            mask = self._user_base.get(user_id, 0)
+            for other, (other_position, _) in self.placements.items():
+                if user_id in self.requests[other]['people']:
+                    mask |= self._conflicts[other_position]
+            self._user_busy[user_id] = mask
+        if room_id is not None:
+            mask = self._room_base[room_id]
+            for other_position, other_room in self.placements.values():
+                if other_room == room_id:
+                    mask |= self._conflicts[other_position]
+            self._room_busy[room_id] = mask
+        return position, room_id
+
+    def _blockers(self, request, position):
+        """Placed requests that stand in the way of request at position."""
+        conflicts = self._conflicts[position]
+        people, rooms = [], []
+        fitting = {room['room_id'] for room in self._fitting_rooms(request)}
+        for other, (other_position, other_room) in self.placements.items():
+            if not conflicts >> other_position & 1:
+                continue
+            if request['people'] & self.requests[other]['people']:
+                people.append(other)
+            elif other_room in fitting:
+                rooms.append(other)
+        return people, rooms
+
+    def _try_move(self, index, position, blocker):
+        """Place index at position by moving blocker elsewhere; undo on failure."""
+        old_position, old_room = self._unplace(blocker)
+        if self._feasible(self.requests[index]) >> position & 1:
+            self._place(index, position)
+            alternatives = self._feasible(self.requests[blocker])
+            if alternatives:
+                self._place(blocker, _lowest_bit(alternatives))
+                return True
+            self._unplace(index)
+        self._place(blocker, old_position, old_room)
+        return False
+
+    def _repair(self, index, max_positions):
+        request = self.requests[index]
+        for count, position in enumerate(_bits(request['window'])):
+            if count >= max_positions:
+                break
+            people, rooms = self._blockers(request, position)
+            if len(people) > 1:
+                continue
+            for blocker in people or rooms:
+                if self._try_move(index, position, blocker):
+                    return True
+        return False
+
+    def open_slots(self, people, window_start, window_end, room_required=True, seats=None):
+        """
+        Every (meeting_date, slot, room) where all of people and a fitting
+        room are free, earliest first; room is None when not required.
+        """
+        request = {'people': frozenset(people), 'window_start': window_start,
+                   'window_end': window_end, 'room_required': room_required}
+        request['seats'] = max(seats or 0, len(request['people']))
+        request['window'] = self._window_mask(request)
+        fitting = self._fitting_rooms(request)
+
+        for position in _bits(self._feasible(request)):
+            meeting_date, slot = self.positions[position]
+            room = None
+            if room_required:
+                room = next(r for r in fitting if not self._room_busy[r['room_id']] >> position & 1)
+            yield meeting_date, slot, room
+
+    def schedule(self, requests, max_repair_positions=64):
+        """
+        Place every request that can be placed.
+
+        Returns:
+            One result per request, in order: {'index', 'status':
+            'scheduled' | 'unschedulable', 'meeting_date', 'slot_id',
+            'room_id', 'reason'}
+        """
+        self.requests = []
+        for index, request in enumerate(requests):
+            people = frozenset(request['people'])
+            prepared = dict(request, people=people)
+            prepared['seats'] = max(request.get('min_capacity') or 0, len(people))
+            prepared['window'] = self._window_mask(prepared)
+            self.requests.append(prepared)
+
+        # Most constrained first: fewest feasible positions, then largest groups
+        order = sorted(
+            range(len(self.requests)),
+            key=lambda i: (self._feasible(self.requests[i]).bit_count(), -len(self.requests[i]['people']), i)
+        )
+        unplaced = []
+        for index in order:
+            feasible = self._feasible(self.requests[index])
+            if feasible:
+                self._place(index, _lowest_bit(feasible))
+            else:
+                unplaced.append(index)
+
+        for index in unplaced:
+            feasible = self._feasible(self.requests[index])
+            if feasible:
+                self._place(index, _lowest_bit(feasible))
+            else:
+                self._repair(index, max_repair_positions)
+
+        return [self._result(index) for index in range(len(self.requests))]
+
+    def _result(self, index):
+        result = {'index': index, 'status': 'scheduled', 'meeting_date': None,
+                  'slot_id': None, 'room_id': None, 'reason': None}
+        if index in self.placements:
+            position, room_id = self.placements[index]
+            meeting_date, slot = self.positions[position]
+            result.update(meeting_date=meeting_date, slot_id=slot['slot_id'], room_id=room_id)
+            return result
+
+        request = self.requests[index]
+        if not request['window']:
+            reason = 'No time slots in the requested window'
+        elif not self._people_free(request):
+            reason = 'Participants have no common free slot in the window'
+        elif request['room_required'] and not self._fitting_rooms(request):
+            reason = f"No room seats {request['seats']} people"
+        else:
+            reason = 'No fitting room is free when all participants are'
+        result.update(status='unschedulable', reason=reason)
+        return result
@@ -47,6 +47,29 @@ CREATE TABLE IF NOT EXISTS user_availability (
     UNIQUE KEY unique_user_slot (user_id, slot_id)
 );
 
+-- Recurring meeting series: one row per weekly rule. Occurrences inside
+-- the near horizon are materialized into meetings (see recurrence.py);
+-- later ones are expanded on demand.
+CREATE TABLE IF NOT EXISTS meeting_series (
+    series_id INT AUTO_INCREMENT PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    description TEXT,
+    room_id INT,
+    slot_id INT NOT NULL,
+    start_date DATE NOT NULL,
+    until_date DATE NOT NULL,
+    interval_weeks INT NOT NULL DEFAULT 1,
+    created_by INT NOT NULL,
+    status ENUM('active', 'cancelled') DEFAULT 'active',
+    materialized_until DATE NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (room_id) REFERENCES meeting_rooms(room_id) ON DELETE SET NULL,
+    FOREIGN KEY (slot_id) REFERENCES time_slots(slot_id) ON DELETE RESTRICT,
+    FOREIGN KEY (created_by) REFERENCES users(user_id) ON DELETE CASCADE,
+    INDEX idx_series_window (status, start_date, until_date)
+);
+
 -- Scheduled meetings
 CREATE TABLE IF NOT EXISTS meetings (
     meeting_id INT AUTO_INCREMENT PRIMARY KEY,
@@ -59,19 +82,23 @@ CREATE TABLE IF NOT EXISTS meetings (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     status ENUM('scheduled', 'completed', 'cancelled') DEFAULT 'scheduled',
+    series_id INT NULL,
     FOREIGN KEY (room_id) REFERENCES meeting_rooms(room_id) ON DELETE SET NULL,
     FOREIGN KEY (slot_id) REFERENCES time_slots(slot_id) ON DELETE RESTRICT,
     FOREIGN KEY (created_by) REFERENCES users(user_id) ON DELETE CASCADE,
-    UNIQUE KEY unique_room_slot (room_id, slot_id, meeting_date)
+    FOREIGN KEY (series_id) REFERENCES meeting_series(series_id) ON DELETE SET NULL,
+    UNIQUE KEY unique_room_slot (room_id, slot_id, meeting_date),
+    UNIQUE KEY unique_series_occurrence (series_id, meeting_date)
 );
 
--- Trigger to validate meeting date
+-- Trigger to validate meeting date. Bulk loads of historical data
+-- (synthetic_data.py) set @bulk_load = 1 for their session to skip it.
 DELIMITER //
 CREATE TRIGGER before_meeting_insert_update
 BEFORE INSERT ON meetings
 FOR EACH ROW
 BEGIN
-    IF NEW.meeting_date < CURDATE() THEN
+    IF COALESCE(@bulk_load, 0) = 0 AND NEW.meeting_date < CURDATE() THEN
         SIGNAL SQLSTATE '45000' 
         SET MESSAGE_TEXT = 'Meeting date cannot be in the past';
     END IF;
@@ -101,7 +128,44 @@ CREATE TABLE IF NOT EXISTS meeting_participants (
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
 );
 
--- Trigger to prevent double-booking of users
+-- Members of a recurring series (copied onto each materialized occurrence)
+CREATE TABLE IF NOT EXISTS meeting_series_participants (
+    series_id INT NOT NULL,
+    user_id INT NOT NULL,
+    PRIMARY KEY (series_id, user_id),
+    INDEX idx_series_participant_user (user_id),
+    FOREIGN KEY (series_id) REFERENCES meeting_series(series_id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+-- Occurrences of a series that will not take place
+CREATE TABLE IF NOT EXISTS meeting_series_exceptions (
+    series_id INT NOT NULL,
+    occurrence_date DATE NOT NULL,
+    reason ENUM('skipped', 'conflict') DEFAULT 'skipped',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (series_id, occurrence_date),
+    FOREIGN KEY (series_id) REFERENCES meeting_series(series_id) ON DELETE CASCADE
+);
+
+-- Busy index: one row per (user, slot, date) a participant is booked into.
+-- The primary key is the double-booking check for the set-based booking
+-- path (Database.create_meeting with booking_mode='set'), which inserts
+-- the whole participant set in one statement.
+CREATE TABLE IF NOT EXISTS user_busy_slots (
+    user_id INT NOT NULL,
+    slot_id INT NOT NULL,
+    meeting_date DATE NOT NULL,
+    meeting_id INT NOT NULL,
+    PRIMARY KEY (user_id, slot_id, meeting_date),
+    INDEX idx_busy_meeting (meeting_id),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (meeting_id) REFERENCES meetings(meeting_id) ON DELETE CASCADE
+);
+
+-- Per-row participant triggers. The set-based booking path sets
+-- @set_based_booking = 1 for its transaction and does the same work for
+-- the whole participant set itself, so both triggers step aside.
 DELIMITER //
 CREATE TRIGGER before_meeting_participant_insert
 BEFORE INSERT ON meeting_participants
@@ -109,20 +173,23 @@ FOR EACH ROW
 BEGIN
     DECLARE participant_count INT;
     
-    -- Check if user is already in another meeting at the same time
-    SELECT COUNT(*) INTO participant_count
-    FROM meeting_participants mp
-    JOIN meetings m ON mp.meeting_id = m.meeting_id
-    JOIN meetings new_meeting ON m.slot_id = new_meeting.slot_id 
-        AND m.meeting_date = new_meeting.meeting_date
-    WHERE mp.user_id = NEW.user_id 
-        AND m.status = 'scheduled'
-        AND new_meeting.meeting_id = NEW.meeting_id
-        AND mp.response != 'declined';
-    
-    IF participant_count > 0 THEN
-        SIGNAL SQLSTATE '45000' 
-        SET MESSAGE_TEXT = 'User is already in another meeting at this time';
+    IF COALESCE(@set_based_booking, 0) = 0 THEN
+        -- Check if user is already in another meeting at the same time
+        SELECT COUNT(*) INTO participant_count
+        FROM meeting_participants mp
+        JOIN meetings m ON mp.meeting_id = m.meeting_id
+        JOIN meetings new_meeting ON m.slot_id = new_meeting.slot_id 
+            AND m.meeting_date = new_meeting.meeting_date
+        WHERE mp.user_id = NEW.user_id 
+            AND m.status = 'scheduled'
+            AND new_meeting.meeting_id = NEW.meeting_id
+            AND m.meeting_id != NEW.meeting_id
+            AND mp.response != 'declined';
+        
+        IF participant_count > 0 THEN
+            SIGNAL SQLSTATE '45000' 
+            SET MESSAGE_TEXT = 'User is already in another meeting at this time';
+        END IF;
     END IF;
 END //
 
@@ -131,12 +198,21 @@ CREATE TRIGGER after_meeting_schedule
 AFTER INSERT ON meeting_participants
 FOR EACH ROW
 BEGIN
-    -- Mark user as unavailable for this time slot
-    INSERT INTO user_availability (user_id, slot_id, is_available, created_at)
-    SELECT NEW.user_id, m.slot_id, FALSE, NOW()
-    FROM meetings m
-    WHERE m.meeting_id = NEW.meeting_id
-    ON DUPLICATE KEY UPDATE is_available = FALSE, created_at = NOW();
+    IF COALESCE(@set_based_booking, 0) = 0 THEN
+        -- Mark user as unavailable for this time slot
+        INSERT INTO user_availability (user_id, slot_id, is_available, created_at)
+        SELECT NEW.user_id, m.slot_id, FALSE, NOW()
+        FROM meetings m
+        WHERE m.meeting_id = NEW.meeting_id
+        ON DUPLICATE KEY UPDATE is_available = FALSE, created_at = NOW();
+        
+        -- Keep the busy index in step for the set-based path
+        INSERT IGNORE INTO user_busy_slots (user_id, slot_id, meeting_date, meeting_id)
+        SELECT NEW.user_id, m.slot_id, m.meeting_date, m.meeting_id
+        FROM meetings m
+        WHERE m.meeting_id = NEW.meeting_id
+        AND m.status = 'scheduled';
+    END IF;
 END //
 
 -- Trigger to update user availability when a meeting is cancelled
@@ -151,6 +227,9 @@ BEGIN
         SET ua.is_available = TRUE
         WHERE mp.meeting_id = NEW.meeting_id
         AND ua.slot_id = NEW.slot_id;
+        
+        -- Release the participants' busy slots
+        DELETE FROM user_busy_slots WHERE meeting_id = NEW.meeting_id;
     END IF;
 END //
 
@@ -264,7 +343,7 @@ CREATE TABLE IF NOT EXISTS fams (
     is_available BOOLEAN DEFAULT true,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE SET NULL
 );
 
 -- Create students table if it doesn't exist
@@ -277,7 +356,7 @@ CREATE TABLE IF NOT EXISTS students (
     year INT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE SET NULL
 );
 
 -- Create fam_mentees relationship table
@@ -338,6 +417,30 @@ CREATE TABLE IF NOT EXISTS student_grades (
     UNIQUE KEY unique_grade_entry (student_id, subject_id, semester, academic_year)
 );
 
+-- Grade summaries (see grades.py). Database adds the deltas of every grade
+-- write; `python analytics_rollups.py grades` rebuilds them from
+-- student_grades, e.g. after loading the sample grades below.
+CREATE TABLE IF NOT EXISTS student_semester_summary (
+    student_id INT NOT NULL,
+    academic_year VARCHAR(10) NOT NULL,
+    semester VARCHAR(20) NOT NULL,
+    subjects INT NOT NULL DEFAULT 0,
+    credits INT NOT NULL DEFAULT 0,
+    quality_points DECIMAL(10,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, academic_year, semester),
+    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS fam_grade_distribution (
+    fam_id INT NOT NULL,
+    academic_year VARCHAR(10) NOT NULL,
+    semester VARCHAR(20) NOT NULL,
+    grade VARCHAR(2) NOT NULL,
+    grade_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (fam_id, academic_year, semester, grade),
+    FOREIGN KEY (fam_id) REFERENCES fams(id) ON DELETE CASCADE
+);
+
 -- Insert sample FAMs
 INSERT INTO fams (user_id, name, srn, department, year, specialization, bio, rating, max_mentees) VALUES
     (NULL, 'John Doe', 'FAM001', 'Computer Science', 3, 'Algorithms, Web Development', 'Senior CS student with experience in competitive programming', 4.8, 8),
@@ -427,5 +530,60 @@ FROM meetings m
 JOIN time_slots ts ON m.slot_id = ts.slot_id
 LEFT JOIN meeting_rooms mr ON m.room_id = mr.room_id
 JOIN users u ON m.created_by = u.user_id
-WHERE m.status = 'scheduled'
-ORDER BY m.meeting_date, ts.start_time;
+WHERE m.status = 'scheduled';
+
+-- Materialized copy of daily_schedule for front-desk displays. Maintained
+-- per meeting by Database on create/cancel/update; rebuild or verify it
+-- with daily_schedule.py.
+CREATE TABLE IF NOT EXISTS materialized_daily_schedule (
+    meeting_id INT PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    meeting_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    room_name VARCHAR(50),
+    organizer VARCHAR(100) NOT NULL,
+    status ENUM('scheduled', 'completed', 'cancelled') NOT NULL,
+    INDEX idx_schedule_date_time (meeting_date, start_time),
+    FOREIGN KEY (meeting_id) REFERENCES meetings(meeting_id) ON DELETE CASCADE
+);
+
+-- Pre-aggregated analytics. Database adjusts these on every meeting create and
+-- cancel; analytics_rollups.py recomputes a window from meetings nightly.
+CREATE TABLE IF NOT EXISTS meeting_daily_rollup (
+    rollup_date DATE PRIMARY KEY,
+    total INT NOT NULL DEFAULT 0,
+    scheduled INT NOT NULL DEFAULT 0,
+    completed INT NOT NULL DEFAULT 0,
+    cancelled INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS organizer_daily_rollup (
+    rollup_date DATE NOT NULL,
+    organizer_id INT NOT NULL,
+    meetings INT NOT NULL DEFAULT 0,
+    duration_minutes INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (rollup_date, organizer_id),
+    INDEX idx_rollup_organizer (organizer_id),
+    FOREIGN KEY (organizer_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+-- HyperLogLog sketches of participant ids (see sketches.py), one row per
+-- non-empty register. Merging any date range is MAX(register_rank) grouped by
+-- register_index. Maintained by Database as participants are added.
+CREATE TABLE IF NOT EXISTS participant_day_sketch (
+    sketch_date DATE NOT NULL,
+    register_index SMALLINT UNSIGNED NOT NULL,
+    register_rank TINYINT UNSIGNED NOT NULL,
+    PRIMARY KEY (sketch_date, register_index)
+);
+
+CREATE TABLE IF NOT EXISTS participant_organizer_sketch (
+    organizer_id INT NOT NULL,
+    sketch_date DATE NOT NULL,
+    register_index SMALLINT UNSIGNED NOT NULL,
+    register_rank TINYINT UNSIGNED NOT NULL,
+    PRIMARY KEY (organizer_id, sketch_date, register_index),
+    FOREIGN KEY (organizer_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
@@ -0,0 +1,481 @@
+-- SQLite port of schema.sql for the embedded backend (DB_BACKEND=sqlite,
+-- see sqlite_backend.py). Keep the two files in step.
+--
+-- Differences from the MySQL schema:
+--   * ENUM columns are TEXT with a CHECK constraint
+--   * ON UPDATE CURRENT_TIMESTAMP is not emulated
+--   * triggers read session variables through session_variable('name')
+--     and signal with RAISE(ABORT, ...)
+--   * the stored procedures and is_room_available() are left out; the
+--     application does not call them
+--   * MySQL indexes foreign keys itself; here they are created explicitly,
+--     together with the indexes from add_indexes.py
+
+PRAGMA foreign_keys = ON;
+
+-- Users table (faculty, staff, etc.)
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    role TEXT NOT NULL CHECK (role IN ('professor', 'student', 'admin')),
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_role ON users(role);
+
+-- Meeting rooms table
+CREATE TABLE IF NOT EXISTS meeting_rooms (
+    room_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(50) NOT NULL,
+    capacity INT NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Time slots table
+CREATE TABLE IF NOT EXISTS time_slots (
+    slot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    day_of_week TEXT NOT NULL
+        CHECK (day_of_week IN ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')),
+    is_recurring BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+CREATE UNIQUE INDEX IF NOT EXISTS unique_slot ON time_slots(start_time, end_time, day_of_week);
+CREATE INDEX IF NOT EXISTS idx_day_of_week ON time_slots(day_of_week);
+
+-- User availability (when users are free)
+CREATE TABLE IF NOT EXISTS user_availability (
+    availability_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL,
+    slot_id INT NOT NULL,
+    is_available BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (slot_id) REFERENCES time_slots(slot_id) ON DELETE CASCADE
+);
+CREATE UNIQUE INDEX IF NOT EXISTS unique_user_slot ON user_availability(user_id, slot_id);
+CREATE INDEX IF NOT EXISTS idx_availability_slot ON user_availability(slot_id);
+
+-- Recurring meeting series: one row per weekly rule (see recurrence.py)
+CREATE TABLE IF NOT EXISTS meeting_series (
+    series_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(200) NOT NULL,
+    description TEXT,
+    room_id INT,
+    slot_id INT NOT NULL,
+    start_date DATE NOT NULL,
+    until_date DATE NOT NULL,
+    interval_weeks INT NOT NULL DEFAULT 1,
+    created_by INT NOT NULL,
+    status TEXT DEFAULT 'active' CHECK (status IN ('active', 'cancelled')),
+    materialized_until DATE NULL,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (room_id) REFERENCES meeting_rooms(room_id) ON DELETE SET NULL,
+    FOREIGN KEY (slot_id) REFERENCES time_slots(slot_id) ON DELETE RESTRICT,
+    FOREIGN KEY (created_by) REFERENCES users(user_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_series_window ON meeting_series(status, start_date, until_date);
+CREATE INDEX IF NOT EXISTS idx_series_created_by ON meeting_series(created_by);
+
+-- Scheduled meetings
+CREATE TABLE IF NOT EXISTS meetings (
+    meeting_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(200) NOT NULL,
+    description TEXT,
+    room_id INT,
+    slot_id INT NOT NULL,
+    meeting_date DATE NOT NULL,
+    created_by INT NOT NULL,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    status TEXT DEFAULT 'scheduled' CHECK (status IN ('scheduled', 'completed', 'cancelled')),
+    series_id INT NULL,
+    FOREIGN KEY (room_id) REFERENCES meeting_rooms(room_id) ON DELETE SET NULL,
+    FOREIGN KEY (slot_id) REFERENCES time_slots(slot_id) ON DELETE RESTRICT,
+    FOREIGN KEY (created_by) REFERENCES users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (series_id) REFERENCES meeting_series(series_id) ON DELETE SET NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS unique_room_slot ON meetings(room_id, slot_id, meeting_date);
+CREATE UNIQUE INDEX IF NOT EXISTS unique_series_occurrence ON meetings(series_id, meeting_date);
+CREATE INDEX IF NOT EXISTS idx_meeting_date_status ON meetings(meeting_date, status);
+CREATE INDEX IF NOT EXISTS idx_created_by ON meetings(created_by);
+CREATE INDEX IF NOT EXISTS idx_meeting_slot ON meetings(slot_id, meeting_date);
+
+-- Trigger to validate meeting date. Bulk loads of historical data
+-- (synthetic_data.py) set @bulk_load = 1 for their session to skip it.
+CREATE TRIGGER IF NOT EXISTS before_meeting_insert_update
+BEFORE INSERT ON meetings
+FOR EACH ROW
+WHEN COALESCE(session_variable('bulk_load'), 0) = 0 AND NEW.meeting_date < CURDATE()
+BEGIN
+    SELECT RAISE(ABORT, 'Meeting date cannot be in the past');
+END;
+
+CREATE TRIGGER IF NOT EXISTS before_meeting_update
+BEFORE UPDATE ON meetings
+FOR EACH ROW
+WHEN NEW.meeting_date < CURDATE()
+BEGIN
+    SELECT RAISE(ABORT, 'Meeting date cannot be in the past');
+END;
+
+-- Meeting participants
+CREATE TABLE IF NOT EXISTS meeting_participants (
+    meeting_id INT,
+    user_id INT,
+    response TEXT DEFAULT 'pending' CHECK (response IN ('accepted', 'declined', 'pending')),
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (meeting_id, user_id),
+    FOREIGN KEY (meeting_id) REFERENCES meetings(meeting_id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_user_response ON meeting_participants(user_id, response);
+
+-- Members of a recurring series (copied onto each materialized occurrence)
+CREATE TABLE IF NOT EXISTS meeting_series_participants (
+    series_id INT NOT NULL,
+    user_id INT NOT NULL,
+    PRIMARY KEY (series_id, user_id),
+    FOREIGN KEY (series_id) REFERENCES meeting_series(series_id) ON DELETE CASCADE,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_series_participant_user ON meeting_series_participants(user_id);
+
+-- Occurrences of a series that will not take place
+CREATE TABLE IF NOT EXISTS meeting_series_exceptions (
+    series_id INT NOT NULL,
+    occurrence_date DATE NOT NULL,
+    reason TEXT DEFAULT 'skipped' CHECK (reason IN ('skipped', 'conflict')),
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (series_id, occurrence_date),
+    FOREIGN KEY (series_id) REFERENCES meeting_series(series_id) ON DELETE CASCADE
+);
+
+-- Busy index: one row per (user, slot, date) a participant is booked into.
+-- The primary key is the double-booking check for the set-based booking path.
+CREATE TABLE IF NOT EXISTS user_busy_slots (
+    user_id INT NOT NULL,
+    slot_id INT NOT NULL,
+    meeting_date DATE NOT NULL,
+    meeting_id INT NOT NULL,
+    PRIMARY KEY (user_id, slot_id, meeting_date),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    FOREIGN KEY (meeting_id) REFERENCES meetings(meeting_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_busy_meeting ON user_busy_slots(meeting_id);
+
+-- Per-row participant triggers. The set-based booking path sets
+-- @set_based_booking = 1 for its transaction and does the same work for
+-- the whole participant set itself, so both triggers step aside.
+CREATE TRIGGER IF NOT EXISTS before_meeting_participant_insert
+BEFORE INSERT ON meeting_participants
+FOR EACH ROW
+WHEN COALESCE(session_variable('set_based_booking'), 0) = 0 AND EXISTS (
+    SELECT 1
+    FROM meeting_participants mp
+    JOIN meetings m ON mp.meeting_id = m.meeting_id
+    JOIN meetings new_meeting ON m.slot_id = new_meeting.slot_id
+        AND m.meeting_date = new_meeting.meeting_date
+    WHERE mp.user_id = NEW.user_id
+        AND m.status = 'scheduled'
+        AND new_meeting.meeting_id = NEW.meeting_id
+        AND m.meeting_id != NEW.meeting_id
+        AND mp.response != 'declined'
+)
+BEGIN
+    SELECT RAISE(ABORT, 'User is already in another meeting at this time');
+END;
+
+-- Trigger to update user availability when they schedule a meeting
+CREATE TRIGGER IF NOT EXISTS after_meeting_schedule
+AFTER INSERT ON meeting_participants
+FOR EACH ROW
+WHEN COALESCE(session_variable('set_based_booking'), 0) = 0
+BEGIN
+    -- Mark user as unavailable for this time slot
+    INSERT INTO user_availability (user_id, slot_id, is_available, created_at)
+    SELECT NEW.user_id, m.slot_id, FALSE, NOW()
+    FROM meetings m
+    WHERE m.meeting_id = NEW.meeting_id
+    ON CONFLICT DO UPDATE SET is_available = FALSE, created_at = NOW();
+
+    -- Keep the busy index in step for the set-based path
+    INSERT OR IGNORE INTO user_busy_slots (user_id, slot_id, meeting_date, meeting_id)
+    SELECT NEW.user_id, m.slot_id, m.meeting_date, m.meeting_id
+    FROM meetings m
+    WHERE m.meeting_id = NEW.meeting_id
+    AND m.status = 'scheduled';
+END;
+
+-- Trigger to update user availability when a meeting is cancelled
+CREATE TRIGGER IF NOT EXISTS after_meeting_cancelled
+AFTER UPDATE ON meetings
+FOR EACH ROW
+WHEN OLD.status != 'cancelled' AND NEW.status = 'cancelled'
+BEGIN
+    -- Mark all participants as available for this time slot
+    UPDATE user_availability
+    SET is_available = TRUE
+    WHERE slot_id = NEW.slot_id
+    AND user_id IN (SELECT user_id FROM meeting_participants WHERE meeting_id = NEW.meeting_id);
+
+    -- Release the participants' busy slots
+    DELETE FROM user_busy_slots WHERE meeting_id = NEW.meeting_id;
+END;
+
+-- Insert some sample data
+INSERT OR IGNORE INTO time_slots (start_time, end_time, day_of_week, is_recurring) VALUES
+('09:00:00', '10:00:00', 'monday', TRUE),
+('10:00:00', '11:00:00', 'monday', TRUE),
+('11:00:00', '12:00:00', 'monday', TRUE),
+('14:00:00', '15:00:00', 'monday', TRUE),
+('15:00:00', '16:00:00', 'monday', TRUE),
+('16:00:00', '17:00:00', 'monday', TRUE),
+('09:00:00', '10:00:00', 'tuesday', TRUE),
+('10:00:00', '11:00:00', 'tuesday', TRUE),
+('11:00:00', '12:00:00', 'tuesday', TRUE),
+('14:00:00', '15:00:00', 'tuesday', TRUE),
+('15:00:00', '16:00:00', 'tuesday', TRUE),
+('16:00:00', '17:00:00', 'tuesday', TRUE);
+
+-- Insert some sample rooms
+INSERT OR IGNORE INTO meeting_rooms (name, capacity) VALUES
+('Conference Room A', 10),
+('Conference Room B', 8),
+('Seminar Hall', 50),
+('Faculty Lounge', 15);
+
+-- Create FAMs table
+CREATE TABLE IF NOT EXISTS fams (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT,
+    name VARCHAR(255) NOT NULL,
+    srn VARCHAR(50) UNIQUE NOT NULL,
+    department VARCHAR(100) NOT NULL,
+    year INT NOT NULL,
+    specialization TEXT,
+    bio TEXT,
+    rating DECIMAL(3,2) DEFAULT 0.00,
+    mentees INT DEFAULT 0,
+    max_mentees INT DEFAULT 10,
+    is_available BOOLEAN DEFAULT true,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE SET NULL
+);
+
+-- Create students table if it doesn't exist
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT,
+    name VARCHAR(255) NOT NULL,
+    srn VARCHAR(50) UNIQUE NOT NULL,
+    department VARCHAR(100) NOT NULL,
+    year INT NOT NULL,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE SET NULL
+);
+
+-- Create fam_mentees relationship table
+CREATE TABLE IF NOT EXISTS fam_mentees (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fam_id INT NOT NULL,
+    student_id INT NOT NULL,
+    assigned_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    UNIQUE(fam_id, student_id),
+    FOREIGN KEY (fam_id) REFERENCES fams(id) ON DELETE CASCADE,
+    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_fam_mentees_student ON fam_mentees(student_id);
+
+-- Create subjects table
+CREATE TABLE IF NOT EXISTS subjects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject_code VARCHAR(20) UNIQUE NOT NULL,
+    subject_name VARCHAR(100) NOT NULL,
+    department VARCHAR(100) NOT NULL,
+    credits INT NOT NULL,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+-- Insert sample subjects
+INSERT OR IGNORE INTO subjects (subject_code, subject_name, department, credits) VALUES
+    ('CS101', 'Introduction to Programming', 'Computer Science', 4),
+    ('CS201', 'Data Structures', 'Computer Science', 4),
+    ('CS301', 'Algorithms', 'Computer Science', 4),
+    ('CS401', 'Database Systems', 'Computer Science', 3),
+    ('CS501', 'Machine Learning', 'Computer Science', 4),
+    ('IT101', 'Introduction to IT', 'Information Technology', 3),
+    ('IT201', 'Networking Fundamentals', 'Information Technology', 4),
+    ('IT301', 'Cybersecurity Basics', 'Information Technology', 4),
+    ('MATH101', 'Calculus I', 'Mathematics', 4),
+    ('MATH201', 'Linear Algebra', 'Mathematics', 3);
+
+-- Create student_grades table
+CREATE TABLE IF NOT EXISTS student_grades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INT NOT NULL,
+    subject_id INT,
+    fam_id INT NOT NULL,
+    grade VARCHAR(2) NOT NULL,
+    semester VARCHAR(20) NOT NULL,
+    academic_year VARCHAR(10) NOT NULL,
+    feedback TEXT,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE,
+    FOREIGN KEY (subject_id) REFERENCES subjects(id) ON DELETE SET NULL,
+    FOREIGN KEY (fam_id) REFERENCES fams(id) ON DELETE CASCADE
+);
+CREATE UNIQUE INDEX IF NOT EXISTS unique_grade_entry
+    ON student_grades(student_id, subject_id, semester, academic_year);
+CREATE INDEX IF NOT EXISTS idx_grades_fam ON student_grades(fam_id);
+
+-- Grade summaries (see grades.py)
+CREATE TABLE IF NOT EXISTS student_semester_summary (
+    student_id INT NOT NULL,
+    academic_year VARCHAR(10) NOT NULL,
+    semester VARCHAR(20) NOT NULL,
+    subjects INT NOT NULL DEFAULT 0,
+    credits INT NOT NULL DEFAULT 0,
+    quality_points DECIMAL(10,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (student_id, academic_year, semester),
+    FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS fam_grade_distribution (
+    fam_id INT NOT NULL,
+    academic_year VARCHAR(10) NOT NULL,
+    semester VARCHAR(20) NOT NULL,
+    grade VARCHAR(2) NOT NULL,
+    grade_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (fam_id, academic_year, semester, grade),
+    FOREIGN KEY (fam_id) REFERENCES fams(id) ON DELETE CASCADE
+);
+
+-- Insert sample FAMs
+INSERT OR IGNORE INTO fams (user_id, name, srn, department, year, specialization, bio, rating, max_mentees) VALUES
+    (NULL, 'John Doe', 'FAM001', 'Computer Science', 3, 'Algorithms, Web Development', 'Senior CS student with experience in competitive programming', 4.8, 8),
+    (NULL, 'Jane Smith', 'FAM002', 'Computer Science', 4, 'Machine Learning, Python', 'ML enthusiast with internship experience at top tech companies', 4.9, 10),
+    (NULL, 'Alex Johnson', 'FAM003', 'Information Technology', 3, 'Cybersecurity, Networking', 'Cyber security researcher and CTF player', 4.7, 6);
+
+-- Insert sample students
+INSERT OR IGNORE INTO students (user_id, name, srn, department, year) VALUES
+    (NULL, 'Michael Brown', 'SRN2023001', 'Computer Science', 1),
+    (NULL, 'Sarah Wilson', 'SRN2023002', 'Computer Science', 1),
+    (NULL, 'David Lee', 'SRN2023003', 'Information Technology', 1),
+    (NULL, 'Emma Garcia', 'SRN2023004', 'Computer Science', 1),
+    (NULL, 'James Miller', 'SRN2023005', 'Information Technology', 1);
+
+-- Assign students to FAMs
+INSERT OR IGNORE INTO fam_mentees (fam_id, student_id) VALUES
+    ((SELECT id FROM fams WHERE srn = 'FAM001' LIMIT 1), (SELECT id FROM students WHERE srn = 'SRN2023001' LIMIT 1)),
+    ((SELECT id FROM fams WHERE srn = 'FAM001' LIMIT 1), (SELECT id FROM students WHERE srn = 'SRN2023002' LIMIT 1)),
+    ((SELECT id FROM fams WHERE srn = 'FAM002' LIMIT 1), (SELECT id FROM students WHERE srn = 'SRN2023003' LIMIT 1)),
+    ((SELECT id FROM fams WHERE srn = 'FAM002' LIMIT 1), (SELECT id FROM students WHERE srn = 'SRN2023004' LIMIT 1)),
+    ((SELECT id FROM fams WHERE srn = 'FAM003' LIMIT 1), (SELECT id FROM students WHERE srn = 'SRN2023005' LIMIT 1));
+
+-- Update mentee counts
+UPDATE fams
+SET mentees = (
+    SELECT COUNT(*)
+    FROM fam_mentees fm
+    WHERE fm.fam_id = fams.id
+);
+
+-- Insert sample grades
+INSERT OR IGNORE INTO student_grades (student_id, subject_id, fam_id, grade, semester, academic_year, feedback)
+SELECT
+    s.id,
+    sub.id,
+    fm.fam_id,
+    CASE abs(random()) % 5 WHEN 0 THEN 'A' WHEN 1 THEN 'B+' WHEN 2 THEN 'B' WHEN 3 THEN 'C+' ELSE 'C' END,
+    'Fall',
+    '2024-2025',
+    'Good progress in ' || sub.subject_name || '. ' ||
+        CASE abs(random()) % 10
+            WHEN 0 THEN 'Excellent work!' WHEN 1 THEN 'Excellent work!' WHEN 2 THEN 'Excellent work!'
+            WHEN 3 THEN 'Good performance.' WHEN 4 THEN 'Good performance.' WHEN 5 THEN 'Good performance.'
+            ELSE 'Needs improvement in some areas.'
+        END
+FROM
+    students s
+CROSS JOIN
+    (SELECT id, subject_name FROM subjects ORDER BY random() LIMIT 3) sub
+JOIN
+    fam_mentees fm ON s.id = fm.student_id;
+
+-- Create a view for daily schedules
+CREATE VIEW IF NOT EXISTS daily_schedule AS
+SELECT
+    m.meeting_id,
+    m.title,
+    m.meeting_date,
+    ts.start_time,
+    ts.end_time,
+    mr.name AS room_name,
+    u.name AS organizer,
+    m.status
+FROM meetings m
+JOIN time_slots ts ON m.slot_id = ts.slot_id
+LEFT JOIN meeting_rooms mr ON m.room_id = mr.room_id
+JOIN users u ON m.created_by = u.user_id
+WHERE m.status = 'scheduled';
+
+-- Materialized copy of daily_schedule for front-desk displays
+CREATE TABLE IF NOT EXISTS materialized_daily_schedule (
+    meeting_id INT PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    meeting_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    room_name VARCHAR(50),
+    organizer VARCHAR(100) NOT NULL,
+    status TEXT NOT NULL CHECK (status IN ('scheduled', 'completed', 'cancelled')),
+    FOREIGN KEY (meeting_id) REFERENCES meetings(meeting_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_schedule_date_time ON materialized_daily_schedule(meeting_date, start_time);
+
+-- Pre-aggregated analytics (see analytics_rollups.py)
+CREATE TABLE IF NOT EXISTS meeting_daily_rollup (
+    rollup_date DATE PRIMARY KEY,
+    total INT NOT NULL DEFAULT 0,
+    scheduled INT NOT NULL DEFAULT 0,
+    completed INT NOT NULL DEFAULT 0,
+    cancelled INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS organizer_daily_rollup (
+    rollup_date DATE NOT NULL,
+    organizer_id INT NOT NULL,
+    meetings INT NOT NULL DEFAULT 0,
+    duration_minutes INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (rollup_date, organizer_id),
+    FOREIGN KEY (organizer_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_organizer ON organizer_daily_rollup(organizer_id);
+
+-- HyperLogLog sketches of participant ids (see sketches.py)
+CREATE TABLE IF NOT EXISTS participant_day_sketch (
+    sketch_date DATE NOT NULL,
+    register_index SMALLINT NOT NULL,
+    register_rank TINYINT NOT NULL,
+    PRIMARY KEY (sketch_date, register_index)
+);
+
+CREATE TABLE IF NOT EXISTS participant_organizer_sketch (
+    organizer_id INT NOT NULL,
+    sketch_date DATE NOT NULL,
+    register_index SMALLINT NOT NULL,
+    register_rank TINYINT NOT NULL,
+    PRIMARY KEY (organizer_id, sketch_date, register_index),
+    FOREIGN KEY (organizer_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
@@ -3,10 +3,8 @@ seed_data.py - Database Seeding Script
 Populates the database with realistic test data for development and testing.
 """
 
-import mysql.connector
 from mysql.connector import Error
 from datetime import datetime, date, timedelta
-import os
 from dotenv import load_dotenv
 import random
 
@@ -20,14 +18,11 @@ class DataSeeder:
         
     def connect(self):
         """Connect to the database."""
+        from database import db
+        
         try:
-            self.connection = mysql.connector.connect(
-                host=os.getenv('MYSQL_HOST', 'localhost'),
-                database=os.getenv('MYSQL_DATABASE', 'academic_meetings'),
-                user=os.getenv('MYSQL_USER', 'root'),
-                password=os.getenv('MYSQL_PASSWORD', ''),
-                port=int(os.getenv('MYSQL_PORT', 3306))
-            )
+            # MySQL, or the SQLite file at SQLITE_PATH with DB_BACKEND=sqlite
+            self.connection = db.open_dedicated_connection()
             self.cursor = self.connection.cursor(dictionary=True)
             print("✓ Connected to database successfully")
         except Error as e:
@@ -45,6 +40,12 @@ class DataSeeder:
     def clear_tables(self):
         """Clear existing data from tables."""
         tables = [
+            'meeting_daily_rollup',
+            'organizer_daily_rollup',
+            'participant_day_sketch',
+            'participant_organizer_sketch',
+            'student_semester_summary',
+            'fam_grade_distribution',
             'student_grades',
             'fam_mentees',
             'fams',
@@ -198,11 +199,11 @@ class DataSeeder:
             
             # Update mentee counts
             self.cursor.execute("""
-                UPDATE fams f
+                UPDATE fams
                 SET mentees = (
                     SELECT COUNT(*) 
                     FROM fam_mentees fm 
-                    WHERE fm.fam_id = f.id
+                    WHERE fm.fam_id = fams.id
                 )
             """)
             
@@ -432,6 +433,19 @@ class DataSeeder:
         self.connection.commit()
         print(f"✓ Added {participant_count} meeting participants\n")
     
+    def build_derived_tables(self):
+        """Populate the tables Database maintains on writes, since seeding bypasses it."""
+        from database import db
+        
+        rows = db.rebuild_daily_schedule()
+        print(f"✓ Rebuilt daily schedule ({rows} rows)")
+        rollups = db.compact_rollups()
+        print(f"✓ Built analytics rollups ({rollups['days']} days)")
+        participants = db.rebuild_participant_sketches()
+        print(f"✓ Built participant sketches ({participants} participant rows)")
+        grades = db.rebuild_grade_summaries()
+        print(f"✓ Built grade summaries ({grades} grade rows)")
+    
     def seed_all(self):
         """Run all seeding operations."""
         try:
@@ -463,6 +477,9 @@ class DataSeeder:
             print("8. Seeding meeting participants...")
             self.seed_meeting_participants(meeting_ids, user_ids)
             
+            print("9. Building derived tables...")
+            self.build_derived_tables()
+            
             print("\n" + "="*50)
             print("✓ Database Seeding Completed Successfully!")
             print("="*50)
@@ -0,0 +1,65 @@
+"""
+sketches.py - HyperLogLog Distinct Counting
+Approximate distinct counts of participant ids that can be merged across days.
+
+Registers are stored one row per non-empty register (see
+participant_day_sketch in schema.sql), so the database itself merges sketches
+with MAX(register_rank) ... GROUP BY register_index and only the final
+estimate happens here.
+"""
+
+import hashlib
+import math
+
+# 2^12 registers: about 1.6% standard error
+HLL_PRECISION = 12
+HLL_REGISTERS = 1 << HLL_PRECISION
+HLL_STANDARD_ERROR = round(1.04 / math.sqrt(HLL_REGISTERS), 4)
+
+_HASH_BITS = 64
+_RANK_BITS = _HASH_BITS - HLL_PRECISION
+
+def register_for(value):
+    """
+    (register_index, rank) of one value.
+
+    The index is the top HLL_PRECISION bits of a stable 64-bit hash; the rank
+    is the position of the first set bit in the remaining bits.
+    """
+    digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+    hashed = int.from_bytes(digest, 'big')
+    index = hashed >> _RANK_BITS
+    remainder = hashed & ((1 << _RANK_BITS) - 1)
+    rank = _RANK_BITS - remainder.bit_length() + 1
+    return index, rank
+
+class HyperLogLog:
+    """Sparse HyperLogLog sketch: {register_index: rank} for non-empty registers."""
+
+    def __init__(self, registers=None):
+        self.registers = dict(registers or {})
+
+    def add(self, value):
+        index, rank = register_for(value)
+        if rank > self.registers.get(index, 0):
+            self.registers[index] = rank
+
+    def merge(self, other):
+        for index, rank in other.registers.items():
+            if rank > self.registers.get(index, 0):
+                self.registers[index] = rank
+        return self
+
+    def count(self):
+        """Estimated number of distinct values added."""
+        m = HLL_REGISTERS
+        if not self.registers:
+            return 0
+        alpha = 0.7213 / (1 + 1.079 / m)
+        empty = m - len(self.registers)
+        harmonic = empty + sum(2.0 ** -rank for rank in self.registers.values())
+        estimate = alpha * m * m / harmonic
+        if estimate <= 2.5 * m and empty:
+            # Small-range correction: linear counting is more accurate here
+            estimate = m * math.log(m / empty)
+        return int(round(estimate))
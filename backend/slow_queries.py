@@ -0,0 +1,280 @@
+"""
+slow_queries.py - Slow Query Log
+Records every Database query slower than a threshold with its normalized SQL,
+parameter shape, duration and row count to logs/slow_queries.log (one JSON
+document per line), and summarizes them by fingerprint.
+
+For a sample of slow queries the EXPLAIN FORMAT=JSON plan is captured out of
+band: a background thread runs EXPLAIN on its own connection outside the
+pool, so neither the slow request nor any other waits for it. A fingerprint
+is explained at most once per explain interval, so a plan that degrades as
+data grows shows up as a series of snapshots rather than a flood.
+
+Usage:
+    python slow_queries.py summary [--top 20] [--log logs/slow_queries.log]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import queue
+import random
+import re
+import threading
+from datetime import datetime
+from time import monotonic
+
+from logger import SLOW_QUERY_LOG, slow_query_logger
+
+# Statements MySQL can EXPLAIN; anything else is logged without a plan
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+# Value lists of two or more, and IN lists of any length
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)|(?<=\bIN )\(\s*\?\s*\)", re.I)
+_REPEATED = re.compile(r"\(\?\+?\)(?:\s*,\s*\(\?\+?\))+")
+
+def normalize_sql(query):
+    """
+    SQL with literals and placeholders replaced by ?, whitespace collapsed and
+    value lists folded, so `IN (%s, %s)` and `IN (%s, %s, %s)` match.
+    """
+    normalized = _STRING.sub('?', query).replace('%s', '?')
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = ' '.join(normalized.split())
+    normalized = _LIST.sub('(?+)', normalized)
+    return _REPEATED.sub('(?+)...', normalized)
+
+def fingerprint(normalized):
+    """Short stable id of a normalized statement."""
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+def parameter_shape(params):
+    """Parameter types without their values, runs folded: ['int*3', 'date']."""
+    if not params:
+        return []
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    runs = []
+    for value in params:
+        name = type(value).__name__
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    return [name if count == 1 else f"{name}*{count}" for name, count in runs]
+
+def plan_tables(plan):
+    """
+    Per-table access from an EXPLAIN FORMAT=JSON plan, in plan order.
+    access_type 'ALL' is a full scan.
+    """
+    tables = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if 'table_name' in node and 'access_type' in node:
+                tables.append({
+                    'table': node['table_name'],
+                    'access_type': node['access_type'],
+                    'key': node.get('key'),
+                    'rows_examined_per_scan': node.get('rows_examined_per_scan')
+                })
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(plan)
+    return tables
+
+def _accumulate(summary, entry):
+    """Fold one log entry into {fingerprint: totals}."""
+    totals = summary.get(entry['fingerprint'])
+    if totals is None:
+        totals = summary[entry['fingerprint']] = {
+            'fingerprint': entry['fingerprint'], 'sql': entry['sql'], 'count': 0,
+            'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0, 'errors': 0, 'plan_tables': None
+        }
+    totals['count'] += 1
+    totals['total_ms'] += entry['duration_ms']
+    totals['max_ms'] = max(totals['max_ms'], entry['duration_ms'])
+    totals['rows'] += entry['rows'] or 0
+    totals['errors'] += 1 if entry.get('error') else 0
+    if entry.get('plan_tables') is not None:
+        totals['plan_tables'] = entry['plan_tables']
+
+def _ranked(summary, top=None):
+    rows = []
+    for totals in sorted(summary.values(), key=lambda t: -t['total_ms'])[:top]:
+        rows.append(dict(
+            totals,
+            total_ms=round(totals['total_ms'], 2),
+            avg_ms=round(totals['total_ms'] / totals['count'], 2),
+            avg_rows=round(totals['rows'] / totals['count'], 1)
+        ))
+    return rows
+
+class SlowQueryLog:
+    """Database listener that logs slow queries (see Database.add_listener)."""
+
+    def __init__(self, threshold_ms=200, explain_sample=0.1, explain_interval=300,
+                 connect=None, writer=None, queue_size=100):
+        """
+        Args:
+            threshold_ms: Queries at least this slow are logged
+            explain_sample: Fraction of slow queries to EXPLAIN (0 disables)
+            explain_interval: Seconds before a fingerprint is explained again
+            connect: Returns a new connection for EXPLAIN
+                (Database.open_dedicated_connection); None disables plans
+            writer: Called with each JSON line (default: the slow query logger)
+            queue_size: Plans waiting for the background thread; when full,
+                entries are logged without a plan
+        """
+        self.threshold = threshold_ms / 1000
+        self.explain_sample = explain_sample
+        self.explain_interval = explain_interval
+        self._connect = connect
+        self._writer = writer or slow_query_logger.info
+        self._lock = threading.Lock()
+        self._summary = {}
+        self._last_explained = {}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._worker = None
+
+    def on_database_event(self, event, info):
+        if event != 'query' or info['seconds'] < self.threshold:
+            return
+        normalized = normalize_sql(info['query'])
+        entry = {
+            'timestamp': datetime.fromtimestamp(info['started']).isoformat(timespec='milliseconds'),
+            'fingerprint': fingerprint(normalized),
+            'kind': info['kind'],
+            'duration_ms': round(info['seconds'] * 1000, 2),
+            'rows': info['rows'],
+            'error': str(info['error']) if info['error'] is not None else None,
+            'params': parameter_shape(info['params']),
+            'sql': normalized
+        }
+        with self._lock:
+            _accumulate(self._summary, entry)
+            explain = self._claim_explain(entry, info)
+        if explain:
+            try:
+                self._queue.put_nowait((entry, info['query'], info['params']))
+                self._start_worker()
+                return
+            except queue.Full:
+                pass
+        self._write(entry)
+
+    def _claim_explain(self, entry, info):
+        """Whether to EXPLAIN this query; call with the lock held."""
+        if self._connect is None or entry['error'] or random.random() >= self.explain_sample:
+            return False
+        if info['query'].lstrip().split(None, 1)[0].upper() not in EXPLAINABLE:
+            return False
+        now = monotonic()
+        last = self._last_explained.get(entry['fingerprint'])
+        if last is not None and now - last < self.explain_interval:
+            return False
+        self._last_explained[entry['fingerprint']] = now
+        return True
+
+    def _start_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._explain_loop, name='slow-query-explain', daemon=True)
+                self._worker.start()
+
+    def _explain_loop(self):
+        connection = None
+        while True:
+            entry, query, params = self._queue.get()
+            try:
+                if connection is None:
+                    connection = self._connect()
+                cursor = connection.cursor()
+                try:
+                    cursor.execute("EXPLAIN FORMAT=JSON " + query, params or ())
+                    plan = json.loads(cursor.fetchone()[0])
+                finally:
+                    cursor.close()
+                entry['plan_tables'] = plan_tables(plan)
+                entry['plan'] = plan
+                with self._lock:
+                    self._summary[entry['fingerprint']]['plan_tables'] = entry['plan_tables']
+            except Exception as e:
+                entry['plan_error'] = str(e)
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                    connection = None
+            self._write(entry)
+            self._queue.task_done()
+
+    def _write(self, entry):
+        self._writer(json.dumps(entry, default=str))
+
+    def flush(self):
+        """Wait until every queued EXPLAIN has been captured and written."""
+        self._queue.join()
+
+    def summary(self, top=20):
+        """Slow queries of this process by fingerprint, most total time first."""
+        with self._lock:
+            return _ranked({key: dict(value) for key, value in self._summary.items()}, top)
+
+def read_log(path=SLOW_QUERY_LOG):
+    """Entries from the log and its rotated backups, oldest file first."""
+    backups = []
+    for backup in glob.glob(f"{path}.*"):
+        suffix = backup.rsplit('.', 1)[1]
+        if suffix.isdigit():
+            backups.append((int(suffix), backup))
+    entries = []
+    for file_path in [backup for _, backup in sorted(backups, reverse=True)] + [path]:
+        try:
+            with open(file_path) as handle:
+                for line in handle:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            continue
+    return entries
+
+def summarize(entries, top=20):
+    """Log entries by fingerprint, most total time first."""
+    summary = {}
+    for entry in entries:
+        _accumulate(summary, entry)
+    return _ranked(summary, top)
+
+def main():
+    parser = argparse.ArgumentParser(description="Slow query log tools")
+    parser.add_argument('command', choices=['summary'])
+    parser.add_argument('--log', default=SLOW_QUERY_LOG, help="Slow query log file")
+    parser.add_argument('--top', type=int, default=20, help="Fingerprints to show")
+    args = parser.parse_args()
+
+    entries = read_log(args.log)
+    print(f"✓ Read {len(entries)} slow queries from {args.log}\n")
+    for rank, row in enumerate(summarize(entries, args.top), start=1):
+        print(f"{rank}. [{row['fingerprint']}] {row['count']}x, total {row['total_ms']} ms, "
+              f"avg {row['avg_ms']} ms, max {row['max_ms']} ms, avg rows {row['avg_rows']}")
+        print(f"   {row['sql'][:300]}")
+        for table in row['plan_tables'] or []:
+            marker = '  <- full scan' if table['access_type'] == 'ALL' else ''
+            print(f"   {table['table']}: {table['access_type']} via {table['key'] or '-'}, "
+                  f"~{table['rows_examined_per_scan']} rows/scan{marker}")
+        print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,486 @@
+"""
+sqlite_backend.py - Embedded SQLite Backend
+Runs Database on an embedded SQLite file instead of a MySQL server, for
+offline tests and benchmarks (DB_BACKEND=sqlite).
+
+The pool hands out connections that behave like mysql-connector ones:
+cursor(dictionary=True), MySQL's lastrowid and rowcount rules, rollback on
+close, and mysql.connector errors carrying MySQL error numbers, so Database
+and its callers run unchanged. Statements are translated once per query text:
+
+    %s placeholders               -> ?
+    INSERT IGNORE                 -> INSERT OR IGNORE
+    ON DUPLICATE KEY UPDATE       -> ON CONFLICT DO UPDATE SET, VALUES(c) -> excluded.c
+    SELECT ... FOR UPDATE         -> BEGIN IMMEDIATE, then the SELECT
+    JSON_ARRAYAGG                 -> json_group_array
+    a <=> b                       -> a IS b
+    TIMESTAMPDIFF(MINUTE, ...)    -> TIMESTAMPDIFF('MINUTE', ...)
+    SET @name = ...               -> per-connection session variables, read by
+                                     the triggers through session_variable()
+    SET SESSION ..., SET SQL_MODE -> ignored
+    LOAD DATA LOCAL INFILE        -> CSV import through executemany
+    EXPLAIN FORMAT=JSON           -> EXPLAIN QUERY PLAN, in MySQL's JSON shape
+
+Other MySQL functions the queries use (CURDATE, NOW, DAYNAME, GREATEST,
+CONCAT, ...) are registered as SQLite functions. DATE, TIME, TIMESTAMP and
+DECIMAL columns come back as date, timedelta, datetime and Decimal, as from
+mysql-connector.
+
+The schema comes from schema_sqlite.sql. Without a path every process gets
+its own throwaway database file, so test runs can go in parallel.
+"""
+
+import atexit
+import csv
+import json
+import math
+import os
+import queue
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from time import sleep as _sleep
+
+from mysql.connector import errorcode, errors
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema_sqlite.sql')
+
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+UNIT_SECONDS = {'SECOND': 1, 'MINUTE': 60, 'HOUR': 3600, 'DAY': 86400, 'WEEK': 604800}
+
+# Values in and out
+
+def _time_text(value) -> str:
+    seconds = int(value.total_seconds()) if isinstance(value, timedelta) else \
+        value.hour * 3600 + value.minute * 60 + value.second
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def _converter(parse):
+    def convert(raw):
+        text = raw.decode()
+        try:
+            return parse(text)
+        except (ValueError, InvalidOperation):
+            return text
+    return convert
+
+def _parse_time(text):
+    hours, minutes, seconds = (text.split(':') + ['0', '0'])[:3]
+    return timedelta(hours=int(hours), minutes=int(minutes), seconds=int(float(seconds)))
+
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' ', timespec='seconds'))
+sqlite3.register_adapter(time, _time_text)
+sqlite3.register_adapter(timedelta, _time_text)
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_converter('DATE', _converter(date.fromisoformat))
+sqlite3.register_converter('TIME', _converter(_parse_time))
+sqlite3.register_converter('TIMESTAMP', _converter(datetime.fromisoformat))
+sqlite3.register_converter('DATETIME', _converter(datetime.fromisoformat))
+sqlite3.register_converter('DECIMAL', _converter(Decimal))
+
+_SHORT_TIME = re.compile(r'^(\d{1,2}):(\d{2})(?::(\d{2}))?$')
+
+def _param(value):
+    """MySQL compares TIME columns with '9:30' as a time; store-format such strings."""
+    if isinstance(value, str):
+        match = _SHORT_TIME.match(value)
+        if match:
+            return f"{int(match.group(1)):02d}:{match.group(2)}:{match.group(3) or '00'}"
+    return value
+
+# MySQL functions
+
+def _as_datetime(value):
+    text = str(value)
+    if '-' in text:
+        return datetime.fromisoformat(text)
+    return datetime.combine(date.today(), time()) + _parse_time(text)
+
+def _timestampdiff(unit, start, end):
+    if start is None or end is None:
+        return None
+    seconds = (_as_datetime(end) - _as_datetime(start)).total_seconds()
+    return int(seconds / UNIT_SECONDS[unit.upper()])
+
+def _dayname(value):
+    return None if value is None else WEEKDAY_NAMES[date.fromisoformat(str(value)[:10]).weekday()]
+
+def _greatest(*values):
+    return None if any(v is None for v in values) else max(values)
+
+def _least(*values):
+    return None if any(v is None for v in values) else min(values)
+
+def _concat(*values):
+    return None if any(v is None for v in values) else ''.join(str(v) for v in values)
+
+def _elt(index, *values):
+    return values[int(index) - 1] if index is not None and 1 <= int(index) <= len(values) else None
+
+FUNCTIONS = {
+    'CURDATE': (0, lambda: date.today().isoformat()),
+    'NOW': (0, lambda: datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+    'RAND': (0, random.random),
+    'DATABASE': (0, lambda: 'main'),
+    'DAYNAME': (1, _dayname),
+    'SLEEP': (1, lambda seconds: _sleep(seconds) or 0),
+    'FLOOR': (1, lambda value: None if value is None else math.floor(value)),
+    'TIMESTAMPDIFF': (3, _timestampdiff),
+    'GREATEST': (-1, _greatest),
+    'LEAST': (-1, _least),
+    'CONCAT': (-1, _concat),
+    'ELT': (-1, _elt)
+}
+
+# Statement translation
+
+Statement = namedtuple('Statement', 'kind sql table locking assignments load')
+
+_INSERT_TABLE = re.compile(r'^\s*(?:INSERT|REPLACE)\s+(?:OR\s+\w+\s+|IGNORE\s+)?INTO\s+`?(\w+)', re.I)
+_SET = re.compile(r'^\s*SET\s+(.*)$', re.I | re.S)
+_ASSIGNMENT = re.compile(r'^\s*(@?\w+)\s*(?::=|=)\s*(.+?)\s*$', re.S)
+_LOAD_DATA = re.compile(
+    r'^\s*LOAD\s+DATA\s+LOCAL\s+INFILE\s+(%s|\'[^\']*\')\s+INTO\s+TABLE\s+`?(\w+)`?.*?\(([^()]*)\)\s*$',
+    re.I | re.S
+)
+_EXPLAIN_JSON = re.compile(r'^\s*EXPLAIN\s+FORMAT\s*=\s*JSON\s+', re.I)
+_PLAN_STEP = re.compile(
+    r'^(SCAN|SEARCH) (\w+)(?: AS \w+)?(?: USING (?:COVERING )?(?:INDEX (\w+)|(INTEGER PRIMARY KEY|PRIMARY KEY)))?(.*)$'
+)
+_ON_DUPLICATE = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.I)
+_VALUES_FUNCTION = re.compile(r'\bVALUES\s*\(\s*`?(\w+)`?\s*\)', re.I)
+_FOR_UPDATE = re.compile(r'\s+FOR\s+UPDATE\s*$', re.I)
+_ENDS_IN_FROM = re.compile(r'\bFROM\b(?!.*\b(?:WHERE|GROUP\s+BY|HAVING|ORDER\s+BY|LIMIT)\b)', re.I | re.S)
+
+@lru_cache(maxsize=1024)
+def translate(query: str, has_params: bool) -> Statement:
+    """Translate one MySQL statement; has_params as mysql-connector decides on % escapes."""
+    set_match = _SET.match(query)
+    if set_match:
+        body = set_match.group(1).strip()
+        if re.match(r'(SESSION|GLOBAL|LOCAL|NAMES|SQL_MODE|TRANSACTION)\b', body, re.I):
+            return Statement('ignore', None, None, False, None, None)
+        assignments = []
+        for part in body.split(','):
+            name, value = _ASSIGNMENT.match(part).groups()
+            assignments.append((name, value))
+        return Statement('set', None, None, False, tuple(assignments), None)
+
+    explain_match = _EXPLAIN_JSON.match(query)
+    if explain_match:
+        inner = translate(query[explain_match.end():], has_params)
+        return Statement('explain', 'EXPLAIN QUERY PLAN ' + inner.sql, None, False, None, None)
+
+    load_match = _LOAD_DATA.match(query)
+    if load_match:
+        source, table, columns = load_match.groups()
+        columns = tuple(c.strip().strip('`') for c in columns.split(','))
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+        return Statement('load', sql, table, True, None, source.strip("'"))
+
+    sql = query.strip().rstrip(';')
+    if has_params:
+        sql = re.sub(r'%(s|%)', lambda m: '?' if m.group(1) == 's' else '%', sql)
+    sql = re.sub(r'\bINSERT\s+IGNORE\s+INTO\b', 'INSERT OR IGNORE INTO', sql, flags=re.I)
+    sql = re.sub(r'\bJSON_ARRAYAGG\s*\(', 'json_group_array(', sql, flags=re.I)
+    sql = sql.replace('<=>', ' IS ')
+    sql = re.sub(r'\bTIMESTAMPDIFF\s*\(\s*(\w+)\s*,', r"TIMESTAMPDIFF('\1',", sql, flags=re.I)
+
+    duplicate = _ON_DUPLICATE.search(sql)
+    if duplicate:
+        head, tail = sql[:duplicate.start()].rstrip(), sql[duplicate.end():]
+        # INSERT ... SELECT ... FROM t JOIN u ON ... ON CONFLICT is ambiguous to SQLite
+        select = re.search(r'\bSELECT\b', head, re.I)
+        if select and _ENDS_IN_FROM.search(head[select.start():]):
+            head += ' WHERE true'
+        sql = f"{head} ON CONFLICT DO UPDATE SET " + _VALUES_FUNCTION.sub(r'excluded.\1', tail)
+
+    locking = bool(_FOR_UPDATE.search(sql))
+    if locking:
+        sql = _FOR_UPDATE.sub('', sql)
+
+    verb = sql.lstrip('( \n\t').split(None, 1)[0].upper() if sql.strip() else ''
+    table_match = _INSERT_TABLE.match(sql)
+    kind = 'read' if verb in ('SELECT', 'WITH', 'PRAGMA', 'EXPLAIN') else 'write'
+    return Statement(kind, sql, table_match.group(1) if table_match else None, locking, None, None)
+
+def _json_plan(steps):
+    """
+    EXPLAIN QUERY PLAN rows shaped like MySQL's EXPLAIN FORMAT=JSON, so
+    slow_queries.plan_tables() reads them: a full scan is access_type 'ALL'.
+    """
+    tables = []
+    for step in steps:
+        match = _PLAN_STEP.match(step[3])
+        if not match:
+            continue
+        verb, table, index, primary, condition = match.groups()
+        if verb == 'SCAN':
+            access_type = 'index' if index else 'ALL'
+        elif primary and '=' in condition and '>' not in condition and '<' not in condition:
+            access_type = 'eq_ref'
+        else:
+            access_type = 'range' if '>' in condition or '<' in condition else 'ref'
+        tables.append({'table': {
+            'table_name': table,
+            'access_type': access_type,
+            'key': 'PRIMARY' if primary else index,
+            'attached_condition': step[3]
+        }})
+    return json.dumps({'query_block': {'nested_loop': tables}})
+
+# Errors
+
+def _mysql_error(error: sqlite3.Error, connection) -> errors.Error:
+    """The mysql.connector error MySQL would have raised for a SQLite error."""
+    message = str(error)
+    name = getattr(error, 'sqlite_errorname', '')
+    if name in ('SQLITE_CONSTRAINT_UNIQUE', 'SQLITE_CONSTRAINT_PRIMARYKEY'):
+        return errors.IntegrityError(
+            msg=f"Duplicate entry for key '{connection.unique_key_name(message)}'",
+            errno=errorcode.ER_DUP_ENTRY, sqlstate='23000'
+        )
+    if name == 'SQLITE_CONSTRAINT_TRIGGER':
+        # RAISE(ABORT, ...) in a trigger is the SIGNAL SQLSTATE '45000' of schema.sql
+        return errors.DatabaseError(msg=message, errno=errorcode.ER_SIGNAL_EXCEPTION, sqlstate='45000')
+    if name == 'SQLITE_CONSTRAINT_FOREIGNKEY':
+        return errors.IntegrityError(
+            msg=f"Cannot add or update a child row: a foreign key constraint fails ({message})",
+            errno=errorcode.ER_NO_REFERENCED_ROW_2, sqlstate='23000'
+        )
+    if name == 'SQLITE_CONSTRAINT_NOTNULL':
+        column = message.rsplit('.', 1)[-1]
+        return errors.IntegrityError(msg=f"Column '{column}' cannot be null", errno=errorcode.ER_BAD_NULL_ERROR,
+                                     sqlstate='23000')
+    if name == 'SQLITE_CONSTRAINT_CHECK':
+        return errors.DataError(msg=f"Data truncated ({message})", errno=errorcode.WARN_DATA_TRUNCATED,
+                                sqlstate='01000')
+    if isinstance(error, sqlite3.OperationalError) and 'locked' in message:
+        return errors.DatabaseError(msg=message, errno=errorcode.ER_LOCK_WAIT_TIMEOUT, sqlstate='HY000')
+    if isinstance(error, sqlite3.OperationalError):
+        return errors.ProgrammingError(msg=message, errno=errorcode.ER_PARSE_ERROR, sqlstate='42000')
+    return errors.DatabaseError(msg=message)
+
+# Connections
+
+class SQLiteCursor:
+    """mysql-connector cursor interface over a sqlite3 cursor."""
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection.raw.cursor()
+        self._dictionary = dictionary
+        self._rows = None
+        self.rowcount = -1
+        self.lastrowid = None
+        self.description = None
+
+    def execute(self, query, params=None):
+        params = tuple(params or ())
+        statement = translate(query, bool(params))
+        self.rowcount, self.lastrowid, self.description = -1, 0, None
+        if statement.kind == 'ignore':
+            return
+        if statement.kind == 'set':
+            self._connection.assign(statement.assignments, params)
+            self.rowcount = 0
+            return
+        if statement.kind == 'load':
+            self._load(statement, params)
+            return
+        self._rows = None
+        try:
+            if statement.kind == 'write' or statement.locking:
+                self._connection.begin()
+            self._cursor.execute(statement.sql, tuple(_param(p) for p in params))
+        except sqlite3.Error as e:
+            raise _mysql_error(e, self._connection) from e
+        self.description = self._cursor.description
+        if statement.kind == 'explain':
+            self._rows = [(_json_plan(self._cursor.fetchall()),)]
+            self.description = (('EXPLAIN', None, None, None, None, None, None),)
+        if statement.kind == 'write':
+            self.rowcount = self._cursor.rowcount
+            # MySQL reports the first id of a multi-row insert, and 0 for
+            # tables without an auto-increment key
+            if statement.table in self._connection.auto_increment_tables and self.rowcount > 0:
+                self.lastrowid = max(self._cursor.lastrowid - self.rowcount + 1, 1)
+
+    def executemany(self, query, seq_params):
+        rowcount, lastrowid = 0, 0
+        for params in seq_params:
+            self.execute(query, params)
+            rowcount += max(self.rowcount, 0)
+            lastrowid = lastrowid or self.lastrowid
+        self.rowcount, self.lastrowid = rowcount, lastrowid
+
+    def _load(self, statement, params):
+        path = params[0] if statement.load == '%s' else statement.load
+        with open(path, newline='') as handle:
+            rows = [tuple(None if value == '\\N' else value for value in row) for row in csv.reader(handle)]
+        try:
+            self._connection.begin()
+            self._cursor.executemany(statement.sql, rows)
+        except sqlite3.Error as e:
+            raise _mysql_error(e, self._connection) from e
+        self.rowcount = len(rows)
+
+    def _row(self, values):
+        if values is None or not self._dictionary:
+            return values
+        return {column[0]: value for column, value in zip(self.description, values)}
+
+    def fetchall(self):
+        if self._rows is not None:
+            values, self._rows = self._rows, []
+        else:
+            values = self._cursor.fetchall()
+        rows = [self._row(row) for row in values]
+        self.rowcount = len(rows)
+        return rows
+
+    def fetchone(self):
+        if self._rows is not None:
+            return self._row(self._rows.pop(0)) if self._rows else None
+        return self._row(self._cursor.fetchone())
+
+    def close(self):
+        self._cursor.close()
+
+class SQLiteConnection:
+    """One SQLite connection with mysql-connector's transaction behaviour (no autocommit)."""
+
+    def __init__(self, path, pool=None):
+        self.path = path
+        self._pool = pool
+        self.raw = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False,
+                                   detect_types=sqlite3.PARSE_DECLTYPES)
+        self.raw.execute("PRAGMA foreign_keys = ON")
+        self.raw.execute("PRAGMA trusted_schema = ON")
+        self.raw.execute("PRAGMA synchronous = NORMAL")
+        self._variables = {}
+        for name, (arity, function) in FUNCTIONS.items():
+            self.raw.create_function(name, arity, function)
+        self.raw.create_function('session_variable', 1, self._variables.get)
+        self.auto_increment_tables = {
+            row[0] for row in self.raw.execute("SELECT name FROM sqlite_master WHERE sql LIKE '%AUTOINCREMENT%'")
+        }
+
+    def cursor(self, dictionary=False, **kwargs):
+        return SQLiteCursor(self, dictionary)
+
+    def begin(self):
+        if not self.raw.in_transaction:
+            self.raw.execute("BEGIN IMMEDIATE")
+
+    def assign(self, assignments, params):
+        params = list(params)
+        for name, value in assignments:
+            if value == '%s':
+                value = params.pop(0)
+            elif value.upper() == 'NULL':
+                value = None
+            elif re.match(r'^-?\d+$', value):
+                value = int(value)
+            else:
+                value = value.strip('\'"')
+            if name.startswith('@'):
+                self._variables[name[1:]] = value
+            elif name.upper() == 'FOREIGN_KEY_CHECKS':
+                # Like MySQL's, only for this session; a no-op inside a transaction
+                self.raw.execute(f"PRAGMA foreign_keys = {'ON' if value else 'OFF'}")
+
+    def unique_key_name(self, message):
+        """MySQL's name for the key in 'UNIQUE constraint failed: t.a, t.b'."""
+        columns = [part.strip() for part in message.split(':', 1)[-1].split(',')]
+        table = columns[0].split('.', 1)[0]
+        names = [column.split('.', 1)[-1] for column in columns]
+        for index in self.raw.execute(f"PRAGMA index_list({table})").fetchall():
+            indexed = [row[2] for row in self.raw.execute(f"PRAGMA index_info({index[1]})").fetchall()]
+            if index[2] and indexed == names:
+                # MySQL names a column's UNIQUE constraint after the column
+                name = 'PRIMARY' if index[3] == 'pk' else names[0] if index[3] == 'u' else index[1]
+                return f"{table}.{name}"
+        return f"{table}.PRIMARY"
+
+    def commit(self):
+        if self.raw.in_transaction:
+            self.raw.execute("COMMIT")
+
+    def rollback(self):
+        if self.raw.in_transaction:
+            self.raw.execute("ROLLBACK")
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        """Return to the pool (rolling back and resetting the session) or close."""
+        if self._pool is None:
+            self.raw.close()
+            return
+        self.rollback()
+        self._variables.clear()
+        self.raw.execute("PRAGMA foreign_keys = ON")
+        self._pool.release(self)
+
+def _temporary_database() -> str:
+    handle, path = tempfile.mkstemp(prefix='academic_meetings-', suffix='.sqlite3')
+    os.close(handle)
+
+    def remove():
+        for suffix in ('', '-wal', '-shm'):
+            try:
+                os.remove(path + suffix)
+            except OSError:
+                pass
+    atexit.register(remove)
+    return path
+
+def create_schema(path):
+    """Create the tables, triggers and sample rows of schema_sqlite.sql if missing."""
+    connection = sqlite3.connect(path, isolation_level=None)
+    try:
+        connection.execute("PRAGMA journal_mode = WAL")
+        exists = connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'").fetchone()
+        if not exists:
+            with open(SCHEMA_FILE) as handle:
+                connection.executescript(handle.read())
+    finally:
+        connection.close()
+
+class SQLiteConnectionPool:
+    """Fixed-size pool with the exhaustion behaviour of MySQLConnectionPool."""
+
+    def __init__(self, path=None, pool_size=5):
+        self.path = path or _temporary_database()
+        self.pool_size = pool_size
+        create_schema(self.path)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def get_connection(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created >= self.pool_size:
+                raise errors.PoolError("Failed getting connection; pool exhausted")
+            self._created += 1
+        return SQLiteConnection(self.path, pool=self)
+
+    def release(self, connection):
+        self._idle.put(connection)
+
+    def connect(self):
+        """A connection outside the pool; close() really closes it."""
+        return SQLiteConnection(self.path)
@@ -0,0 +1,487 @@
+"""
+synthetic_data.py - Synthetic Dataset Generator
+Generates large, realistic datasets for performance work and bulk-loads them.
+
+The shape of the data:
+    - users: ~84% students, 15% professors, 1% admins
+    - rooms: a few "hot" rooms take a large share of room bookings
+    - meetings: spread over a past and future window, on the weekdays the
+      time slots exist for, busier in late morning; past meetings are
+      completed or cancelled, future ones scheduled or cancelled
+    - participants: power-law popularity (a few users are in many meetings),
+      never double-booked, capped by room capacity
+
+The same seed always produces the same dataset. Days are generated one at a
+time, so memory stays flat whatever the size.
+
+Loading uses multi-row INSERTs, or LOAD DATA LOCAL INFILE from generated CSV
+files (the server needs local_infile=ON). The load session sets @bulk_load
+(the meeting date trigger accepts past dates) and @set_based_booking (the
+per-row participant triggers step aside). Busy slots, availability, the
+daily schedule, rollups, sketches and grade summaries are then rebuilt in
+bulk.
+
+Usage:
+    python synthetic_data.py generate --users 10000 --meetings 1000000 [--seed 42]
+                                      [--method insert|infile|csv] [--csv-dir data/synthetic]
+    python synthetic_data.py clear
+"""
+
+import argparse
+import bisect
+import csv
+import itertools
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from database import db
+from recurrence import WEEKDAYS
+
+SYNTHETIC_EMAIL_DOMAIN = 'synthetic.invalid'
+SYNTHETIC_ROOM_PREFIX = 'Synthetic Room'
+SYNTHETIC_TITLE_PREFIX = '[synthetic]'
+LOAD_METHODS = ('insert', 'infile', 'csv')
+
+FIRST_NAMES = ['Aarav', 'Aditi', 'Alice', 'Arjun', 'Bob', 'Chen', 'Diana', 'Divya', 'Evan', 'Fatima',
+               'Gabriel', 'Hana', 'Ishaan', 'Kavya', 'Krishna', 'Lena', 'Maya', 'Noah', 'Priya', 'Rohan',
+               'Sara', 'Tanvi', 'Vikram', 'Yusuf', 'Zoe']
+LAST_NAMES = ['Brown', 'Das', 'Davis', 'Garcia', 'Gupta', 'Iyer', 'Johnson', 'Kumar', 'Lee', 'Mehta',
+              'Menon', 'Nair', 'Patel', 'Reddy', 'Rao', 'Sharma', 'Singh', 'Smith', 'Wang', 'Williams']
+TOPICS = ['Data Structures', 'Web Development', 'Machine Learning', 'Database Design', 'Operating Systems',
+          'Competitive Programming', 'Career Planning', 'Course Selection', 'Internship Preparation',
+          'Thesis', 'Project', 'Lab Work']
+TITLE_TEMPLATES = ['Discussion on {topic}', '{topic} Consultation', '{topic} Session', '{topic} Review',
+                   'Office Hours: {topic}']
+ROOM_CAPACITIES = (2, 4, 4, 6, 8, 10, 10, 15, 25, 50)
+
+# Table columns in load order
+COLUMNS = {
+    'users': ('user_id', 'name', 'email', 'role'),
+    'meeting_rooms': ('room_id', 'name', 'capacity'),
+    'meetings': ('meeting_id', 'title', 'description', 'room_id', 'slot_id', 'meeting_date', 'created_by',
+                 'status'),
+    'meeting_participants': ('meeting_id', 'user_id', 'response')
+}
+
+class SyntheticDataset:
+    """Deterministic row generator for users, rooms, meetings and participants."""
+
+    def __init__(self, users=10000, meetings=1000000, rooms=250, seed=42, days_back=365, days_ahead=180,
+                 mean_participants=3.0, max_participants=50, popularity_skew=1.1, hot_rooms=0.1,
+                 hot_room_share=0.5, room_rate=0.8, email_domain=SYNTHETIC_EMAIL_DOMAIN,
+                 title_prefix=SYNTHETIC_TITLE_PREFIX, room_prefix=SYNTHETIC_ROOM_PREFIX):
+        """
+        Args:
+            users, meetings, rooms: Row counts (meetings is a target; a few
+                may be dropped when every room and participant is taken)
+            seed: Random seed; the same seed gives the same rows
+            days_back, days_ahead: Meeting dates range from today - days_back
+                to today + days_ahead
+            mean_participants: Average participants per meeting (at least 1)
+            max_participants: Cap on participants per meeting
+            popularity_skew: Exponent of the power law over users; 0 is uniform
+            hot_rooms: Fraction of rooms that are hot
+            hot_room_share: Fraction of room bookings that go to hot rooms
+            room_rate: Fraction of meetings that book a room
+            email_domain, title_prefix, room_prefix: Tags that identify
+                generated rows for clear()
+        """
+        self.user_count = users
+        self.meeting_count = meetings
+        self.room_count = rooms
+        self.seed = seed
+        self.days_back = days_back
+        self.days_ahead = days_ahead
+        self.mean_participants = max(1.0, mean_participants)
+        self.max_participants = max_participants
+        self.popularity_skew = popularity_skew
+        self.hot_rooms = hot_rooms
+        self.hot_room_share = hot_room_share
+        self.room_rate = room_rate
+        self.email_domain = email_domain
+        self.title_prefix = title_prefix
+        self.room_prefix = room_prefix
+
+    def _rng(self, stream):
+        # Independent streams, so e.g. changing the room count leaves users alone
+        return random.Random(f"{self.seed}:{stream}")
+
+    def user_rows(self, first_id):
+        rng = self._rng('users')
+        for i in range(self.user_count):
+            roll = rng.random()
+            role = 'admin' if roll < 0.01 else 'professor' if roll < 0.16 else 'student'
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            prefix = 'Dr. ' if role == 'professor' else ''
+            yield (first_id + i, f"{prefix}{first} {last}", f"{first}.{last}.{i}@{self.email_domain}".lower(), role)
+
+    def room_rows(self, first_id):
+        rng = self._rng('rooms')
+        for i in range(self.room_count):
+            yield (first_id + i, f"{self.room_prefix} {i + 1}", rng.choice(ROOM_CAPACITIES))
+
+    @staticmethod
+    def _cumulative(weights):
+        return list(itertools.accumulate(weights))
+
+    def _user_popularity(self, rng, user_ids):
+        """Users in a random order with power-law weights: (ids, cumulative weights)."""
+        ranked = list(user_ids)
+        rng.shuffle(ranked)
+        weights = [1 / (rank + 1) ** self.popularity_skew for rank in range(len(ranked))]
+        return ranked, self._cumulative(weights)
+
+    def _room_weights(self, room_ids):
+        hot = max(1, round(len(room_ids) * self.hot_rooms)) if room_ids else 0
+        if hot >= len(room_ids):
+            return self._cumulative([1.0] * len(room_ids))
+        hot_weight = self.hot_room_share / hot
+        cold_weight = (1 - self.hot_room_share) / (len(room_ids) - hot)
+        return self._cumulative([hot_weight] * hot + [cold_weight] * (len(room_ids) - hot))
+
+    def _daily_targets(self, start, days, slots_by_weekday):
+        """Meetings per day: zero on days without slots, the rest split evenly."""
+        open_days = [d for d in range(days) if slots_by_weekday.get((start + timedelta(days=d)).weekday())]
+        targets = [0] * days
+        if not open_days:
+            return targets
+        base, extra = divmod(self.meeting_count, len(open_days))
+        for position, d in enumerate(open_days):
+            targets[d] = base + (1 if position < extra else 0)
+        return targets
+
+    def meeting_days(self, first_meeting_id, user_rows, room_rows, slots, today=None):
+        """
+        Yield (meeting_rows, participant_rows) one day at a time.
+
+        Args:
+            user_rows: Generated users (id, name, email, role)
+            room_rows: Generated rooms (id, name, capacity)
+            slots: [{'slot_id', 'start_time', 'day_of_week'}] from time_slots
+        """
+        rng = self._rng('meetings')
+        today = today or date.today()
+        start = today - timedelta(days=self.days_back)
+        days = self.days_back + self.days_ahead + 1
+
+        # Slots by weekday, weighted towards late morning; any day if none are tagged
+        slots_by_weekday = {}
+        for slot in slots:
+            weekday = WEEKDAYS.index(slot['day_of_week']) if slot.get('day_of_week') in WEEKDAYS else None
+            hour = _hour(slot['start_time'])
+            weight = 2.0 if 10 <= hour < 12 else 1.0
+            for day in ([weekday] if weekday is not None else range(7)):
+                slots_by_weekday.setdefault(day, []).append((slot['slot_id'], weight))
+        slots_by_weekday = {day: ([s for s, _ in entries], self._cumulative([w for _, w in entries]))
+                            for day, entries in slots_by_weekday.items()}
+
+        users, user_cumulative = self._user_popularity(rng, [row[0] for row in user_rows])
+        organizers, organizer_cumulative = self._user_popularity(
+            rng, [row[0] for row in user_rows if row[3] == 'professor'] or [row[0] for row in user_rows]
+        )
+        rooms = [(row[0], row[2]) for row in room_rows]
+        room_cumulative = self._room_weights(rooms)
+        # Geometric number of extra participants with the requested mean
+        extra_p = 1 / self.mean_participants
+
+        meeting_id = first_meeting_id
+        for offset, target in enumerate(self._daily_targets(start, days, slots_by_weekday)):
+            if not target:
+                continue
+            day = start + timedelta(days=offset)
+            slot_ids, slot_cumulative = slots_by_weekday[day.weekday()]
+            past = day < today
+            booked_rooms = set()   # (room_id, slot_id)
+            busy = set()           # (user_id, slot_id)
+            meeting_rows, participant_rows = [], []
+
+            for _ in range(target):
+                slot_id = _pick(rng, slot_ids, slot_cumulative)
+                room_id, capacity = None, self.max_participants + 1
+                if rooms and rng.random() < self.room_rate:
+                    room = None
+                    for _ in range(3):
+                        candidate = _pick(rng, rooms, room_cumulative)
+                        if (candidate[0], slot_id) not in booked_rooms:
+                            room = candidate
+                            break
+                    else:
+                        # Hot rooms fill up; then any free room will do
+                        free = [r for r in rooms if (r[0], slot_id) not in booked_rooms]
+                        room = rng.choice(free) if free else None
+                    if room:
+                        room_id, capacity = room
+                        booked_rooms.add((room_id, slot_id))
+                organizer = _pick(rng, organizers, organizer_cumulative)
+
+                wanted = 1
+                while rng.random() > extra_p and wanted < self.max_participants:
+                    wanted += 1
+                wanted = min(wanted, max(1, capacity - 1))
+                chosen = set()
+                for attempt in range(wanted * 6):
+                    if len(chosen) == wanted:
+                        break
+                    # Popular users fill their slots; then fall back to anyone
+                    user_id = _pick(rng, users, user_cumulative) if attempt < wanted * 3 else rng.choice(users)
+                    if user_id != organizer and (user_id, slot_id) not in busy:
+                        chosen.add(user_id)
+                if not chosen:
+                    continue
+
+                roll = rng.random()
+                if past:
+                    status = 'cancelled' if roll < 0.08 else 'completed'
+                else:
+                    status = 'cancelled' if roll < 0.05 else 'scheduled'
+                title = rng.choice(TITLE_TEMPLATES).format(topic=rng.choice(TOPICS))
+                meeting_rows.append((meeting_id, f"{self.title_prefix} {title}", 'Synthetic meeting',
+                                     room_id, slot_id, day, organizer, status))
+                for user_id in sorted(chosen):
+                    busy.add((user_id, slot_id))
+                    roll = rng.random()
+                    if past:
+                        response = 'accepted' if roll < 0.8 else 'declined' if roll < 0.95 else 'pending'
+                    else:
+                        response = 'accepted' if roll < 0.6 else 'pending' if roll < 0.9 else 'declined'
+                    participant_rows.append((meeting_id, user_id, response))
+                meeting_id += 1
+            yield meeting_rows, participant_rows
+
+def _pick(rng, population, cumulative):
+    return population[bisect.bisect(cumulative, rng.random() * cumulative[-1])]
+
+def _hour(value):
+    """Hour of a TIME column (timedelta from the connector) or 'HH:MM' text."""
+    if isinstance(value, timedelta):
+        return value.seconds // 3600
+    return int(str(value).split(':', 1)[0])
+
+class InsertSink:
+    """Writes rows with multi-row INSERTs, one transaction per chunk."""
+
+    def __init__(self, connection, chunk_size=5000):
+        self.connection = connection
+        self.cursor = connection.cursor()
+        self.chunk_size = chunk_size
+        self.buffers = {table: [] for table in COLUMNS}
+        self.rows = dict.fromkeys(COLUMNS, 0)
+
+    def add(self, table, row):
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.chunk_size:
+            self._flush(table)
+
+    def _flush(self, table):
+        buffer = self.buffers[table]
+        if not buffer:
+            return
+        columns = COLUMNS[table]
+        placeholders = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        self.cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES " + ', '.join([placeholders] * len(buffer)),
+            tuple(value for row in buffer for value in row)
+        )
+        self.connection.commit()
+        self.rows[table] += len(buffer)
+        buffer.clear()
+
+    def flush(self):
+        # Parents before children
+        for table in COLUMNS:
+            self._flush(table)
+
+    def close(self):
+        self.flush()
+        self.cursor.close()
+
+class CsvSink:
+    """Writes rows to one CSV file per table; optionally LOAD DATA LOCAL INFILE at close."""
+
+    def __init__(self, directory, connection=None):
+        self.directory = directory
+        self.connection = connection
+        os.makedirs(directory, exist_ok=True)
+        self.paths = {table: os.path.join(directory, f"{table}.csv") for table in COLUMNS}
+        self._files = {table: open(path, 'w', newline='') for table, path in self.paths.items()}
+        self._writers = {table: csv.writer(handle, lineterminator='\n') for table, handle in self._files.items()}
+        self.rows = dict.fromkeys(COLUMNS, 0)
+
+    def add(self, table, row):
+        self._writers[table].writerow(['\\N' if value is None else value for value in row])
+        self.rows[table] += 1
+
+    def flush(self):
+        for handle in self._files.values():
+            handle.flush()
+
+    def close(self):
+        for handle in self._files.values():
+            handle.close()
+        if self.connection is None:
+            return
+        cursor = self.connection.cursor()
+        try:
+            for table, columns in COLUMNS.items():
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+                    "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+                    f"({', '.join(columns)})",
+                    (os.path.abspath(self.paths[table]),)
+                )
+                self.connection.commit()
+        finally:
+            cursor.close()
+
+def _next_id(table, column):
+    return db.execute_query(f"SELECT COALESCE(MAX({column}), 0) + 1 AS next_id FROM {table}")[0]['next_id']
+
+def _open_load_connection(method):
+    connection = db.open_dedicated_connection(allow_local_infile=method == 'infile')
+    cursor = connection.cursor()
+    # Bypass the per-row triggers for this session; the generator guarantees
+    # no double bookings and valid references, and the derived tables are
+    # rebuilt afterwards
+    cursor.execute("SET @bulk_load = 1, @set_based_booking = 1, FOREIGN_KEY_CHECKS = 0")
+    cursor.close()
+    return connection
+
+def load(dataset, method='insert', chunk_size=5000, csv_dir=os.path.join('data', 'synthetic'), progress=print):
+    """
+    Generate the dataset and load it (method 'insert' or 'infile'), or only
+    write the CSV files ('csv').
+
+    Returns:
+        {'rows': {table: count}, 'seconds': {...}, 'first_ids': {...}}
+    """
+    if method not in LOAD_METHODS:
+        raise ValueError(f"method must be one of: {', '.join(LOAD_METHODS)}")
+    slots = db.execute_query("SELECT slot_id, start_time, day_of_week FROM time_slots ORDER BY slot_id")
+    if not slots:
+        raise ValueError("time_slots is empty; run seed_data.py first")
+    first_ids = {
+        'users': _next_id('users', 'user_id'),
+        'meeting_rooms': _next_id('meeting_rooms', 'room_id'),
+        'meetings': _next_id('meetings', 'meeting_id')
+    }
+
+    started = time.perf_counter()
+    connection = _open_load_connection(method) if method != 'csv' else None
+    try:
+        sink = InsertSink(connection, chunk_size) if method == 'insert' else \
+            CsvSink(csv_dir, connection if method == 'infile' else None)
+        user_rows = list(dataset.user_rows(first_ids['users']))
+        room_rows = list(dataset.room_rows(first_ids['meeting_rooms']))
+        for row in user_rows:
+            sink.add('users', row)
+        for row in room_rows:
+            sink.add('meeting_rooms', row)
+        sink.flush()
+        meetings = 0
+        days = dataset.meeting_days(first_ids['meetings'], user_rows, room_rows, slots)
+        for day, (meeting_rows, participant_rows) in enumerate(days, 1):
+            for row in meeting_rows:
+                sink.add('meetings', row)
+            for row in participant_rows:
+                sink.add('meeting_participants', row)
+            meetings += len(meeting_rows)
+            if day % 30 == 0:
+                progress(f"  ... {day} days, {meetings} meetings")
+        sink.close()
+    finally:
+        if connection is not None:
+            connection.close()
+    loaded = time.perf_counter() - started
+
+    seconds = {'load': round(loaded, 2)}
+    if method != 'csv':
+        started = time.perf_counter()
+        rebuild_derived(first_ids['meetings'], progress)
+        seconds['rebuild'] = round(time.perf_counter() - started, 2)
+    return {'rows': dict(sink.rows), 'seconds': seconds, 'first_ids': first_ids}
+
+def rebuild_derived(first_meeting_id=None, progress=print):
+    """Bring every table the triggers and Database maintain in line with the loaded rows."""
+    busy = db.rebuild_busy_slots()
+    progress(f"✓ Rebuilt busy slots ({busy} rows)")
+    # after_meeting_schedule's availability update, for the loaded meetings at once
+    condition, params = ("WHERE m.meeting_id >= %s", (first_meeting_id,)) if first_meeting_id else ("", ())
+    db.execute_query(
+        f"""
+        INSERT INTO user_availability (user_id, slot_id, is_available, created_at)
+        SELECT DISTINCT mp.user_id, m.slot_id, FALSE, NOW()
+        FROM meeting_participants mp
+        JOIN meetings m ON mp.meeting_id = m.meeting_id
+        {condition}
+        ON DUPLICATE KEY UPDATE is_available = FALSE, created_at = NOW()
+        """,
+        params,
+        fetch=False
+    )
+    progress("✓ Marked availability")
+    rows = db.rebuild_daily_schedule()
+    progress(f"✓ Rebuilt daily schedule ({rows} rows)")
+    rollups = db.compact_rollups()
+    progress(f"✓ Built analytics rollups ({rollups['days']} days)")
+    participants = db.rebuild_participant_sketches()
+    progress(f"✓ Built participant sketches ({participants} participant rows)")
+    grades = db.rebuild_grade_summaries()
+    progress(f"✓ Built grade summaries ({grades} grade rows)")
+
+def clear(email_domain=SYNTHETIC_EMAIL_DOMAIN, room_prefix=SYNTHETIC_ROOM_PREFIX, progress=print):
+    """Delete generated users (their meetings and participation cascade) and rooms."""
+    users = db.execute_query("DELETE FROM users WHERE email LIKE %s", ('%@' + email_domain,), fetch=False)
+    rooms = db.execute_query("DELETE FROM meeting_rooms WHERE name LIKE %s", (room_prefix + ' %',), fetch=False)
+    progress(f"✓ Removed {users} users and {rooms} rooms")
+    if users or rooms:
+        rebuild_derived(progress=progress)
+    return {'users': users, 'rooms': rooms}
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic dataset generator")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    generate = sub.add_parser('generate', help="generate and load a dataset")
+    generate.add_argument('--users', type=int, default=10000)
+    generate.add_argument('--meetings', type=int, default=1000000)
+    generate.add_argument('--rooms', type=int, default=250)
+    generate.add_argument('--seed', type=int, default=42)
+    generate.add_argument('--days-back', type=int, default=365)
+    generate.add_argument('--days-ahead', type=int, default=180)
+    generate.add_argument('--mean-participants', type=float, default=3.0)
+    generate.add_argument('--skew', type=float, default=1.1, help="Participant popularity power law (0 = uniform)")
+    generate.add_argument('--hot-rooms', type=float, default=0.1, help="Fraction of rooms that are hot")
+    generate.add_argument('--hot-room-share', type=float, default=0.5, help="Share of bookings in hot rooms")
+    generate.add_argument('--method', choices=LOAD_METHODS, default='insert',
+                          help="insert: multi-row INSERTs; infile: LOAD DATA LOCAL INFILE; csv: files only")
+    generate.add_argument('--chunk-size', type=int, default=5000)
+    generate.add_argument('--csv-dir', default=os.path.join('data', 'synthetic'))
+
+    sub.add_parser('clear', help="remove every generated row")
+
+    args = parser.parse_args()
+    if args.command == 'clear':
+        clear()
+        return
+
+    dataset = SyntheticDataset(
+        users=args.users, meetings=args.meetings, rooms=args.rooms, seed=args.seed,
+        days_back=args.days_back, days_ahead=args.days_ahead, mean_participants=args.mean_participants,
+        popularity_skew=args.skew, hot_rooms=args.hot_rooms, hot_room_share=args.hot_room_share
+    )
+    print(f"\nGenerating {args.users} users, {args.meetings} meetings, {args.rooms} rooms (seed {args.seed})")
+    result = load(dataset, args.method, args.chunk_size, args.csv_dir)
+    print("\n" + "="*50)
+    for table, count in result['rows'].items():
+        print(f"  • {table}: {count}")
+    for phase, seconds in result['seconds'].items():
+        print(f"  • {phase}: {seconds} s")
+    if args.method == 'csv':
+        print(f"  CSV files in {args.csv_dir}")
+    print("="*50 + "\n")
+
+if __name__ == '__main__':
+    main()
@@ -82,6 +82,37 @@ def test_meetings():
     }
     response = requests.post(f"{BASE_URL}/meetings", json=payload)
     print_response("Create New Meeting", response)
+    
+    # Create meeting with automatic room assignment
+    payload = {
+        "title": "API Test Auto Room Meeting",
+        "description": "Smallest room that fits",
+        "auto_assign_room": True,
+        "slot_id": 2,
+        "meeting_date": tomorrow,
+        "created_by": 1,
+        "participants": [2, 3]
+    }
+    response = requests.post(f"{BASE_URL}/meetings", json=payload)
+    print_response("Create Meeting (auto room)", response)
+    
+    # Let the scheduler pick slots for a few advising meetings (plan only)
+    window_end = (date.today() + timedelta(days=7)).strftime('%Y-%m-%d')
+    payload = {
+        "requests": [
+            {
+                "title": f"API Advising {student_id}",
+                "created_by": 1,
+                "participants": [student_id],
+                "window_start": tomorrow,
+                "window_end": window_end
+            }
+            for student_id in (2, 3, 4)
+        ],
+        "dry_run": True
+    }
+    response = requests.post(f"{BASE_URL}/meetings/schedule", json=payload)
+    print_response("Schedule Meetings (dry run)", response)
 
 def test_search():
     """Test advanced search."""
@@ -144,6 +175,19 @@ def test_participant_response():
     response = requests.post(f"{BASE_URL}/meetings/1/respond", json=payload)
     print_response("Accept Meeting Invitation", response)
 
+def test_participant_response_bulk():
+    """Test bulk participant response endpoint."""
+    print("\n\n📌 TESTING BULK PARTICIPANT RESPONSE")
+    
+    payload = {
+        "responses": [
+            {"user_id": 2, "response": "accepted"},
+            {"user_id": 3, "response": "declined"}
+        ]
+    }
+    response = requests.post(f"{BASE_URL}/meetings/1/respond/bulk", json=payload)
+    print_response("Bulk Respond to Meeting #1", response)
+
 def test_schedule():
     """Test user schedule endpoint."""
     print("\n\n📌 TESTING USER SCHEDULE")
@@ -160,6 +204,45 @@ def test_schedule():
     )
     print_response("Get User #1 Schedule (7 days)", response)
 
+def test_mentoring():
+    """Test FAM mentoring endpoints."""
+    print("\n\n📌 TESTING FAM MENTORING")
+    
+    response = requests.post(f"{BASE_URL}/fams/match", json={"dry_run": True})
+    print_response("Match Unassigned First-Years (dry run)", response)
+    
+    response = requests.get(
+        f"{BASE_URL}/students/1/mentor-slots",
+        params={
+            "start_date": (date.today() + timedelta(days=1)).strftime('%Y-%m-%d'),
+            "limit": 5
+        }
+    )
+    print_response("Find Mentor Slots for Student #1", response)
+    
+    response = requests.post(
+        f"{BASE_URL}/grades/import",
+        json={
+            "grades": [
+                {
+                    "student_id": 1,
+                    "subject_id": 1,
+                    "fam_id": 1,
+                    "grade": "A",
+                    "semester": "Fall",
+                    "academic_year": "2024-2025"
+                }
+            ]
+        }
+    )
+    print_response("Import Grades", response)
+    
+    response = requests.get(f"{BASE_URL}/students/1/grades")
+    print_response("Get Student #1 Grades", response)
+    
+    response = requests.get(f"{BASE_URL}/fams/1/mentee-grades", params={"academic_year": "2024-2025"})
+    print_response("Get FAM #1 Mentee Grades", response)
+
 def test_analytics():
     """Test analytics endpoint."""
     print("\n\n📌 TESTING ANALYTICS")
@@ -175,6 +258,36 @@ def test_analytics():
         }
     )
     print_response("Get Meeting Analytics (30 days)", response)
+    
+    year_ago = (date.today() - timedelta(days=365)).strftime('%Y-%m-%d')
+    response = requests.get(
+        f"{BASE_URL}/analytics/meetings/timeseries",
+        params={
+            "start_date": year_ago,
+            "end_date": end_date,
+            "bucket": "month"
+        }
+    )
+    print_response("Get Meeting Time Series (monthly, 1 year)", response)
+    
+    response = requests.get(
+        f"{BASE_URL}/analytics/rooms/utilization",
+        params={
+            "start_date": start_date,
+            "end_date": end_date
+        }
+    )
+    print_response("Get Room Utilization (30 days)", response)
+    
+    response = requests.get(
+        f"{BASE_URL}/analytics/participants/distinct",
+        params={
+            "start_date": start_date,
+            "end_date": end_date,
+            "mode": "both"
+        }
+    )
+    print_response("Get Distinct Participants (approx vs exact)", response)
 
 def test_delete():
     """Test delete endpoint."""
@@ -201,6 +314,26 @@ def test_delete():
         response = requests.delete(f"{BASE_URL}/meetings/{meeting_id}")
         print_response(f"Delete Meeting #{meeting_id}", response)
 
+def test_batch():
+    """Test batch endpoint."""
+    print("\n\n📌 TESTING BATCH")
+    
+    start_date = date.today().strftime('%Y-%m-%d')
+    end_date = (date.today() + timedelta(days=7)).strftime('%Y-%m-%d')
+    payload = {
+        "requests": [
+            {"id": "user", "method": "GET", "path": "/api/users/1"},
+            {"id": "upcoming", "method": "GET", "path": "/api/meetings/upcoming",
+             "params": {"user_id": 1, "limit": 5}},
+            {"id": "rooms", "method": "GET", "path": "/api/rooms"},
+            {"id": "timeslots", "method": "GET", "path": "/api/timeslots"},
+            {"id": "schedule", "method": "GET", "path": "/api/user/1/schedule",
+             "params": {"start_date": start_date, "end_date": end_date}}
+        ]
+    }
+    response = requests.post(f"{BASE_URL}/batch", json=payload)
+    print_response("Dashboard Batch (5 sub-requests)", response)
+
 def test_health():
     """Test health check."""
     print("\n\n📌 TESTING HEALTH CHECK")
@@ -208,6 +341,16 @@ def test_health():
     response = requests.get(f"{BASE_URL}/health")
     print_response("API Health Check", response)
 
+def test_metrics():
+    """Test Prometheus metrics endpoint (run last so it reflects the suite)."""
+    print("\n\n📌 TESTING METRICS")
+    
+    response = requests.get(BASE_URL.replace('/api', '/metrics'))
+    print(f"\n{'='*60}")
+    print(f"✓ Metrics ({response.status_code})")
+    print(f"{'='*60}")
+    print('\n'.join(line for line in response.text.splitlines() if line.startswith('http_requests_total')))
+
 def main():
     """Run all tests."""
     print("\n" + "="*60)
@@ -224,9 +367,13 @@ def main():
         test_timeslots()
         test_search()
         test_participant_response()
+        test_participant_response_bulk()
         test_schedule()
+        test_mentoring()
         test_analytics()
         test_delete()
+        test_batch()
+        test_metrics()
         
         print("\n\n" + "="*60)
         print("✅ ALL TESTS COMPLETED!")
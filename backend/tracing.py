@@ -0,0 +1,266 @@
+"""
+tracing.py - Request Tracing
+Lightweight in-process spans from Flask route to SQL, exported as
+OpenTelemetry (OTLP/JSON) documents to logs/traces.jsonl, one trace per line.
+
+Every request gets a server span. Inside it:
+    Database.<method>   one per public Database call
+    db.query            one per execute_query / execute_complex_query
+    db.pool_wait        getting a pooled connection
+    db.json_parse       decoding nested JSON results
+    response.serialize  turning the route's data into the JSON body
+Trace ids follow the W3C traceparent header: an incoming traceparent joins
+its trace, and every traced response carries one back.
+
+Spans live in a context variable, so batch sub-requests on worker threads
+nest under the batch request. Database timings arrive from Database
+listener events once the work is done; their start times place them on the
+timeline.
+"""
+
+import functools
+import inspect
+import json
+import random
+import re
+from contextlib import contextmanager
+import contextvars
+from time import time_ns
+
+from logger import trace_logger
+from slow_queries import normalize_sql
+
+SERVICE_NAME = 'academic-meetings-api'
+TRACEPARENT_HEADER = 'traceparent'
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+_current_span = contextvars.ContextVar('tracing_current_span', default=None)
+
+class Span:
+    """One timed operation; the root span's trace collects every finished span."""
+    __slots__ = ('trace', 'trace_id', 'span_id', 'parent_id', 'name', 'kind',
+                 'start_ns', 'end_ns', 'attributes', 'status', 'pending', 'local_root', '_token')
+
+    def __init__(self, trace, trace_id, parent_id, name, kind=SPAN_KIND_INTERNAL,
+                 start_ns=None, attributes=None):
+        self.trace = trace
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns if start_ns is not None else time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.status = None   # (code, message)
+        self.pending = []    # database spans waiting for their query span
+        self.local_root = False   # first span of the trace in this process
+        self._token = None
+
+    def child(self, name, kind=SPAN_KIND_INTERNAL, start_ns=None, attributes=None):
+        return Span(self.trace, self.trace_id, self.span_id, name, kind, start_ns, attributes)
+
+    def end(self, end_ns=None):
+        self.end_ns = end_ns if end_ns is not None else time_ns()
+        self.trace.append(self)
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self):
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': [_attribute(key, value) for key, value in self.attributes.items()]
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        if self.status:
+            span['status'] = {'code': self.status[0], 'message': self.status[1] or ''}
+        return span
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+def _to_ns(seconds):
+    return int(seconds * 1_000_000_000)
+
+@contextmanager
+def span(name, **attributes):
+    """Time the block as a child of the current span; no-op outside a trace."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.child(name, attributes=attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except Exception as e:
+        child.status = (STATUS_ERROR, str(e))
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+class Tracer:
+    """Starts request spans, turns Database events into spans and exports traces."""
+
+    def __init__(self, sample_rate=1.0, service_name=SERVICE_NAME, exporter=None):
+        """
+        Args:
+            sample_rate: Share of new traces recorded (0-1); requests joining
+                an incoming trace follow its sampled flag
+            service_name: service.name resource attribute
+            exporter: Called with each finished trace as an OTLP JSON string
+                (default: the trace logger)
+        """
+        self.sample_rate = sample_rate
+        self.service_name = service_name
+        self._export = exporter or trace_logger.info
+
+    def start_request(self, headers, name, attributes=None):
+        """
+        Open the server span of a request and make it current.
+
+        Returns:
+            The span, or None when the request is not sampled
+        """
+        parent = _current_span.get()
+        if parent is not None:
+            # A batch sub-request: stay in the batch's trace
+            request_span = parent.child(name, SPAN_KIND_SERVER, attributes=attributes)
+        else:
+            match = _TRACEPARENT.match(headers.get(TRACEPARENT_HEADER, ''))
+            if match:
+                if not int(match.group(3), 16) & 1:
+                    return None
+                trace_id, parent_id = match.group(1), match.group(2)
+            elif random.random() < self.sample_rate:
+                trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            else:
+                return None
+            request_span = Span([], trace_id, parent_id, name, SPAN_KIND_SERVER, attributes=attributes)
+            request_span.local_root = True
+        request_span._token = _current_span.set(request_span)
+        return request_span
+
+    def finish_request(self, request_span, status_code, response=None):
+        """Close a span from start_request(); exports the trace if it was the root."""
+        try:
+            _current_span.reset(request_span._token)
+        except ValueError:
+            # Finished in a different context than it started
+            pass
+        self._adopt_pending(request_span)
+        request_span.attributes['http.status_code'] = status_code
+        if status_code >= 500:
+            request_span.status = (STATUS_ERROR, f"HTTP {status_code}")
+        request_span.end()
+        if response is not None:
+            response.headers[TRACEPARENT_HEADER] = request_span.traceparent()
+        if request_span.local_root:
+            self.export(request_span.trace)
+
+    @staticmethod
+    def _adopt_pending(parent):
+        """Record parent's leftover database spans as its own children."""
+        for pending in parent.pending:
+            pending.trace.append(pending)
+        parent.pending = []
+
+    def on_database_event(self, event, info):
+        """Database listener (see Database.add_listener)."""
+        parent = _current_span.get()
+        if parent is None:
+            return
+        start_ns = _to_ns(info['started'])
+        end_ns = start_ns + _to_ns(info['seconds'])
+
+        if event == 'query':
+            query_span = parent.child('db.query', SPAN_KIND_CLIENT, start_ns, {
+                'db.system': 'mysql',
+                'db.operation': info['kind'],
+                'db.statement': normalize_sql(info['query']),
+                'db.rows': info['rows'] if info['rows'] is not None else -1
+            })
+            if info['error'] is not None:
+                query_span.status = (STATUS_ERROR, str(info['error']))
+            query_span.end_ns = end_ns
+            query_span.trace.append(query_span)
+            # Pool waits and JSON parsing reported during this query are its children
+            inside, outside = [], []
+            for pending in parent.pending:
+                (inside if pending.start_ns >= start_ns else outside).append(pending)
+            parent.pending = outside
+            for pending in inside:
+                pending.parent_id = query_span.span_id
+                pending.trace.append(pending)
+        elif event in ('pool_wait', 'json_parse'):
+            pending = parent.child(f"db.{event}", start_ns=start_ns,
+                                   attributes={'db.rows': info['rows']} if 'rows' in info else None)
+            pending.end_ns = end_ns
+            # Parented when the enclosing query (or request) ends
+            parent.pending.append(pending)
+
+    def instrument(self, cls, exclude=('request_scope', 'get_connection', 'open_dedicated_connection',
+                                       'execute_query', 'execute_complex_query')):
+        """
+        Wrap the public methods of cls in spans named '<Class>.<method>'.
+        Methods whose timing already comes from listener events are excluded.
+        """
+        for name, method in list(vars(cls).items()):
+            if name.startswith('_') or name in exclude or not inspect.isfunction(method):
+                continue
+            setattr(cls, name, self._traced(f"{cls.__name__}.{name}", method))
+        return cls
+
+    def _traced(self, span_name, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            parent = _current_span.get()
+            if parent is None:
+                return method(*args, **kwargs)
+            call_span = parent.child(span_name)
+            token = _current_span.set(call_span)
+            try:
+                return method(*args, **kwargs)
+            except Exception as e:
+                call_span.status = (STATUS_ERROR, str(e))
+                raise
+            finally:
+                _current_span.reset(token)
+                self._adopt_pending(call_span)
+                call_span.end()
+        return wrapper
+
+    def export(self, spans):
+        """Write one trace as an OTLP/JSON ExportTraceServiceRequest."""
+        document = {
+            'resourceSpans': [{
+                'resource': {'attributes': [_attribute('service.name', self.service_name)]},
+                'scopeSpans': [{
+                    'scope': {'name': 'meeting_scheduler.tracing'},
+                    'spans': [item.to_otlp() for item in sorted(spans, key=lambda s: s.start_ns)]
+                }]
+            }]
+        }
+        self._export(json.dumps(document, separators=(',', ':')))
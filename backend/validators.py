@@ -6,6 +6,8 @@ Provides validation utilities for API inputs
 import re
 from datetime import datetime, date
 
+from grades import GRADE_POINTS
+
 class ValidationError(Exception):
     """Custom validation error."""
     def __init__(self, field, message):
@@ -53,7 +55,7 @@ class Validator:
         """Validate date format (YYYY-MM-DD) and ensure it's not in the past."""
         try:
             parsed_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        except ValueError:
+        except (TypeError, ValueError):
             raise ValidationError('meeting_date', 'Date must be in YYYY-MM-DD format')
         
         if parsed_date < date.today():
@@ -66,7 +68,7 @@ class Validator:
         """Validate time format (HH:MM)."""
         try:
             datetime.strptime(time_str, '%H:%M')
-        except ValueError:
+        except (TypeError, ValueError):
             raise ValidationError('time', 'Time must be in HH:MM format')
         return time_str
     
@@ -172,6 +174,150 @@ def validate_meeting_creation(data):
     
     return errors
 
+def validate_series_creation(data, max_days=366):
+    """Validate recurring meeting series creation request."""
+    errors = []
+    
+    try:
+        data['title'] = Validator.validate_title(data.get('title'))
+    except ValidationError as e:
+        errors.append(e.to_dict())
+    
+    try:
+        data['description'] = Validator.validate_description(data.get('description', ''))
+    except ValidationError as e:
+        errors.append(e.to_dict())
+    
+    try:
+        data['start_date'] = Validator.validate_date(data.get('start_date'))
+    except ValidationError as e:
+        errors.append({'field': 'start_date', 'message': e.message})
+    
+    try:
+        data['until_date'] = Validator.validate_date(data.get('until_date'))
+    except ValidationError as e:
+        errors.append({'field': 'until_date', 'message': e.message})
+    
+    if isinstance(data.get('start_date'), date) and isinstance(data.get('until_date'), date):
+        span = (data['until_date'] - data['start_date']).days
+        if span < 0:
+            errors.append({'field': 'until_date', 'message': 'until_date must not be before start_date'})
+        elif span > max_days:
+            errors.append({'field': 'until_date', 'message': f'A series may span at most {max_days} days'})
+    
+    try:
+        data['interval_weeks'] = Validator.validate_positive_integer(data.get('interval_weeks', 1), 'interval_weeks')
+    except ValidationError as e:
+        errors.append(e.to_dict())
+    
+    for field in ('slot_id', 'created_by'):
+        try:
+            data[field] = Validator.validate_positive_integer(data.get(field), field)
+        except ValidationError as e:
+            errors.append(e.to_dict())
+    
+    if 'room_id' in data and data['room_id']:
+        try:
+            data['room_id'] = Validator.validate_positive_integer(data.get('room_id'), 'room_id')
+        except ValidationError as e:
+            errors.append(e.to_dict())
+    
+    if 'participants' in data and data['participants']:
+        try:
+            data['participants'] = Validator.validate_list_of_integers(data.get('participants', []), 'participants')
+        except ValidationError as e:
+            errors.append(e.to_dict())
+    
+    return errors
+
+def validate_schedule_request(data, max_window_days=31):
+    """Validate one batch scheduling request (a meeting without a fixed slot)."""
+    errors = []
+    
+    try:
+        data['title'] = Validator.validate_title(data.get('title'))
+    except ValidationError as e:
+        errors.append(e.to_dict())
+    
+    try:
+        data['description'] = Validator.validate_description(data.get('description', ''))
+    except ValidationError as e:
+        errors.append(e.to_dict())
+    
+    try:
+        data['created_by'] = Validator.validate_positive_integer(data.get('created_by'), 'created_by')
+    except ValidationError as e:
+        errors.append(e.to_dict())
+    
+    try:
+        data['participants'] = Validator.validate_list_of_integers(data.get('participants', []), 'participants')
+    except ValidationError as e:
+        errors.append(e.to_dict())
+    
+    for field in ('window_start', 'window_end'):
+        try:
+            data[field] = Validator.validate_date(data.get(field))
+        except ValidationError as e:
+            errors.append({'field': field, 'message': e.message})
+    
+    if isinstance(data.get('window_start'), date) and isinstance(data.get('window_end'), date):
+        span = (data['window_end'] - data['window_start']).days
+        if span < 0:
+            errors.append({'field': 'window_end', 'message': 'window_end must not be before window_start'})
+        elif span >= max_window_days:
+            errors.append({'field': 'window_end', 'message': f'A window may span at most {max_window_days} days'})
+    
+    if not isinstance(data.get('room_required', True), bool):
+        errors.append({'field': 'room_required', 'message': 'room_required must be a boolean'})
+    data['room_required'] = data.get('room_required', True)
+    
+    for field in ('min_capacity', 'min_duration_minutes'):
+        if data.get(field) is not None:
+            try:
+                data[field] = Validator.validate_positive_integer(data.get(field), field)
+            except ValidationError as e:
+                errors.append(e.to_dict())
+    
+    return errors
+
+def validate_grade_entry(data):
+    """Validate one grade entry of a grade import."""
+    errors = []
+    
+    for field in ('student_id', 'subject_id', 'fam_id'):
+        try:
+            data[field] = Validator.validate_positive_integer(data.get(field), field)
+        except ValidationError as e:
+            errors.append(e.to_dict())
+    
+    try:
+        grade = data.get('grade')
+        # Lists and dicts are unhashable, so check the type before the lookup
+        if not isinstance(grade, str) or grade.strip().upper() not in GRADE_POINTS:
+            raise ValidationError('grade', f'Grade must be one of: {", ".join(GRADE_POINTS)}')
+        data['grade'] = grade.strip().upper()
+    except ValidationError as e:
+        errors.append(e.to_dict())
+    
+    semester = data.get('semester')
+    if not isinstance(semester, str) or not semester.strip() or len(semester.strip()) > 20:
+        errors.append({'field': 'semester', 'message': 'Semester must be a string of at most 20 characters'})
+    else:
+        data['semester'] = semester.strip()
+    
+    academic_year = data.get('academic_year')
+    if not isinstance(academic_year, str) or not re.match(r'^\d{4}-\d{2,4}$', academic_year.strip()):
+        errors.append({'field': 'academic_year', 'message': 'Academic year must look like 2024-2025'})
+    else:
+        data['academic_year'] = academic_year.strip()
+    
+    try:
+        data['feedback'] = Validator.validate_description(data.get('feedback')) or None
+    except ValidationError as e:
+        errors.append({'field': 'feedback', 'message': e.message.replace('Description', 'Feedback', 1)})
+    
+    return errors
+
 def validate_user_creation(data):
     """Validate user creation request."""
     errors = []